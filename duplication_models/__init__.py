@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Shared compute code for the duplication model testing scripts.
+
+The scripts at the top level of the repository (model selection, residual calc,
+parameter space, likelihood and residual tests) import their model functions, the
+observed data set and the preset grids from here instead of each carrying its own
+copy. Importing the package or a script has no side effects: the scripts only prompt
+and compute from main(), run when the script is executed, and matplotlib, pandas and
+statsmodels are only imported by the functions that plot. python -m
+duplication_models.batch runs the preset searches of every category without prompts.
+"""
+
+from duplication_models.survival import (
+    N_MAX,
+    SURVIVAL_ENGINES,
+    SeriesTermHistogram,
+    survival_probability,
+    survival_probability_series,
+    survival_probability_gamma,
+    integral_of_exp_minus_b_s_c,
+    compare_survival_engines,
+    calculate_probability_of_survival_of_duplicate_gene_copy_by_time,
+)
+from duplication_models.dataset import Fish, Plants, DataSet, unique_time_index
+from duplication_models.cache import SURVIVAL_CACHE_SIZE, SurvivalCache
+from duplication_models.pratio import calculate_pratio_2d, calculate_pratio_over_switches, calculate_expected_pratio, calculate_residual
+from duplication_models.leaderboard import TOP_K, DELTA_SSR, Leaderboard
+from duplication_models.pruning import PRUNING_MARGIN, DataPointOrder, PruningStatistics, pruning_limit
+from duplication_models.constraints import DOS_HAZARD_TIME, DOS_HAZARD_LIMIT, CATEGORY_CONSTRAINTS, Constraint, ConstraintReport, dos_hazard, constraint_mask, valid_parameter_sets, violated_constraints
+from duplication_models.dead_dimensions import DEAD_DIMENSION_PARAMETERS, dead_dimensions, unidentifiable_parameters, first_finite_parameter_set
+from duplication_models.grid_search import RESULT_HEADER, LEADERBOARD_HEADER, shard_range, switch_sweep, ParameterGrid, TensorGridSearch, CollapsedGridSearch, survival_table, SurvivalTableCache, write_result_files, leaderboard_csv_rows
+from duplication_models.parallel import parallel_grid_search
+from duplication_models.simplex import SIMPLEX_STEP, simplex_lattice, simplex_parameter_grid, simplex_pratio, SimplexGridSearch
+from duplication_models.refine import REFINE_METHODS, REFINE_CANDIDATES, MAX_FUNCTION_EVALUATIONS, INFEASIBLE_SUM_OF_SQUARES, START_RTOL, REFINED_HEADER, ModelObjective, RefinementResult, refine_row, refine_leaderboard
+from duplication_models.zoom import ZOOM_LEVELS, ZOOM_THRESHOLD, ZOOM_BUDGET, ZOOM_MIXTURE_STEP, ZOOM_LOG_HEADER, ZOOM_AXES, midpoint, neighbouring_values, neighbouring_mixtures, ZoomLevel, ZoomSearch
+from duplication_models.sampling import SAMPLING_METHODS, SAMPLING_BATCH_SIZE, SAMPLING_SEED, LOG_SCALE_AXES, SAMPLED_AXES, SampledAxis, simplex_weights, SamplingReport, SamplingSearch
+from duplication_models.checkpoint import CHECKPOINT_INTERVAL, CHECKPOINT_FORMAT, checkpoint_fingerprint, Checkpoint
+from duplication_models.shards import SHARD_FORMAT, parse_shard, shard_file_name, write_shard_result, merge_shard_results
+from duplication_models.shared_tables import SharedArray
+from duplication_models.residuals import RESIDUAL_HEADER, Data_Point, ResidualRow, read_residual_csv
+from duplication_models.scalar_search import ScalarGridSearch
+from duplication_models.presets import MODEL_CATEGORIES, PRESET_GRIDS, observed_data_set, preset_grid
+from duplication_models.metrics import METRICS_INTERVAL, METRICS_PHASES, PhaseTimer, RunMetrics
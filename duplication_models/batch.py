@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Headless batch runner for several model categories
+
+    python -m duplication_models.batch [--config batch.json] [--categories ind 3mix_mut ...]
+
+runs the preset grid search (duplication_models.presets) of every category asked for,
+without prompts, and writes
+    - each category's minimum and leaderboard CSVs, under the names
+      model_selection_03_16_2024.py gives them,
+    - <output>_leaderboard.csv: the leaderboards of all categories in one, ranked by sum
+      of squares across categories (LEADERBOARD_HEADER),
+    - <output>_top_models.csv: the best model of each category in category order, the
+      table residual_calc_model_selection_03_18_2024.py --top-models reads.
+
+A config file is a json object whose keys are the long options with '_' for '-'
+({"categories": ["ind", "alt_non_mut"], "workers": 4}); options given on the command
+line override it.
+
+The survival tables of every category's grid are computed up front into one
+SurvivalTableCache, so a parameter set shared by several grids (the Alt_func grid of
+five of the seven presets, for instance) is computed once. With workers > 1 the
+categories run concurrently in a process pool, largest grid first, each worker given
+the filled cache. Results are those of separate single category runs.
+"""
+
+import argparse
+import csv
+import json
+import time
+from duplication_models.survival import SURVIVAL_ENGINES
+from duplication_models.leaderboard import TOP_K, DELTA_SSR
+from duplication_models.grid_search import RESULT_HEADER, LEADERBOARD_HEADER, CollapsedGridSearch, SurvivalTableCache, write_result_files
+from duplication_models.dead_dimensions import unidentifiable_parameters
+from duplication_models.parallel import _pool_context
+from duplication_models.presets import MODEL_CATEGORIES, observed_data_set, preset_grid
+
+BATCH_OUTPUT = 'model_selection_03_16_2024_coarse_batch'
+TOP_MODELS_HEADER = RESULT_HEADER + ["model_category"]
+
+
+def fill_survival_tables(grids, times, engine='series'):
+    """SurvivalTableCache holding the survival columns of every parameter set of every grid."""
+    survival_tables = SurvivalTableCache()
+    #one computation per category over the union of the grids' parameter sets
+    for parameter_sets in ['alt_parameter_sets', 'dos_parameter_sets', 'non_parameter_sets']:
+        union = []
+        for grid in grids:
+            union.extend(getattr(grid, parameter_sets)())
+        survival_tables.table(list(dict.fromkeys(union)), times, engine)
+    return survival_tables
+
+
+def _search_category(task):
+    model_category, top_k, delta_ssr, prune, engine, survival_tables = task
+    start = time.perf_counter()
+    data_points = observed_data_set()
+    grid, minimum_file_name = preset_grid(model_category)
+    search = CollapsedGridSearch(grid, data_points.t1_set, data_points.t2_set, data_points.observed_pratio_set, engine, survival_tables=survival_tables)
+    leaderboard = search.run(top_k, delta_ssr, prune)
+    summary = {
+        'models': search.number_of_models,
+        'distinct_models': search.number_of_distinct_models,
+        'seconds': time.perf_counter() - start,
+        'survival_tables': survival_tables.info(),
+    }
+    return model_category, minimum_file_name, leaderboard, summary
+
+
+def run_batch(categories, top_k=TOP_K, delta_ssr=DELTA_SSR, prune=False, workers=1, engine='series', progress=None):
+    """{category: (minimum file name, Leaderboard, summary)} of the preset search of every category."""
+    data_points = observed_data_set()
+    grids = [preset_grid(model_category)[0] for model_category in categories]
+    survival_tables = fill_survival_tables(grids, data_points.times, engine)
+    #largest grid first so the longest search is not the last one started
+    sizes = {model_category: len(grid.alt_parameter_sets())*len(grid.dos_parameter_sets())*len(grid.non_parameter_sets())*len(grid.mixtures())*len(grid.switches) for model_category, grid in zip(categories, grids)}
+    tasks = [(model_category, top_k, delta_ssr, prune, engine, survival_tables) for model_category in sorted(categories, key=lambda model_category: -sizes[model_category])]
+    results = {}
+    if workers > 1 and len(tasks) > 1:
+        with _pool_context().Pool(min(workers, len(tasks))) as pool:
+            for model_category, minimum_file_name, leaderboard, summary in pool.imap_unordered(_search_category, tasks):
+                results[model_category] = (minimum_file_name, leaderboard, summary)
+                if progress is not None:
+                    progress(model_category, summary)
+    else:
+        for task in tasks:
+            model_category, minimum_file_name, leaderboard, summary = _search_category(task)
+            results[model_category] = (minimum_file_name, leaderboard, summary)
+            if progress is not None:
+                progress(model_category, summary)
+    return results
+
+
+def combined_leaderboard_rows(results, categories):
+    """Leaderboard rows of every category in the LEADERBOARD_HEADER layout, ranked across categories."""
+    rows = []
+    for each_category, model_category in enumerate(categories):
+        minimum_file_name, leaderboard, summary = results[model_category]
+        for row in leaderboard.rows():
+            rows.append((row[1], each_category, row[0], model_category, row))
+    #ties broken by category order, then model_identifier
+    rows.sort(key=lambda entry: entry[:3])
+    combined = []
+    for rank, (sum_of_squares, each_category, model_identifier, model_category, row) in enumerate(rows):
+        unidentifiable = unidentifiable_parameters(row[14], row[15], row[16], [row[17]])
+        combined.append(list(row) + [rank + 1, sum_of_squares - rows[0][0], model_category, " ".join(unidentifiable)])
+    return combined
+
+
+def top_model_rows(results, categories):
+    """Best model of each category with a valid model, in TOP_MODELS_HEADER layout."""
+    rows = []
+    for model_category in categories:
+        best = results[model_category][1].best()
+        if best is not None:
+            rows.append(list(best) + [model_category])
+    return rows
+
+
+def write_batch_files(output, results, categories):
+    for model_category in categories:
+        minimum_file_name, leaderboard, summary = results[model_category]
+        write_result_files(minimum_file_name, leaderboard, model_category)
+    with open(output + '_leaderboard.csv', 'w+', newline='') as leaderboard_file:
+        writer = csv.writer(leaderboard_file, delimiter=',')
+        writer.writerow(LEADERBOARD_HEADER)
+        for row in combined_leaderboard_rows(results, categories):
+            writer.writerow(row)
+    with open(output + '_top_models.csv', 'w+', newline='') as top_models_file:
+        writer = csv.writer(top_models_file, delimiter=',')
+        writer.writerow(TOP_MODELS_HEADER)
+        for row in top_model_rows(results, categories):
+            writer.writerow(row)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the preset grid search of several model categories without prompts and write their results, a combined leaderboard and the top model table")
+    parser.add_argument('--config', default=None, help="json file of option values, e.g. {\"categories\": [\"ind\", \"3mix_mut\"], \"workers\": 4}; command line options override it")
+    parser.add_argument('--categories', nargs='+', choices=MODEL_CATEGORIES, default=MODEL_CATEGORIES, help="model categories to search (default all seven)")
+    parser.add_argument('--workers', type=int, default=1, help="number of categories searched at the same time (default 1)")
+    parser.add_argument('--top-k', type=int, default=TOP_K, help="number of best models kept in each category's leaderboard (default %(default)s)")
+    parser.add_argument('--delta-ssr', type=float, default=DELTA_SSR, help="also keep every model within this sum of squares of its category's best (default %(default)s)")
+    parser.add_argument('--prune', action='store_true', help="stop summing a model's squared residuals once it can no longer make the leaderboard (same results, fewer evaluations)")
+    parser.add_argument('--survival-engine', choices=SURVIVAL_ENGINES, default='series', help="survival engine (default %(default)s)")
+    parser.add_argument('--output', default=BATCH_OUTPUT, help="start of the combined leaderboard and top model file names (default %(default)s)")
+    return parser
+
+
+def parse_arguments(argv=None):
+    parser = build_parser()
+    config_arguments, remaining = parser.parse_known_args(argv)
+    if config_arguments.config is not None:
+        with open(config_arguments.config) as config_file:
+            config = json.load(config_file)
+        known = {action.dest for action in parser._actions}
+        unknown = sorted(set(config) - known)
+        if unknown:
+            parser.error("unknown keys in " + config_arguments.config + ": " + ", ".join(unknown))
+        parser.set_defaults(**config)
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.categories) - set(MODEL_CATEGORIES))
+    if unknown:
+        parser.error("unknown model categories: " + ", ".join(unknown))
+    #in category order, each once
+    args.categories = [model_category for model_category in MODEL_CATEGORIES if model_category in args.categories]
+    return args
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    start = time.perf_counter()
+    def print_progress(model_category, summary):
+        print(model_category + ": " + str(summary['distinct_models']) + " of " + str(summary['models']) + " models evaluated in " + str(round(summary['seconds'], 2)) + " s")
+    results = run_batch(args.categories, args.top_k, args.delta_ssr, args.prune, args.workers, args.survival_engine, print_progress)
+    write_batch_files(args.output, results, args.categories)
+    for row in top_model_rows(results, args.categories):
+        print("best " + row[-1] + " model " + str(row[0]) + ": sum of squares " + str(row[1]))
+    print("wrote " + args.output + "_leaderboard.csv and " + args.output + "_top_models.csv in " + str(round(time.perf_counter() - start, 2)) + " s")
+
+
+if __name__ == '__main__':
+    main()
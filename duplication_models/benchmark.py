@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the survival kernel, the pratio and the grid search engines
+
+    python -m duplication_models.benchmark --output baseline.json
+    python -m duplication_models.benchmark --compare baseline.json [--threshold 0.2]
+
+times
+    survival/points=N         calculate_probability_of_survival_of_duplicate_gene_copy_by_time
+                              at the t1 and t2 of N data points, one call each
+    survival_table/points=N   survival_table of the 3mix_mut Alt_func grid at those times
+    pratio_2d/points=N        calculate_pratio_2d of N data points x PRATIO_MODELS models
+    expected_pratio/points=N  calculate_expected_pratio at each of N data points
+    grid_search/<category>    the preset search of each category, CollapsedGridSearch,
+                              from 'ind' up to '3mix_mut'
+    scalar_grid_search/<category>  ScalarGridSearch of the categories with at most
+                              SCALAR_MODEL_LIMIT models
+    grid_search_points/points=N  the POINTS_CATEGORY preset search at N data points
+
+over data sets of 11 (the observed data set) to 10000 points; the points past the
+observed ones are drawn with a fixed seed (synthetic_data_set). Each benchmark is run
+at least `repeats` times after its inputs are built, and until its runs add up to
+BENCHMARK_MIN_SECONDS so that millisecond benchmarks get enough runs, and the fastest
+run is kept, the usual estimate of the time without interference from the rest of
+the machine.
+
+--output writes the results as json, with the data sizes and categories they were run
+with; --compare runs exactly the benchmarks of a saved file, with its data sizes and
+categories unless others are given, and flags every benchmark more than --threshold (a
+fraction) slower than it was, and by more than BENCHMARK_NOISE_SECONDS, below which
+timings of the smallest benchmarks are jitter. It exits with status 1 if any is.
+Benchmarks are matched by name, so a comparison is only meaningful between runs on the
+same machine.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from duplication_models.survival import calculate_probability_of_survival_of_duplicate_gene_copy_by_time
+from duplication_models.pratio import calculate_pratio_2d, calculate_expected_pratio
+from duplication_models.dataset import Plants, DataSet
+from duplication_models.grid_search import CollapsedGridSearch, survival_table
+from duplication_models.scalar_search import ScalarGridSearch
+from duplication_models.presets import MODEL_CATEGORIES, observed_data_set, preset_grid
+
+BENCHMARK_FORMAT = 1
+BENCHMARK_REPEATS = 3
+BENCHMARK_MIN_SECONDS = 0.2
+BENCHMARK_THRESHOLD = 0.2
+BENCHMARK_NOISE_SECONDS = 0.002
+BENCHMARK_SEED = 0
+BENCHMARK_DATA_SIZES = [11, 100, 1000, 10000]
+PRATIO_MODELS = 1000
+SCALAR_MODEL_LIMIT = 60000
+POINTS_CATEGORY = 'alt_non_dup'
+
+
+def synthetic_data_set(number_of_points, seed=BENCHMARK_SEED):
+    """The observed data set, then points drawn from its ranges of t1, t2 and pratio, number_of_points in all."""
+    observed = observed_data_set()
+    data_points = observed.data_points[:number_of_points]
+    random = np.random.default_rng(seed)
+    t1_mya = [data_point.t1_mya for data_point in observed.data_points]
+    t2_mya = [data_point.t2_mya for data_point in observed.data_points]
+    for each_point in range(len(data_points), number_of_points):
+        #whole mya, so points share times as the observed ones do
+        t1 = int(random.integers(min(t1_mya), max(t1_mya) + 1))
+        t2 = int(random.integers(min(t2_mya), max(t2_mya) + 1))
+        data_points.append(Plants("synthetic " + str(each_point), t1, t2, float(random.uniform(0.85, 0.97))))
+    return DataSet(data_points)
+
+
+def _survival_setup(data_points):
+    times = data_points.times
+    def run():
+        for each_time in times:
+            calculate_probability_of_survival_of_duplicate_gene_copy_by_time(30, 3, 0.5, 5, each_time)
+    return run, len(times)
+
+
+def _survival_table_setup(data_points):
+    parameter_sets = preset_grid('3mix_mut')[0].alt_parameter_sets()
+    def run():
+        survival_table(parameter_sets, data_points.times)
+    return run, len(parameter_sets)*len(data_points.times)
+
+
+def _pratio_setup(data_points):
+    random = np.random.default_rng(BENCHMARK_SEED)
+    #survival of every category at t1 and t2, [data point, model], t2 below t1
+    st1 = [random.uniform(0.2, 1.0, (len(data_points), PRATIO_MODELS)) for category in range(3)]
+    st2 = [each_st1*random.uniform(0.1, 1.0, each_st1.shape) for each_st1 in st1]
+    mixtures = random.dirichlet([1, 1, 1], PRATIO_MODELS)
+    switches = random.uniform(0, 0.5, PRATIO_MODELS)
+    def run():
+        calculate_pratio_2d(st1[0], st1[1], st1[2], st2[0], st2[1], st2[2], mixtures[:, 0], mixtures[:, 1], mixtures[:, 2], switches)
+    return run, len(data_points)*PRATIO_MODELS
+
+
+def _expected_pratio_setup(data_points):
+    time_pairs = list(zip(data_points.t1_set, data_points.t2_set))
+    def run():
+        for t1, t2 in time_pairs:
+            calculate_expected_pratio(t1, t2, 0.8, 0.1, 0.1, 0.1, 30, 3, 0.5, 5, -12, 0.6, -0.03, 0.03, 0, 1, 10.01, 5)
+    return run, len(time_pairs)
+
+
+def _grid_search_setup(model_category, data_points, search_class=CollapsedGridSearch):
+    grid = preset_grid(model_category)[0]
+    def run():
+        search_class(grid, data_points.t1_set, data_points.t2_set, data_points.observed_pratio_set).run()
+    return run, grid.number_of_models()*len(data_points)
+
+
+def benchmarks(data_sizes=BENCHMARK_DATA_SIZES, categories=MODEL_CATEGORIES):
+    """(name, setup) of every benchmark; setup() builds the inputs and returns (run, items), items being what run evaluates."""
+    listed = []
+    data_sets = {}
+    def data_set(number_of_points):
+        if number_of_points not in data_sets:
+            data_sets[number_of_points] = synthetic_data_set(number_of_points)
+        return data_sets[number_of_points]
+    for number_of_points in data_sizes:
+        for name, setup in [('survival', _survival_setup), ('survival_table', _survival_table_setup), ('pratio_2d', _pratio_setup), ('expected_pratio', _expected_pratio_setup)]:
+            listed.append((name + '/points=' + str(number_of_points), lambda setup=setup, number_of_points=number_of_points: setup(data_set(number_of_points))))
+    #grid sizes from the smallest preset up
+    sizes = {model_category: preset_grid(model_category)[0].number_of_models() for model_category in categories}
+    for model_category in sorted(categories, key=lambda model_category: sizes[model_category]):
+        listed.append(('grid_search/' + model_category, lambda model_category=model_category: _grid_search_setup(model_category, data_set(11))))
+    for model_category in sorted(categories, key=lambda model_category: sizes[model_category]):
+        if sizes[model_category] <= SCALAR_MODEL_LIMIT:
+            listed.append(('scalar_grid_search/' + model_category, lambda model_category=model_category: _grid_search_setup(model_category, data_set(11), ScalarGridSearch)))
+    for number_of_points in data_sizes:
+        listed.append(('grid_search_points/points=' + str(number_of_points), lambda number_of_points=number_of_points: _grid_search_setup(POINTS_CATEGORY, data_set(number_of_points))))
+    return listed
+
+
+def time_benchmark(setup, repeats=BENCHMARK_REPEATS, min_seconds=BENCHMARK_MIN_SECONDS):
+    run, items = setup()
+    seconds = []
+    #at least `repeats` runs, more until they add up to min_seconds
+    while len(seconds) < repeats or sum(seconds) < min_seconds:
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+    best = min(seconds)
+    return {
+        'seconds': best,
+        'median_seconds': float(np.median(seconds)),
+        'repeats': len(seconds),
+        'items': items,
+        'items_per_second': (items/best) if best > 0 else None,
+    }
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_benchmarks(selected=None, repeats=BENCHMARK_REPEATS, data_sizes=BENCHMARK_DATA_SIZES, categories=MODEL_CATEGORIES, progress=None, names=None, min_seconds=BENCHMARK_MIN_SECONDS):
+    """
+    Results of every benchmark whose name contains one of `selected` (all if None), or,
+    given names, of the benchmarks with exactly those names.
+    """
+    results = {}
+    for name, setup in benchmarks(data_sizes, categories):
+        if names is not None and name not in names:
+            continue
+        if selected is not None and not any(part in name for part in selected):
+            continue
+        results[name] = time_benchmark(setup, repeats, min_seconds)
+        if progress is not None:
+            progress(name, results[name])
+    return {'format': BENCHMARK_FORMAT, 'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'environment': environment(), 'data_sizes': list(data_sizes), 'categories': list(categories), 'benchmarks': results}
+
+
+def compare_results(baseline, results, threshold=BENCHMARK_THRESHOLD, noise_seconds=BENCHMARK_NOISE_SECONDS):
+    """(name, baseline seconds, seconds, ratio, status) of every benchmark in both, status 'regression', 'faster' or 'same'."""
+    comparison = []
+    for name, result in results['benchmarks'].items():
+        if name not in baseline['benchmarks']:
+            continue
+        baseline_seconds = baseline['benchmarks'][name]['seconds']
+        ratio = result['seconds']/baseline_seconds if baseline_seconds > 0 else float('inf')
+        if ratio > 1 + threshold and result['seconds'] - baseline_seconds > noise_seconds:
+            status = 'regression'
+        elif ratio < 1/(1 + threshold) and baseline_seconds - result['seconds'] > noise_seconds:
+            status = 'faster'
+        else:
+            status = 'same'
+        comparison.append((name, baseline_seconds, result['seconds'], ratio, status))
+    return comparison
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Time the survival kernel, pratio and grid search engines, save the results or compare them with saved ones")
+    parser.add_argument('--output', default=None, help="write the results to this json file")
+    parser.add_argument('--compare', default=None, help="compare the results with this json file of an earlier run and exit with status 1 on a regression")
+    parser.add_argument('--threshold', type=float, default=BENCHMARK_THRESHOLD, help="fraction slower than the baseline that counts as a regression (default %(default)s)")
+    parser.add_argument('--noise-seconds', type=float, default=BENCHMARK_NOISE_SECONDS, help="differences smaller than this many seconds are never flagged (default %(default)s)")
+    parser.add_argument('--repeats', type=int, default=BENCHMARK_REPEATS, help="least runs of each benchmark, the fastest is kept (default %(default)s)")
+    parser.add_argument('--min-seconds', type=float, default=BENCHMARK_MIN_SECONDS, help="keep running a benchmark until its runs add up to this many seconds (default %(default)s)")
+    parser.add_argument('--data-sizes', type=int, nargs='+', default=None, help="numbers of data points (default " + str(BENCHMARK_DATA_SIZES) + ", or those of the --compare file)")
+    parser.add_argument('--categories', nargs='+', choices=MODEL_CATEGORIES, default=None, help="preset grids of the grid search benchmarks (default all, or those of the --compare file)")
+    parser.add_argument('--select', nargs='+', default=None, help="only run the benchmarks whose name contains one of these, e.g. survival grid_search/ind")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    baseline = None
+    names = None
+    data_sizes = BENCHMARK_DATA_SIZES
+    categories = MODEL_CATEGORIES
+    if args.compare is not None:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('format') != BENCHMARK_FORMAT:
+            sys.exit(args.compare + " is not a benchmark file of format " + str(BENCHMARK_FORMAT))
+        #exactly the benchmarks of the baseline, at its data sizes and categories
+        names = set(baseline['benchmarks'])
+        data_sizes = baseline.get('data_sizes', data_sizes)
+        categories = baseline.get('categories', categories)
+    if args.data_sizes is not None:
+        data_sizes = args.data_sizes
+    if args.categories is not None:
+        categories = args.categories
+    def print_result(name, result):
+        print(name + ": " + format(result['seconds'], '.6f') + " s, " + format(result['items_per_second'] or 0, '.4g') + " items/s, " + str(result['repeats']) + " runs")
+    results = run_benchmarks(args.select, args.repeats, data_sizes, categories, print_result, names, args.min_seconds)
+    if args.output is not None:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=1)
+        print("wrote " + args.output)
+    if baseline is not None:
+        comparison = compare_results(baseline, results, args.threshold, args.noise_seconds)
+        for name, baseline_seconds, seconds, ratio, status in comparison:
+            print(name + ": " + format(baseline_seconds, '.6f') + " s -> " + format(seconds, '.6f') + " s (x" + format(ratio, '.3f') + ") " + status)
+        regressions = [name for name, baseline_seconds, seconds, ratio, status in comparison if status == 'regression']
+        not_run = sorted(set(baseline['benchmarks']) - set(results['benchmarks']))
+        if not_run:
+            print("not run: " + ", ".join(not_run))
+        if baseline['environment'] != results['environment']:
+            print("the baseline was measured in a different environment: " + json.dumps(baseline['environment']))
+        if regressions:
+            print(str(len(regressions)) + " regressions beyond " + str(args.threshold) + ": " + ", ".join(regressions))
+            sys.exit(1)
+        print("no regressions beyond " + str(args.threshold))
+
+
+if __name__ == '__main__':
+    main()
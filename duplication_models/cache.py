@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Survival memoization for the grid search
+
+Survival of a category depends only on its own (b, c, d, f) and the time, yet the
+grid search asks for it again for every combination of the other categories,
+mixtures and switches. SurvivalCache keeps the survival of each parameter tuple at
+every data point time, bounded with least recently used eviction, and counts hits
+and misses. Data points sharing a time share the survival computed for it.
+"""
+
+from collections import OrderedDict
+from duplication_models.survival import N_MAX, survival_probability
+from duplication_models.dataset import unique_time_index
+
+SURVIVAL_CACHE_SIZE = 4096
+
+
+class SurvivalCache:
+    def __init__(self, times, maxsize=SURVIVAL_CACHE_SIZE, engine='series', n_max=N_MAX, tolerance=None, term_histogram=None):
+        self.times = list(times)
+        self.unique_times, self.time_index = unique_time_index(self.times)
+        self.maxsize = maxsize
+        self.engine = engine
+        self.n_max = n_max
+        self.tolerance = tolerance
+        self.term_histogram = term_histogram
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, b, c, d, f):
+        """Survival at every time in self.times, as a list, for parameters (b, c, d, f)."""
+        key = (b, c, d, f)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        entry = survival_probability(b, c, d, f, self.unique_times, self.engine, self.n_max, self.tolerance, self.term_histogram)[self.time_index].tolist()
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def info(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits/lookups) if lookups else 0.0,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
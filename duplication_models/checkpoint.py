@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoints of long grid searches
+
+A Checkpoint records how far a run got: the ranges of the enumeration each search has
+finished (pairs of a tensor grid search, Alt_func parameter sets of the scalar loop,
+samples of a sampling search), the rows of the leaderboards it is filling and values
+such as the next model_identifier. save_if_due writes it at most every `interval`
+seconds, to a temporary file that then replaces the checkpoint, so a crash while
+writing leaves the previous checkpoint whole.
+
+A resumed run loads the checkpoint, puts the saved rows back into its leaderboards and
+skips the finished ranges. Leaderboards are the same whatever order rows arrive in, so
+the results are those of an uninterrupted run. The checkpoint carries a fingerprint of
+the model category, grid and settings, and one from a different run is refused.
+Pruning statistics and the learned data point order are not saved, they only describe
+and speed up the session that made them.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+CHECKPOINT_INTERVAL = 600
+CHECKPOINT_FORMAT = 1
+
+
+def checkpoint_fingerprint(settings):
+    """Hash of the json of a dict of everything that decides a run's results."""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _merged_ranges(ranges):
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return merged
+
+
+class Checkpoint:
+    def __init__(self, path, fingerprint, interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.interval = interval
+        #finished [first, last) ranges of each enumeration, by name
+        self.completed = {}
+        #rows of each leaderboard, by name, until they are tracked again
+        self.saved_rows = {}
+        self.values = {}
+        self.resumed = False
+        self._leaderboards = {}
+        self._last_save = time.monotonic()
+
+    def load(self):
+        """Read the checkpoint file if there is one; True if the run resumes from it."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as checkpoint_file:
+            state = json.load(checkpoint_file)
+        if state.get('format') != CHECKPOINT_FORMAT or state.get('fingerprint') != self.fingerprint:
+            raise ValueError(self.path + " is a checkpoint of a different grid or settings, remove it to start over")
+        self.completed = {name: [list(each_range) for each_range in ranges] for name, ranges in state['completed'].items()}
+        self.saved_rows = state['leaderboards']
+        self.values = state['values']
+        self.resumed = True
+        return True
+
+    def track(self, name, leaderboard):
+        """Save leaderboard under name from now on, after adding the rows saved under that name."""
+        for row in self.saved_rows.pop(name, []):
+            leaderboard.add(row)
+        self._leaderboards[name] = leaderboard
+        return leaderboard
+
+    def untrack(self, name):
+        self._leaderboards.pop(name, None)
+
+    def uncovered(self, name, first, last):
+        """Sub-ranges of [first, last) not finished yet."""
+        ranges = []
+        for done_first, done_last in self.completed.get(name, []):
+            if done_last <= first or done_first >= last:
+                continue
+            if done_first > first:
+                ranges.append((first, done_first))
+            first = max(first, done_last)
+        if first < last:
+            ranges.append((first, last))
+        return ranges
+
+    def finished(self, name, first=0):
+        """End of the finished range of an enumeration that starts at first, first if there is none."""
+        for done_first, done_last in self.completed.get(name, []):
+            if done_first <= first < done_last:
+                return done_last
+        return first
+
+    def complete(self, name, first, last):
+        self.completed[name] = _merged_ranges(self.completed.get(name, []) + [[first, last]])
+
+    def save(self):
+        state = {
+            'format': CHECKPOINT_FORMAT,
+            'fingerprint': self.fingerprint,
+            'completed': self.completed,
+            'leaderboards': dict(self.saved_rows, **{name: leaderboard.rows() for name, leaderboard in self._leaderboards.items()}),
+            'values': self.values,
+        }
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'w') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary_path, self.path)
+        self._last_save = time.monotonic()
+
+    def save_if_due(self):
+        if time.monotonic() - self._last_save >= self.interval:
+            self.save()
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter constraints of the survival categories
+
+The model selection docstring gives each category's allowed survival parameters:
+    Alt_func: b > 0, c > 0, d > 0, f > 0
+    Dos: b < 0, 0 < c <= 1, f = -d, hazard f*exp(-b*0.02^c + d) < 0.1
+    Non: b = 0, c = 1, d > 10, f anything
+Each rule is a Constraint evaluated on arrays of b, c, d and f, so a category's
+parameter sets are checked all at once. valid_parameter_sets keeps the sets that pass
+every rule, in the order given, and a ConstraintReport counts the sets each rule
+removed (a set is counted against the first rule it breaks).
+"""
+
+import math
+import numpy as np
+
+#Dos parameter sets need a hazard below DOS_HAZARD_LIMIT at t = DOS_HAZARD_TIME
+DOS_HAZARD_TIME = 0.02
+DOS_HAZARD_LIMIT = 0.1
+
+
+def dos_hazard(b_dos, c_dos, d_dos, f_dos):
+    llambda = f_dos * math.exp((-b_dos*(DOS_HAZARD_TIME**c_dos)) + d_dos)
+    return llambda
+
+
+def dos_hazard_array(b_dos, c_dos, d_dos, f_dos):
+    with np.errstate(over='ignore', invalid='ignore'):
+        return f_dos * np.exp((-b_dos*(DOS_HAZARD_TIME**c_dos)) + d_dos)
+
+
+class Constraint:
+    def __init__(self, description, parameters, test):
+        self.description = description
+        #which of 'b', 'c', 'd', 'f' the rule reads
+        self.parameters = parameters
+        self.test = test
+
+    def holds(self, b, c, d, f):
+        return np.broadcast_to(np.asarray(self.test(b, c, d, f), dtype=bool), np.shape(b))
+
+
+ALT_FUNC_CONSTRAINTS = [
+    Constraint("b > 0", "b", lambda b, c, d, f: b > 0),
+    Constraint("c > 0", "c", lambda b, c, d, f: c > 0),
+    Constraint("d > 0", "d", lambda b, c, d, f: d > 0),
+    Constraint("f > 0", "f", lambda b, c, d, f: f > 0),
+]
+DOS_CONSTRAINTS = [
+    Constraint("b < 0", "b", lambda b, c, d, f: b < 0),
+    Constraint("0 < c <= 1", "c", lambda b, c, d, f: (c > 0) & (c <= 1)),
+    Constraint("f = -d", "df", lambda b, c, d, f: f == -d),
+    Constraint("hazard at t = " + str(DOS_HAZARD_TIME) + " < " + str(DOS_HAZARD_LIMIT), "bcdf", lambda b, c, d, f: dos_hazard_array(b, c, d, f) < DOS_HAZARD_LIMIT),
+]
+NON_CONSTRAINTS = [
+    Constraint("b = 0", "b", lambda b, c, d, f: b == 0),
+    Constraint("c = 1", "c", lambda b, c, d, f: c == 1),
+    Constraint("d > 10", "d", lambda b, c, d, f: d > 10),
+]
+CATEGORY_CONSTRAINTS = {'Alt_func': ALT_FUNC_CONSTRAINTS, 'Dos': DOS_CONSTRAINTS, 'Non': NON_CONSTRAINTS}
+
+
+class ConstraintReport:
+    def __init__(self, category, candidates):
+        self.category = category
+        self.candidates = candidates
+        self.removed = []
+        self.valid = candidates
+
+    def summary(self):
+        removed = ", ".join(description + ": " + str(count) for description, count in self.removed)
+        return self.category + ": " + str(self.valid) + " of " + str(self.candidates) + " parameter sets valid (removed by " + removed + ")"
+
+
+def constraint_mask(category, parameter_sets):
+    """True for each (b, c, d, f) set meeting every constraint of the category, and the ConstraintReport."""
+    parameter_sets = list(parameter_sets)
+    report = ConstraintReport(category, len(parameter_sets))
+    values = np.array(parameter_sets, dtype=float).reshape(-1, 4)
+    b, c, d, f = values.T
+    remaining = np.ones(len(parameter_sets), dtype=bool)
+    for constraint in CATEGORY_CONSTRAINTS[category]:
+        holds = constraint.holds(b, c, d, f)
+        report.removed.append((constraint.description, int(np.count_nonzero(remaining & ~holds))))
+        remaining = remaining & holds
+    report.valid = int(np.count_nonzero(remaining))
+    return remaining, report
+
+
+def valid_parameter_sets(category, parameter_sets):
+    """The (b, c, d, f) sets that meet every constraint of the category, in order, and the ConstraintReport."""
+    parameter_sets = list(parameter_sets)
+    remaining, report = constraint_mask(category, parameter_sets)
+    #the original values, not floats, so ints like b = 5 are written out as before
+    return [parameter_sets[each_set] for each_set in np.flatnonzero(remaining)], report
+
+
+def violated_constraints(category, b=None, c=None, d=None, f=None):
+    """Descriptions of the category's rules that the given parameter values break; rules reading a parameter left as None are skipped."""
+    given = {'b': b, 'c': c, 'd': d, 'f': f}
+    violated = []
+    for constraint in CATEGORY_CONSTRAINTS[category]:
+        if any(given[parameter] is None for parameter in constraint.parameters):
+            continue
+        values = [np.array([math.nan if given[parameter] is None else float(given[parameter])]) for parameter in 'bcdf']
+        if not constraint.holds(*values)[0]:
+            violated.append(constraint.description)
+    return violated
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Observed data points
+
+Each data point is a species pair with a t1 and t2 in million years (mya), converted to
+substitutions per site with the substitution rate of its lineage (Fish or Plants), and
+the observed pratio. DataSet collects the data points in order and keeps a
+deduplicated index of their times: several pairs share a (t1, t2), so survival only
+needs computing at each unique time and can then be scattered back to the data points.
+"""
+
+import numpy as np
+
+
+class Fish:
+    def __init__(self, name, t1_mya, t2_mya, observed_pratio):
+        self.name = name
+        self.t1_mya = t1_mya
+        self.t2_mya = t2_mya
+        self.observed_pratio = observed_pratio
+        self.t1 = self.calculate_t(self.t1_mya)
+        self.t2 = self.calculate_t(self.t2_mya) 
+    def calculate_t(self, t_mya):
+        fish_substitution_per_year = 0.00000000413 #BMC Genomics, Fu et al 2010
+        t = (t_mya * 1000000 * fish_substitution_per_year)
+        return(t)        
+
+    
+class Plants:
+    def __init__(self, name, t1_mya, t2_mya, observed_pratio):
+        self.name = name
+        self.t1_mya = t1_mya
+        self.t2_mya = t2_mya
+        self.observed_pratio = observed_pratio
+        self.t1 = self.calculate_t(t1_mya)
+        self.t2 = self.calculate_t(t2_mya)  
+    def calculate_t(self, t_mya):
+        plant_substitution_per_year = 0.000000006 #PNAS Wolfe et al 1987, PNAS Schultz et al 1999
+        t = (t_mya * 1000000 * plant_substitution_per_year)
+        return(t)        
+
+
+def unique_time_index(times):
+    """Unique times in order of first appearance, and the position of each time among them."""
+    unique_times = []
+    position = {}
+    time_index = []
+    for each_time in times:
+        if each_time not in position:
+            position[each_time] = len(unique_times)
+            unique_times.append(each_time)
+        time_index.append(position[each_time])
+    return unique_times, np.array(time_index, dtype=np.intp)
+
+
+class DataSet:
+    def __init__(self, data_points):
+        self.data_points = list(data_points)
+        self.names = [data_point.name for data_point in self.data_points]
+        self.t1_set = [data_point.t1 for data_point in self.data_points]
+        self.t2_set = [data_point.t2 for data_point in self.data_points]
+        self.observed_pratio_set = [data_point.observed_pratio for data_point in self.data_points]
+        #t1 of every data point, then t2 of every data point: the row layout of the survival tables
+        self.times = self.t1_set + self.t2_set
+        self.unique_times, self.time_index = unique_time_index(self.times)
+
+    def __len__(self):
+        return len(self.data_points)
+
+    def scatter(self, unique_survival):
+        """Rows at the unique times (axis 0) to rows at self.times."""
+        return np.asarray(unique_survival)[self.time_index]
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Parameters that can not change the pratio of a mixture
+
+With alt_func_percent = 0 every Alt_func term of calculate_pratio_2d is 0, so the
+Alt_func parameters and the switch drop out; the same goes for the Dos parameters when
+dos_percent = 0, and for the Non parameters when non_percent = 0 and no Alt_func gene
+switches to Non. Along such a dead dimension every parameter set with finite survival
+gives the same pratio, bit for bit, and the parameters of that dimension can not be
+identified from the data. grid_search.CollapsedGridSearch evaluates one representative
+set of each dead dimension: the first with finite survival at every time.
+"""
+
+import numpy as np
+
+DEAD_DIMENSION_PARAMETERS = {
+    'Alt_func': ["b_alt_func", "c_alt_func", "d_alt_func", "f_alt_func"],
+    'Dos': ["b_dos", "c_dos", "d_dos", "f_dos"],
+    'Non': ["b_non", "c_non", "d_non", "f_non"],
+    'switch': ["percent_switch"],
+}
+
+
+def dead_dimensions(alt_func_percent, dos_percent, non_percent, switches):
+    """Categories (and 'switch') whose parameters can not change the pratio of this mixture."""
+    dead = []
+    if alt_func_percent == 0:
+        dead.append('Alt_func')
+    if dos_percent == 0:
+        dead.append('Dos')
+    if non_percent == 0 and all(switch == 0 for switch in switches):
+        dead.append('Non')
+    if alt_func_percent == 0:
+        dead.append('switch')
+    return dead
+
+
+def unidentifiable_parameters(alt_func_percent, dos_percent, non_percent, switches):
+    parameters = []
+    for dimension in dead_dimensions(alt_func_percent, dos_percent, non_percent, switches):
+        parameters = parameters + DEAD_DIMENSION_PARAMETERS[dimension]
+    return parameters
+
+
+def first_finite_parameter_set(survival_table):
+    """Column of the first parameter set with finite survival at every time, None if there is none."""
+    finite = np.flatnonzero(np.all(np.isfinite(survival_table), axis=0))
+    if finite.size == 0:
+        return None
+    return int(finite[0])
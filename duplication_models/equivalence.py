@@ -0,0 +1,469 @@
+# -*- coding: utf-8 -*-
+"""
+Reference equivalence of the optimized engines with the original scalar arithmetic
+
+    python -m duplication_models.equivalence [--engines tensor simplex ...] [--ulps 0] [--rtol 0]
+
+The oracle is the original scripts' code, their survival series and calculate_pratio_2d
+copied here word for word, on python ints and floats one time at a time; residual =
+observed - expected, and the sum of squares of a model accumulated as
+abs(residual)*abs(residual) in data point order. Every engine is compared with it in
+three checks:
+    pratio     expected pratio and residual of SAMPLES models drawn from the valid
+               parameter sets, mixtures and switches of every preset, at every data
+               point (what residual_calc writes), and the pratio surface over the
+               t1 x t2 time grid of the parameter space script for SURFACE_MODELS of them
+    residuals  the same for the models of a top model table (--top-models, the layout
+               residual_calc and the batch runner write), when one is given
+    minimum    leaderboards of GRIDS_PER_CATEGORY sub grids of every preset, up to
+               VALUES_PER_AXIS values drawn from each of its value lists: the best row
+               must be the same model, every model of the oracle's top_k must be on the
+               engine's leaderboard, and sums of squares are compared
+The engines, in ENGINES:
+    tensor       survival_table and calculate_pratio_2d broadcast, CollapsedGridSearch
+    tensor_full  TensorGridSearch without collapsing (same pratio as tensor)
+    simplex      simplex_pratio, CollapsedGridSearch of SimplexGridSearch
+    gamma        the gamma closed form survival engine
+    scalar       calculate_pratio_over_switches, ScalarGridSearch
+tensor, tensor_full and scalar do the oracle's float operations in the same order and
+agree with it to the bit, hence the default --ulps 0 and --rtol 0. simplex rearranges
+the pratio and gamma is the exact integral the truncated series approximates; they
+are only checked when asked for, with a tolerance.
+
+A value passes if it is within --ulps units in the last place of the oracle's or
+within --rtol of it relatively; two nans, or equal infinities, are equal. For every
+check and engine the report gives the values compared, the failures and the worst
+deviation, in ulps, relative and absolute, with where it occurs. The exit status is 1
+if any check of any engine fails.
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+import numpy as np
+from duplication_models.pratio import calculate_pratio_over_switches
+from duplication_models.pratio import calculate_pratio_2d as vectorized_pratio_2d
+from duplication_models.simplex import simplex_pratio, SimplexGridSearch
+from duplication_models.leaderboard import Leaderboard
+from duplication_models.grid_search import RESULT_HEADER, ParameterGrid, TensorGridSearch, CollapsedGridSearch, survival_table
+from duplication_models.scalar_search import ScalarGridSearch
+from duplication_models.presets import MODEL_CATEGORIES, PRESET_GRIDS, observed_data_set, preset_grid
+
+ENGINES = ('tensor', 'tensor_full', 'simplex', 'gamma', 'scalar')
+DEFAULT_ENGINES = ('tensor', 'tensor_full', 'scalar')
+CHECKS = ('pratio', 'residuals', 'minimum')
+EQUIVALENCE_ULPS = 0
+EQUIVALENCE_RTOL = 0.0
+EQUIVALENCE_SEED = 0
+SAMPLES = 200
+SURFACE_MODELS = 5
+GRIDS_PER_CATEGORY = 3
+VALUES_PER_AXIS = 2
+EQUIVALENCE_TOP_K = 10
+
+#t1 and t2 of the parameter space script's pratio surface, accumulated as it does
+SURFACE_TIME_POINTS = 99
+
+
+#The oracle, copied word for word from model_selection_03_16_2024.py as it was before
+#duplication_models existed: python ints and floats throughout. It is not imported from
+#the package, so a change there cannot move the reference along with it.
+def calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b, c, d, f, time):  
+    summation = 0
+    n_max = 100
+    for n in range(0,n_max):
+        nfac = math.factorial(n)
+        beta = (((-b)**n)*(time**((c*n)+1)))/((c*n*nfac) + nfac)
+        summation = summation + beta
+        # print("summation: " + str(summation))
+    survival_probability = math.exp(-d*time - f*summation)
+    return survival_probability
+    
+def calculate_pratio_2d(st1_alt_func, st1_dos, st1_non, st2_alt_func, st2_dos, st2_non, alt_func_percent, dos_percent, non_percent, alt_switch_percent):    
+    alt_ret =  (2*alt_func_percent*st1_alt_func)
+    alt_ret_ret_switch = alt_ret*st2_non *alt_switch_percent
+    alt_ret_ret_noswitch = alt_ret*st2_alt_func * (1-alt_switch_percent)
+    dos_ret = (2*dos_percent*st1_dos)
+    dos_ret_ret = dos_ret * st2_dos   
+    non_ret = (2*non_percent*st1_non)
+    non_ret_ret = non_ret * st2_non
+    alt_noret = ((1-st1_alt_func)*alt_func_percent)
+    alt_noret_ret = alt_noret * st2_alt_func
+    dos_noret = ((1-st1_dos)*dos_percent)
+    dos_noret_ret = dos_noret * st2_dos    
+    non_noret = ((1-st1_non)*non_percent)
+    non_noret_ret = non_noret * st2_non
+    pratio = ((alt_ret_ret_noswitch + alt_ret_ret_switch + dos_ret_ret + non_ret_ret)/(alt_noret_ret + dos_noret_ret + non_noret_ret)) * ((alt_noret + dos_noret + non_noret)/(alt_ret + dos_ret + non_ret))                                 
+    return pratio
+
+
+def surface_times(time_points=SURFACE_TIME_POINTS):
+    time_grid = []
+    each_t = 0.01
+    for i in range(0, time_points):
+        time_grid.append(each_t)
+        each_t = each_t+0.01
+    return time_grid
+
+
+def _original_survival():
+    """survival_at(parameters, time) of the oracle, each (parameters, time) computed once."""
+    survival = {}
+    def survival_at(parameters, time):
+        key = (parameters, time)
+        if key not in survival:
+            b, c, d, f = parameters
+            #a value the original arithmetic cannot compute (the scripts stopped on it) is nan
+            try:
+                survival[key] = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b, c, d, f, time)
+            except (ZeroDivisionError, OverflowError):
+                survival[key] = math.nan
+        return survival[key]
+    return survival_at
+
+
+def _original_pratio(survival_at, alt_parameters, dos_parameters, non_parameters, alt, dos, non, switch, t1, t2):
+    try:
+        return calculate_pratio_2d(survival_at(alt_parameters, t1), survival_at(dos_parameters, t1), survival_at(non_parameters, t1), survival_at(alt_parameters, t2), survival_at(dos_parameters, t2), survival_at(non_parameters, t2), alt, dos, non, switch)
+    except (ZeroDivisionError, OverflowError):
+        return math.nan
+
+
+def _ordered_integers(values):
+    #float64 bit patterns as integers that order like the floats, -0.0 and 0.0 both 0
+    integers = np.asarray(values, dtype=np.float64).view(np.int64)
+    return np.where(integers < 0, np.iinfo(np.int64).min - integers, integers)
+
+
+def ulp_distance(expected, actual):
+    """Units in the last place between two float64 arrays, 0 for two nans or equal values, inf for one nan."""
+    expected = np.asarray(expected, dtype=np.float64)
+    actual = np.asarray(actual, dtype=np.float64)
+    expected_integers = _ordered_integers(expected)
+    actual_integers = _ordered_integers(actual)
+    same_sign = (expected_integers < 0) == (actual_integers < 0)
+    with np.errstate(over='ignore'):
+        #same sign: the difference fits in int64, otherwise add the two distances to zero as floats
+        distance = np.where(same_sign, np.abs(np.where(same_sign, expected_integers - actual_integers, 0)).astype(np.float64), np.abs(expected_integers.astype(np.float64)) + np.abs(actual_integers.astype(np.float64)))
+    expected_nan = np.isnan(expected)
+    actual_nan = np.isnan(actual)
+    distance = np.where(expected_nan | actual_nan, np.inf, distance)
+    distance = np.where((expected_nan & actual_nan) | (expected == actual), 0.0, distance)
+    return distance
+
+
+class Deviation:
+    """Worst deviation of an engine from the oracle over every value added."""
+    def __init__(self, max_ulps=EQUIVALENCE_ULPS, rtol=EQUIVALENCE_RTOL):
+        self.max_ulps = max_ulps
+        self.rtol = rtol
+        self.compared = 0
+        self.failures = 0
+        self.mismatches = []
+        self.worst_ulps = 0.0
+        self.worst_relative = 0.0
+        self.worst_absolute = 0.0
+        self.worst_location = None
+        self.worst_expected = None
+        self.worst_actual = None
+
+    def add(self, expected, actual, location):
+        """Compare arrays of values; location(index) describes where the value at a flat index comes from."""
+        expected = np.asarray(expected, dtype=np.float64).reshape(-1)
+        actual = np.asarray(actual, dtype=np.float64).reshape(-1)
+        if expected.size == 0:
+            return
+        ulps = ulp_distance(expected, actual)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            absolute = np.abs(actual - expected)
+            relative = np.where(ulps == 0, 0.0, absolute/np.abs(expected))
+        absolute = np.where(ulps == 0, 0.0, absolute)
+        relative = np.where(np.isnan(relative), np.inf, relative)
+        passed = (ulps <= self.max_ulps) | (relative <= self.rtol)
+        self.compared += expected.size
+        self.failures += int(np.count_nonzero(~passed))
+        worst = int(np.argmax(ulps))
+        if ulps[worst] > self.worst_ulps or self.worst_location is None:
+            self.worst_ulps = float(ulps[worst])
+            self.worst_relative = float(relative[worst])
+            self.worst_absolute = float(np.nan_to_num(absolute[worst], nan=np.inf))
+            self.worst_location = location(worst)
+            self.worst_expected = float(expected[worst])
+            self.worst_actual = float(actual[worst])
+
+    def mismatch(self, description):
+        """A difference that is not a value, such as a different best model."""
+        self.failures += 1
+        self.mismatches.append(description)
+
+    def passed(self):
+        return self.failures == 0
+
+    def summary(self):
+        return {
+            'compared': self.compared,
+            'failures': self.failures,
+            'worst_ulps': self.worst_ulps,
+            'worst_relative': self.worst_relative,
+            'worst_absolute': self.worst_absolute,
+            'worst_expected': self.worst_expected,
+            'worst_actual': self.worst_actual,
+            'worst_location': self.worst_location,
+            'mismatches': self.mismatches[:10],
+        }
+
+
+def _model_parameters(row):
+    #(Alt_func, Dos, Non parameter sets, mixture, switch) of a RESULT_HEADER row
+    return tuple(row[2:6]), tuple(row[6:10]), tuple(row[10:14]), tuple(row[14:17]), row[17]
+
+
+def _model_location(row):
+    return {'model_identifier': row[0], 'alt': list(row[2:6]), 'dos': list(row[6:10]), 'non': list(row[10:14]), 'mixture': list(row[14:17]), 'switch': row[17]}
+
+
+def oracle_pratio(models, t1_set, t2_set):
+    """[model, point] expected pratio the original scripts compute."""
+    survival_at = _original_survival()
+    pratios = []
+    for row in models:
+        alt_parameters, dos_parameters, non_parameters, (alt, dos, non), switch = _model_parameters(row)
+        model_pratios = []
+        for t1, t2 in zip(t1_set, t2_set):
+            model_pratios.append(_original_pratio(survival_at, alt_parameters, dos_parameters, non_parameters, alt, dos, non, switch, t1, t2))
+        pratios.append(model_pratios)
+    return np.array(pratios, dtype=np.float64).reshape(len(models), len(t1_set))
+
+
+def engine_pratio(engine, models, t1_set, t2_set):
+    """[model, point] expected pratio of an engine."""
+    times = list(t1_set) + list(t2_set)
+    number_of_points = len(t1_set)
+    survival_engine = 'gamma' if engine == 'gamma' else 'series'
+    tables = []
+    indices = []
+    for category in range(3):
+        parameter_sets = [_model_parameters(row)[category] for row in models]
+        unique_sets = list(dict.fromkeys(parameter_sets))
+        with np.errstate(all='ignore'):
+            tables.append(survival_table(unique_sets, times, survival_engine))
+        position = {parameters: each_set for each_set, parameters in enumerate(unique_sets)}
+        indices.append(np.array([position[parameters] for parameters in parameter_sets], dtype=np.intp))
+    #[model, t1 then t2 of every point]
+    alt_survival, dos_survival, non_survival = [table[:, index].T for table, index in zip(tables, indices)]
+    mixtures = np.array([row[14:17] for row in models], dtype=np.float64).reshape(len(models), 3)
+    switches = np.array([row[17] for row in models], dtype=np.float64)
+    n = number_of_points
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if engine == 'scalar':
+            return np.array([np.asarray(calculate_pratio_over_switches(alt_survival[each_model, :n], dos_survival[each_model, :n], non_survival[each_model, :n], alt_survival[each_model, n:], dos_survival[each_model, n:], non_survival[each_model, n:], mixtures[each_model, 0], mixtures[each_model, 1], mixtures[each_model, 2], [switches[each_model]]))[:, 0] for each_model in range(len(models))]).reshape(len(models), n)
+        pratio_function = simplex_pratio if engine == 'simplex' else vectorized_pratio_2d
+        return pratio_function(alt_survival[:, :n], dos_survival[:, :n], non_survival[:, :n], alt_survival[:, n:], dos_survival[:, n:], non_survival[:, n:], mixtures[:, 0:1], mixtures[:, 1:2], mixtures[:, 2:3], switches[:, None])
+
+
+def sample_models(model_category, count, random):
+    """RESULT_HEADER rows of `count` models drawn from the valid parameter sets, mixtures and switches of a preset."""
+    grid = preset_grid(model_category)[0]
+    alt_sets = grid.alt_parameter_sets()
+    dos_sets = grid.dos_parameter_sets()
+    non_sets = grid.non_parameter_sets()
+    mixtures = grid.mixtures()
+    if not (alt_sets and dos_sets and non_sets and mixtures):
+        return []
+    models = []
+    for each_model in range(count):
+        alt_parameters = alt_sets[random.integers(len(alt_sets))]
+        dos_parameters = dos_sets[random.integers(len(dos_sets))]
+        non_parameters = non_sets[random.integers(len(non_sets))]
+        mixture = mixtures[random.integers(len(mixtures))]
+        switch = grid.switches[random.integers(len(grid.switches))]
+        models.append([each_model, None] + list(alt_parameters) + list(dos_parameters) + list(non_parameters) + list(mixture) + [switch])
+    return models
+
+
+def _number(value):
+    #ints stay ints, as the scripts wrote them: the original arithmetic treats 5 and 5.0 differently
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def read_top_models(file_name):
+    """RESULT_HEADER rows of a top model table."""
+    models = []
+    with open(file_name) as top_models_file:
+        for row in csv.DictReader(top_models_file):
+            models.append([_number(row[column]) for column in RESULT_HEADER])
+    return models
+
+
+def compare_pointwise(engine, models, t1_set, t2_set, deviation, observed_pratio_set=None, description=None):
+    """Add the engine's expected pratio (and residual, given the observed pratios) of the models to deviation."""
+    if len(models) == 0:
+        return
+    expected = oracle_pratio(models, t1_set, t2_set)
+    actual = engine_pratio(engine, models, t1_set, t2_set)
+    number_of_points = len(t1_set)
+    def location(quantity):
+        def at(index):
+            each_model, each_point = divmod(index, number_of_points)
+            return dict(_model_location(models[each_model]), quantity=quantity, t1=t1_set[each_point], t2=t2_set[each_point], point=each_point, sample=description)
+        return at
+    deviation.add(expected, actual, location('expected_pratio'))
+    if observed_pratio_set is not None:
+        observed = np.array(observed_pratio_set, dtype=np.float64)
+        deviation.add(observed - expected, observed - actual, location('residual'))
+
+
+def sampled_grid(model_category, values_per_axis, random):
+    """ParameterGrid of up to values_per_axis values of each of a preset's value lists, in preset order."""
+    preset = PRESET_GRIDS[model_category]
+    def some(values, limit=values_per_axis):
+        chosen = sorted(random.choice(len(values), size=min(limit, len(values)), replace=False))
+        return [values[each_value] for each_value in chosen]
+    mixtures = some(list(zip(preset['alts'], preset['doses'], preset['nons'])), values_per_axis + 1)
+    return ParameterGrid([mixture[0] for mixture in mixtures], [mixture[1] for mixture in mixtures], [mixture[2] for mixture in mixtures], some(preset['switches']), some(preset['b_alt_funcs']), some(preset['c_alt_funcs']), some(preset['d_alt_funcs']), some(preset['f_alt_funcs']), some(preset['b_doses']), some(preset['c_doses']), some(preset['d_doses']), some(preset['d_nons']), some(preset['f_nons']))
+
+
+def oracle_leaderboard(grid, t1_set, t2_set, observed_pratio_set, top_k=EQUIVALENCE_TOP_K, delta_ssr=0.0):
+    """Leaderboard of every model of the grid, summed as the original nested loops did."""
+    survival_at = _original_survival()
+    leaderboard = Leaderboard(top_k, delta_ssr)
+    model_identifier = 0
+    for alt_parameters in grid.alt_parameter_sets():
+        for dos_parameters in grid.dos_parameter_sets():
+            for non_parameters in grid.non_parameter_sets():
+                for alt, dos, non in grid.mixtures():
+                    for switch in grid.switches:
+                        sum_of_squares_counter = 0
+                        for t1, t2, observed_pratio in zip(t1_set, t2_set, observed_pratio_set):
+                            expected_pratio = _original_pratio(survival_at, alt_parameters, dos_parameters, non_parameters, alt, dos, non, switch, t1, t2)
+                            residual = observed_pratio - expected_pratio
+                            absolute_value_residual = abs(residual)
+                            sum_of_squares_counter = (absolute_value_residual*absolute_value_residual) + sum_of_squares_counter
+                        #invalid models, nan or inf, are never a minimum
+                        if math.isfinite(sum_of_squares_counter) and sum_of_squares_counter <= leaderboard.threshold():
+                            leaderboard.add([model_identifier, sum_of_squares_counter] + list(alt_parameters) + list(dos_parameters) + list(non_parameters) + [alt, dos, non, switch])
+                        model_identifier = model_identifier+1
+    return leaderboard
+
+
+def engine_leaderboard(engine, grid, t1_set, t2_set, observed_pratio_set, top_k=EQUIVALENCE_TOP_K, delta_ssr=0.0):
+    if engine == 'scalar':
+        return ScalarGridSearch(grid, t1_set, t2_set, observed_pratio_set).run(top_k, delta_ssr)
+    if engine == 'tensor_full':
+        return TensorGridSearch(grid, t1_set, t2_set, observed_pratio_set).run(top_k, delta_ssr)
+    with np.errstate(all='ignore'):
+        if engine == 'simplex':
+            search = CollapsedGridSearch(grid, t1_set, t2_set, observed_pratio_set, search_class=SimplexGridSearch)
+        else:
+            search = CollapsedGridSearch(grid, t1_set, t2_set, observed_pratio_set, 'gamma' if engine == 'gamma' else 'series')
+        return search.run(top_k, delta_ssr)
+
+
+def compare_minimum(engine, grid, t1_set, t2_set, observed_pratio_set, deviation, description, oracle=None, top_k=EQUIVALENCE_TOP_K):
+    """Add the engine's leaderboard of the grid, against the oracle's, to deviation."""
+    if oracle is None:
+        oracle = oracle_leaderboard(grid, t1_set, t2_set, observed_pratio_set, top_k)
+    leaderboard = engine_leaderboard(engine, grid, t1_set, t2_set, observed_pratio_set, top_k)
+    oracle_rows = oracle.rows()[:top_k]
+    engine_rows = {row[0]: row for row in leaderboard.rows() if math.isfinite(row[1])}
+    oracle_best = oracle.best()
+    engine_best = leaderboard.best() if leaderboard.best() is not None and math.isfinite(leaderboard.best()[1]) else None
+    if (oracle_best is None) != (engine_best is None) or (oracle_best is not None and oracle_best[0] != engine_best[0]):
+        deviation.mismatch({'sample': description, 'best_model': None if oracle_best is None else oracle_best[0], 'engine_best_model': None if engine_best is None else engine_best[0]})
+    compared = [row for row in oracle_rows if row[0] in engine_rows]
+    for row in oracle_rows:
+        if row[0] not in engine_rows:
+            deviation.mismatch({'sample': description, 'missing_model': row[0], 'sum_of_squares': row[1]})
+    deviation.add([row[1] for row in compared], [engine_rows[row[0]][1] for row in compared], lambda index: dict(_model_location(compared[index]), quantity='sum_of_squares', sample=description))
+    return oracle
+
+
+def run_checks(engines=DEFAULT_ENGINES, checks=CHECKS, categories=MODEL_CATEGORIES, samples=SAMPLES, surface_models=SURFACE_MODELS, grids_per_category=GRIDS_PER_CATEGORY, values_per_axis=VALUES_PER_AXIS, max_ulps=EQUIVALENCE_ULPS, rtol=EQUIVALENCE_RTOL, seed=EQUIVALENCE_SEED, top_models=None, data_points=None, progress=None):
+    """{check: {engine: Deviation}} of every check and engine."""
+    if data_points is None:
+        data_points = observed_data_set()
+    t1_set, t2_set, observed_pratio_set = data_points.t1_set, data_points.t2_set, data_points.observed_pratio_set
+    deviations = {check: {engine: Deviation(max_ulps, rtol) for engine in engines} for check in checks}
+    random = np.random.default_rng(seed)
+    if 'pratio' in checks:
+        surface = surface_times()
+        surface_t1 = [t1 for t1 in surface for t2 in surface]
+        surface_t2 = [t2 for t1 in surface for t2 in surface]
+        for model_category in categories:
+            models = sample_models(model_category, samples, random)
+            for engine in engines:
+                compare_pointwise(engine, models, t1_set, t2_set, deviations['pratio'][engine], observed_pratio_set, model_category + ' data points')
+                compare_pointwise(engine, models[:surface_models], surface_t1, surface_t2, deviations['pratio'][engine], None, model_category + ' surface')
+            if progress is not None:
+                progress('pratio', model_category)
+    if 'residuals' in checks and top_models is not None:
+        models = read_top_models(top_models)
+        for engine in engines:
+            compare_pointwise(engine, models, t1_set, t2_set, deviations['residuals'][engine], observed_pratio_set, top_models)
+        if progress is not None:
+            progress('residuals', top_models)
+    if 'minimum' in checks:
+        for model_category in categories:
+            for each_grid in range(grids_per_category):
+                grid = sampled_grid(model_category, values_per_axis, random)
+                description = model_category + ' sub grid ' + str(each_grid)
+                oracle = oracle_leaderboard(grid, t1_set, t2_set, observed_pratio_set)
+                for engine in engines:
+                    compare_minimum(engine, grid, t1_set, t2_set, observed_pratio_set, deviations['minimum'][engine], description, oracle)
+            if progress is not None:
+                progress('minimum', model_category)
+    return deviations
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Compare the optimized engines with the original scalar arithmetic and report the worst deviations")
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(DEFAULT_ENGINES), help="engines to compare (default %(default)s)")
+    parser.add_argument('--checks', nargs='+', choices=CHECKS, default=list(CHECKS), help="checks to run (default all; residuals needs --top-models)")
+    parser.add_argument('--categories', nargs='+', choices=MODEL_CATEGORIES, default=MODEL_CATEGORIES, help="presets the models and sub grids are drawn from (default all)")
+    parser.add_argument('--ulps', type=float, default=EQUIVALENCE_ULPS, help="units in the last place a value may differ by (default %(default)s)")
+    parser.add_argument('--rtol', type=float, default=EQUIVALENCE_RTOL, help="relative difference a value may have instead (default %(default)s)")
+    parser.add_argument('--samples', type=int, default=SAMPLES, help="models drawn from each preset for the pratio check (default %(default)s)")
+    parser.add_argument('--surface-models', type=int, default=SURFACE_MODELS, help="of those, models also compared over the pratio surface (default %(default)s)")
+    parser.add_argument('--grids', type=int, default=GRIDS_PER_CATEGORY, help="sub grids of each preset for the minimum check (default %(default)s)")
+    parser.add_argument('--values-per-axis', type=int, default=VALUES_PER_AXIS, help="values drawn from each value list of a sub grid (default %(default)s)")
+    parser.add_argument('--seed', type=int, default=EQUIVALENCE_SEED, help="seed of the samples (default %(default)s)")
+    parser.add_argument('--top-models', default=None, help="top model table for the residuals check, e.g. top_model_selection_03_16_2024_coarse_sum_of_squares.csv")
+    parser.add_argument('--output', default=None, help="also write the report as json to this file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    def print_progress(check, name):
+        print(check + ": " + name + " done")
+    deviations = run_checks(args.engines, args.checks, args.categories, args.samples, args.surface_models, args.grids, args.values_per_axis, args.ulps, args.rtol, args.seed, args.top_models, progress=print_progress)
+    report = {check: {engine: deviation.summary() for engine, deviation in by_engine.items()} for check, by_engine in deviations.items()}
+    failed = []
+    for check, by_engine in deviations.items():
+        for engine, deviation in by_engine.items():
+            summary = deviation.summary()
+            if summary['compared'] == 0 and not summary['mismatches']:
+                continue
+            status = 'ok' if deviation.passed() else 'FAILED'
+            print(check + " " + engine + ": " + status + ", " + str(summary['failures']) + " of " + str(summary['compared']) + " values outside tolerance, worst " + str(summary['worst_ulps']) + " ulps (relative " + str(summary['worst_relative']) + ", absolute " + str(summary['worst_absolute']) + ") at " + json.dumps(summary['worst_location'], default=str))
+            for mismatch in summary['mismatches']:
+                print("    " + json.dumps(mismatch, default=str))
+            if not deviation.passed():
+                failed.append(check + " " + engine)
+    if args.output is not None:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=1, default=str)
+        print("wrote " + args.output)
+    if failed:
+        print("not equivalent within " + str(args.ulps) + " ulps or relative " + str(args.rtol) + ": " + ", ".join(failed))
+        sys.exit(1)
+    print("every engine equivalent within " + str(args.ulps) + " ulps or relative " + str(args.rtol))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,537 @@
+# -*- coding: utf-8 -*-
+"""
+Tensorized grid search over a model category's parameter grid
+
+The nested loops of model_selection enumerate, in this order,
+    Alt_func (b, c, d, f) x valid Dos (b, c, d) x Non (d, f) x mixture x switch
+and number every combination with model_identifier. TensorGridSearch computes the
+survival of each category once, as a table of [category parameter sets x (t1, t2 of
+every data point)], then evaluates calculate_pratio_2d and the sum of squared
+residuals for the Cartesian product by broadcasting. The product is walked in chunks
+of (Alt_func, Dos) pairs so memory stays bounded. Model identifiers, and the minimum
+row the loops would write, are unchanged. run() returns a Leaderboard of the best
+models; its best() row is that minimum. With prune=True, chunks evaluated after the
+leaderboard fills are branch and bound searched (see duplication_models.pruning).
+
+CollapsedGridSearch groups the mixtures by their dead dimensions (see
+duplication_models.dead_dimensions) and runs one TensorGridSearch per group with each
+dead category reduced to its representative parameter set (search_class can be a
+TensorGridSearch subclass such as simplex.SimplexGridSearch). The representative is the
+set with the smallest model_identifier among the models it stands for, so the best
+model is the one the full enumeration finds, and the leaderboard lists each distinct
+model once. The sub searches take their survival tables from a SurvivalTableCache
+filled by the full grid; searches of several grids can share one cache.
+
+shard(i, M) restricts either search to the i-th of M contiguous ranges of pairs (of
+every group), so separate processes can search a grid between them and their
+leaderboards be merged (see duplication_models.shards).
+"""
+
+import csv
+import itertools
+import math
+import numpy as np
+from duplication_models.survival import N_MAX, survival_probability
+from duplication_models.pratio import calculate_pratio_2d
+from duplication_models.metrics import PhaseTimer
+from duplication_models.dataset import unique_time_index
+from duplication_models.leaderboard import TOP_K, DELTA_SSR, Leaderboard
+from duplication_models.pruning import DataPointOrder, PruningStatistics, pruning_limit
+from duplication_models.constraints import valid_parameter_sets
+from duplication_models.dead_dimensions import dead_dimensions, unidentifiable_parameters, first_finite_parameter_set
+from duplication_models.parallel import parallel_grid_search
+from duplication_models.shared_tables import SharedArray
+
+#elements of the [data points x pairs x Non x mixtures x switches] pratio tensor per chunk
+MAX_CHUNK_ELEMENTS = 2000000
+
+RESULT_HEADER = ["model_number", "sum_of_squared_residuals", "b_alt_func", "c_alt_func", "d_alt_func", "f_alt_func", "b_dos", "c_dos", "d_dos", "f_dos", "b_non", "c_non", "d_non", "f_non", "alt_percent", "dos_percent", "non_percent", "percent_switch"]
+LEADERBOARD_HEADER = RESULT_HEADER + ["rank", "delta_sum_of_squared_residuals", "model_category", "unidentifiable_parameters"]
+
+
+def shard_range(number, shard, shards):
+    """[first, last) of shard `shard` (0 to shards - 1) of `shards` contiguous shards of range(number)."""
+    return number*shard//shards, number*(shard + 1)//shards
+
+
+def switch_sweep(step):
+    """Switch values from 0 to 1 in steps of step."""
+    divisions = int(round(1/step))
+    return [each_switch/divisions for each_switch in range(divisions + 1)]
+
+
+class ParameterGrid:
+    """
+    Parameter value lists of one model category, as the model selection presets give them.
+    The *_parameter_sets methods keep only the sets meeting the category constraints and
+    record what each constraint removed in constraint_reports.
+    """
+    def __init__(self, alts, doses, nons, switches, b_alt_funcs, c_alt_funcs, d_alt_funcs, f_alt_funcs, b_doses, c_doses, d_doses, d_nons, f_nons, number_of_percent_combos=None):
+        self.alts = list(alts)
+        self.doses = list(doses)
+        self.nons = list(nons)
+        self.switches = list(switches)
+        self.b_alt_funcs = list(b_alt_funcs)
+        self.c_alt_funcs = list(c_alt_funcs)
+        self.d_alt_funcs = list(d_alt_funcs)
+        self.f_alt_funcs = list(f_alt_funcs)
+        self.b_doses = list(b_doses)
+        self.c_doses = list(c_doses)
+        self.d_doses = list(d_doses)
+        self.d_nons = list(d_nons)
+        self.f_nons = list(f_nons)
+        if number_of_percent_combos is None:
+            number_of_percent_combos = len(self.alts)
+        self.number_of_percent_combos = number_of_percent_combos
+        self.constraint_reports = {}
+
+    def _valid_parameter_sets(self, category, parameter_sets):
+        parameter_sets, self.constraint_reports[category] = valid_parameter_sets(category, parameter_sets)
+        return parameter_sets
+
+    def alt_parameter_sets(self):
+        return self._valid_parameter_sets('Alt_func', itertools.product(self.b_alt_funcs, self.c_alt_funcs, self.d_alt_funcs, self.f_alt_funcs))
+
+    def dos_parameter_sets(self):
+        #f = -d
+        return self._valid_parameter_sets('Dos', [(b_dos, c_dos, d_dos, -1*d_dos) for b_dos, c_dos, d_dos in itertools.product(self.b_doses, self.c_doses, self.d_doses)])
+
+    def non_parameter_sets(self):
+        return self._valid_parameter_sets('Non', [(0, 1, d_non, f_non) for d_non, f_non in itertools.product(self.d_nons, self.f_nons)])
+
+    def mixtures(self):
+        return list(zip(self.alts, self.doses, self.nons))[:self.number_of_percent_combos]
+
+    def number_of_models(self):
+        """Models a search of the grid enumerates, counted without computing any survival."""
+        return len(self.alt_parameter_sets())*len(self.dos_parameter_sets())*len(self.non_parameter_sets())*len(self.mixtures())*len(self.switches)
+
+
+def survival_table(parameter_sets, times, engine='series', n_max=N_MAX, tolerance=None, term_histogram=None):
+    """Survival at every time (rows) for every parameter set (columns), computed once per unique time."""
+    if len(parameter_sets) == 0:
+        return np.empty((len(times), 0))
+    b = [parameters[0] for parameters in parameter_sets]
+    c = [parameters[1] for parameters in parameter_sets]
+    d = [parameters[2] for parameters in parameter_sets]
+    f = [parameters[3] for parameters in parameter_sets]
+    unique_times, time_index = unique_time_index(times)
+    return survival_probability(b, c, d, f, np.reshape(unique_times, (-1, 1)), engine, n_max, tolerance, term_histogram)[time_index]
+
+
+class SurvivalTableCache:
+    """
+    Survival columns of every parameter set seen, by engine settings and times. table()
+    only computes the columns it has not seen, so searches over grids that share a
+    category's parameter values, and the sub searches of a CollapsedGridSearch, share
+    one computation. A series column is the same whichever other parameter sets it was
+    computed with; a gamma column computed alone goes through numpy's scalar pow rather
+    than the vectorized one, which can differ in the last bit.
+    """
+    def __init__(self):
+        self._columns = {}
+        self.hits = 0
+        self.misses = 0
+
+    def table(self, parameter_sets, times, engine='series', n_max=N_MAX, tolerance=None, term_histogram=None):
+        """survival_table(parameter_sets, times, ...) from the cached columns."""
+        columns = self._columns.setdefault((engine, n_max, tolerance, tuple(times)), {})
+        parameter_sets = [tuple(parameters) for parameters in parameter_sets]
+        missing = [parameters for parameters in dict.fromkeys(parameter_sets) if parameters not in columns]
+        if missing:
+            missing_table = survival_table(missing, times, engine, n_max, tolerance, term_histogram)
+            for each_set, parameters in enumerate(missing):
+                columns[parameters] = missing_table[:, each_set]
+        self.misses += len(missing)
+        self.hits += len(parameter_sets) - len(missing)
+        if len(parameter_sets) == 0:
+            return np.empty((len(times), 0))
+        return np.column_stack([columns[parameters] for parameters in parameter_sets])
+
+    def __len__(self):
+        return sum(len(columns) for columns in self._columns.values())
+
+    def info(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': (self.hits/lookups) if lookups else 0.0, 'size': len(self)}
+
+
+class TensorGridSearch:
+    def __init__(self, grid, t1_set, t2_set, observed_pratio_set, engine='series', n_max=N_MAX, tolerance=None, term_histogram=None, max_chunk_elements=MAX_CHUNK_ELEMENTS, survival_tables=None):
+        self.grid = grid
+        self.alt_parameter_sets = grid.alt_parameter_sets()
+        self.dos_parameter_sets = grid.dos_parameter_sets()
+        self.non_parameter_sets = grid.non_parameter_sets()
+        self.mixtures = grid.mixtures()
+        self.switches = list(grid.switches)
+        self.number_of_points = len(observed_pratio_set)
+        self.observed_pratio = np.array(observed_pratio_set, dtype=float)
+        times = list(t1_set) + list(t2_set)
+        #seconds spent in survival, pratio and reduction, for RunMetrics
+        self.phase_timer = PhaseTimer()
+        #[t1 of every data point, then t2 of every data point] x parameter sets, from a SurvivalTableCache when given one
+        table = survival_table if survival_tables is None else survival_tables.table
+        with self.phase_timer.phase('survival'):
+            self.alt_table = table(self.alt_parameter_sets, times, engine, n_max, tolerance, term_histogram)
+            self.dos_table = table(self.dos_parameter_sets, times, engine, n_max, tolerance, term_histogram)
+            self.non_table = table(self.non_parameter_sets, times, engine, n_max, tolerance, term_histogram)
+        self.models_per_pair = len(self.non_parameter_sets)*len(self.mixtures)*len(self.switches)
+        self.number_of_pairs = len(self.alt_parameter_sets)*len(self.dos_parameter_sets)
+        self.number_of_models = self.number_of_pairs*self.models_per_pair
+        self.pairs_per_chunk = max(1, max_chunk_elements//max(1, self.models_per_pair*self.number_of_points))
+        #broadcast layout: [data point, pair, Non, mixture, switch]
+        n = self.number_of_points
+        self._non_t1 = self.non_table[:n, None, :, None, None]
+        self._non_t2 = self.non_table[n:, None, :, None, None]
+        mixtures = np.array(self.mixtures, dtype=float).reshape(-1, 3)
+        self._alt_percent = mixtures[:, 0][None, None, None, :, None]
+        self._dos_percent = mixtures[:, 1][None, None, None, :, None]
+        self._non_percent = mixtures[:, 2][None, None, None, :, None]
+        self._switch = np.array(self.switches, dtype=float)[None, None, None, None, :]
+        self.data_point_order = DataPointOrder(n)
+        self.pruning_statistics = PruningStatistics()
+        #pairs this process searches, all of them unless the grid is split into shards
+        self.shard_pairs = (0, self.number_of_pairs)
+        #survival tables moved to shared memory, by attribute name
+        self._shared_tables = {}
+
+    def share_tables(self):
+        """Move the survival tables into shared memory, so pickling the search for a worker process sends their names and not their data."""
+        for name in ['alt_table', 'dos_table', 'non_table']:
+            if name not in self._shared_tables:
+                self._shared_tables[name] = SharedArray(getattr(self, name))
+        self._attach_tables()
+
+    def _attach_tables(self):
+        for name, shared_array in self._shared_tables.items():
+            setattr(self, name, shared_array.array)
+        n = self.number_of_points
+        self._non_t1 = self.non_table[:n, None, :, None, None]
+        self._non_t2 = self.non_table[n:, None, :, None, None]
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        if self._shared_tables:
+            for name in list(self._shared_tables) + ['_non_t1', '_non_t2']:
+                del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._shared_tables:
+            self._attach_tables()
+
+    def shard(self, shard, shards):
+        self.shard_pairs = shard_range(self.number_of_pairs, shard, shards)
+
+    def chunks(self, first_pair=None, last_pair=None, pairs_per_chunk=None):
+        if first_pair is None:
+            first_pair = self.shard_pairs[0]
+        if last_pair is None:
+            last_pair = self.shard_pairs[1]
+        if pairs_per_chunk is None:
+            pairs_per_chunk = self.pairs_per_chunk
+        for chunk_start in range(first_pair, last_pair, pairs_per_chunk):
+            yield chunk_start, min(chunk_start + pairs_per_chunk, last_pair)
+
+    def pratio(self, first_pair, last_pair):
+        """Expected pratio, [data point, pair, Non, mixture, switch], for pairs [first_pair, last_pair)."""
+        pairs = np.arange(first_pair, last_pair)
+        each_alt, each_dos = np.divmod(pairs, len(self.dos_parameter_sets))
+        n = self.number_of_points
+        alt_survival = self.alt_table[:, each_alt][:, :, None, None, None]
+        dos_survival = self.dos_table[:, each_dos][:, :, None, None, None]
+        with np.errstate(divide='ignore', invalid='ignore'), self.phase_timer.phase('pratio'):
+            pratio = calculate_pratio_2d(alt_survival[:n], dos_survival[:n], self._non_t1, alt_survival[n:], dos_survival[n:], self._non_t2, self._alt_percent, self._dos_percent, self._non_percent, self._switch)
+        return pratio
+
+    def sum_of_squares(self, first_pair, last_pair, data_point_order=None):
+        """Sum of squared residuals of every model of pairs [first_pair, last_pair), in model_identifier order."""
+        pratio = self.pratio(first_pair, last_pair)
+        sum_of_squares_counter = np.zeros(pratio.shape[1:])
+        #accumulated one data point at a time, in the same order as the loops
+        for each_data_point in range(self.number_of_points):
+            residual = self.observed_pratio[each_data_point] - pratio[each_data_point]
+            squared_residual = residual*residual
+            sum_of_squares_counter = squared_residual + sum_of_squares_counter
+            if data_point_order is not None:
+                data_point_order.squared_residual_totals[each_data_point] += np.nansum(np.where(np.isinf(squared_residual), 0.0, squared_residual))
+        if data_point_order is not None:
+            data_point_order.models += sum_of_squares_counter.size
+        return sum_of_squares_counter.reshape(-1)
+
+    def _model_indices(self, first_pair, models):
+        """Alt_func, Dos, Non, mixture and switch index of models numbered from the first model of first_pair."""
+        pair, within_pair = np.divmod(models, self.models_per_pair)
+        each_non, within_non = np.divmod(within_pair, len(self.mixtures)*len(self.switches))
+        each_one, each_switch = np.divmod(within_non, len(self.switches))
+        each_alt, each_dos = np.divmod(pair + first_pair, len(self.dos_parameter_sets))
+        return each_alt, each_dos, each_non, each_one, each_switch
+
+    def squared_residual_of_models(self, each_data_point, model_indices):
+        """Squared residual at one data point of the models with these (Alt_func, Dos, Non, mixture, switch) indices."""
+        each_alt, each_dos, each_non, each_one, each_switch = model_indices
+        n = self.number_of_points
+        mixtures = self._alt_percent.reshape(-1), self._dos_percent.reshape(-1), self._non_percent.reshape(-1)
+        #elementwise the same operations as the broadcast in pratio, so the same floats
+        with np.errstate(divide='ignore', invalid='ignore'), self.phase_timer.phase('pratio'):
+            pratio = calculate_pratio_2d(self.alt_table[each_data_point, each_alt], self.dos_table[each_data_point, each_dos], self.non_table[each_data_point, each_non], self.alt_table[n + each_data_point, each_alt], self.dos_table[n + each_data_point, each_dos], self.non_table[n + each_data_point, each_non], mixtures[0][each_one], mixtures[1][each_one], mixtures[2][each_one], self._switch.reshape(-1)[each_switch])
+        residual = self.observed_pratio[each_data_point] - pratio
+        return residual*residual
+
+    def pruned_sum_of_squares(self, first_pair, last_pair, threshold, data_point_order=None, statistics=None):
+        """
+        Sum of squares of the models of pairs [first_pair, last_pair) that can be at or
+        below threshold, inf for the models pruned.
+        """
+        if data_point_order is None:
+            data_point_order = self.data_point_order
+        if statistics is None:
+            statistics = self.pruning_statistics
+        number_of_models = (last_pair - first_pair)*self.models_per_pair
+        limit = pruning_limit(threshold)
+        candidates = np.arange(number_of_models)
+        partial_sum_of_squares = np.zeros(number_of_models)
+        point_evaluations = 0
+        for each_data_point in data_point_order.order:
+            if candidates.size == 0:
+                break
+            squared_residual = self.squared_residual_of_models(each_data_point, self._model_indices(first_pair, candidates))
+            point_evaluations += candidates.size
+            partial_sum_of_squares = squared_residual + partial_sum_of_squares
+            #nan never makes the leaderboard either
+            survivors = partial_sum_of_squares <= limit
+            candidates = candidates[survivors]
+            partial_sum_of_squares = partial_sum_of_squares[survivors]
+        #the survivors' sum of squares again in data point order, as the exhaustive search adds it up
+        sum_of_squares = np.full(number_of_models, np.inf)
+        sum_of_squares_counter = np.zeros(candidates.size)
+        model_indices = self._model_indices(first_pair, candidates)
+        for each_data_point in range(self.number_of_points):
+            squared_residual = self.squared_residual_of_models(each_data_point, model_indices)
+            sum_of_squares_counter = squared_residual + sum_of_squares_counter
+            data_point_order.squared_residual_totals[each_data_point] += np.nansum(np.where(np.isinf(squared_residual), 0.0, squared_residual))
+        data_point_order.models += candidates.size
+        sum_of_squares[candidates] = sum_of_squares_counter
+        statistics.models_evaluated += number_of_models
+        statistics.models_pruned += number_of_models - candidates.size
+        statistics.point_evaluations += point_evaluations
+        statistics.point_evaluations_skipped += number_of_models*self.number_of_points - point_evaluations
+        return sum_of_squares
+
+    def model_indices(self, model_identifier):
+        """(Alt_func, Dos, Non, mixture, switch) index of a model."""
+        pair, within_pair = divmod(model_identifier, self.models_per_pair)
+        each_non, within_non = divmod(within_pair, len(self.mixtures)*len(self.switches))
+        each_one, each_switch = divmod(within_non, len(self.switches))
+        each_alt, each_dos = divmod(pair, len(self.dos_parameter_sets))
+        return each_alt, each_dos, each_non, each_one, each_switch
+
+    def model_identifier(self, each_alt, each_dos, each_non, each_one, each_switch):
+        pair = each_alt*len(self.dos_parameter_sets) + each_dos
+        return pair*self.models_per_pair + (each_non*len(self.mixtures) + each_one)*len(self.switches) + each_switch
+
+    def model_parameters(self, model_identifier):
+        each_alt, each_dos, each_non, each_one, each_switch = self.model_indices(model_identifier)
+        return self.alt_parameter_sets[each_alt], self.dos_parameter_sets[each_dos], self.non_parameter_sets[each_non], self.mixtures[each_one], self.switches[each_switch]
+
+    def model_row(self, model_identifier, sum_of_squares):
+        """Row in the layout of the model selection minimum CSV (RESULT_HEADER)."""
+        alt_parameters, dos_parameters, non_parameters, mixture, switch = self.model_parameters(model_identifier)
+        return [model_identifier, sum_of_squares] + list(alt_parameters) + list(dos_parameters) + list(non_parameters) + list(mixture) + [switch]
+
+    def evaluate(self, first_pair, last_pair, leaderboard, prune=False, threshold=math.inf, data_point_order=None, statistics=None):
+        """
+        Offer every model of pairs [first_pair, last_pair) that can make the leaderboard to it.
+        With prune=True models whose partial sum of squares passes min(threshold,
+        leaderboard.threshold()) are abandoned; threshold is the bound of a leaderboard
+        the rows will be merged into.
+        """
+        #everything but the pratio itself is reduction
+        with self.phase_timer.phase('reduction'):
+            self._evaluate(first_pair, last_pair, leaderboard, prune, threshold, data_point_order, statistics)
+
+    def _evaluate(self, first_pair, last_pair, leaderboard, prune, threshold, data_point_order, statistics):
+        if data_point_order is None:
+            data_point_order = self.data_point_order
+        if statistics is None:
+            statistics = self.pruning_statistics
+        threshold = min(threshold, leaderboard.threshold())
+        if prune and threshold < math.inf:
+            sum_of_squares = self.pruned_sum_of_squares(first_pair, last_pair, threshold, data_point_order, statistics)
+        elif prune:
+            #nothing to prune against yet, this chunk teaches data_point_order instead
+            sum_of_squares = self.sum_of_squares(first_pair, last_pair, data_point_order)
+            statistics.models_evaluated += sum_of_squares.size
+            statistics.point_evaluations += sum_of_squares.size*self.number_of_points
+        else:
+            sum_of_squares = self.sum_of_squares(first_pair, last_pair)
+        if sum_of_squares.size == 0:
+            return
+        #nan never makes the leaderboard
+        sum_of_squares = np.where(np.isnan(sum_of_squares), np.inf, sum_of_squares)
+        #only this chunk's own top_k and rows within delta_ssr of its best can enter
+        k = min(leaderboard.top_k, sum_of_squares.size)
+        kth_smallest = np.partition(sum_of_squares, k - 1)[k - 1]
+        limit = min(threshold, max(kth_smallest, sum_of_squares.min() + leaderboard.delta_ssr))
+        first_model = first_pair*self.models_per_pair
+        for each_model in np.flatnonzero(sum_of_squares <= limit):
+            leaderboard.add(self.model_row(first_model + int(each_model), float(sum_of_squares[each_model])))
+
+    def evaluate_chunks(self, leaderboard, prune=False, threshold=None, checkpoint=None, checkpoint_name='pairs', metrics=None):
+        """evaluate every chunk of pairs, skipping the ranges checkpoint has finished and recording the others."""
+        for first_pair, last_pair in self.chunks():
+            ranges = [(first_pair, last_pair)] if checkpoint is None else checkpoint.uncovered(checkpoint_name, first_pair, last_pair)
+            for first, last in ranges:
+                if prune:
+                    self.data_point_order.refresh()
+                self.evaluate(first, last, leaderboard, prune, math.inf if threshold is None else threshold())
+            if checkpoint is not None:
+                checkpoint.complete(checkpoint_name, first_pair, last_pair)
+                checkpoint.save_if_due()
+            if metrics is not None:
+                evaluated_pairs = sum(last - first for first, last in ranges)
+                metrics.skip((last_pair - first_pair - evaluated_pairs)*self.models_per_pair)
+                metrics.advance(evaluated_pairs*self.models_per_pair)
+
+    def track_metrics(self, metrics):
+        """Count the models of this search's shard in metrics and report its phase seconds."""
+        metrics.expect((self.shard_pairs[1] - self.shard_pairs[0])*self.models_per_pair)
+        metrics.track_phases(self.phase_timer)
+
+    def run(self, top_k=TOP_K, delta_ssr=DELTA_SSR, prune=False, checkpoint=None, metrics=None):
+        """Leaderboard of the grid: its top_k models plus every model within delta_ssr of the best."""
+        leaderboard = Leaderboard(top_k, delta_ssr)
+        if checkpoint is not None:
+            checkpoint.track('leaderboard', leaderboard)
+        if metrics is not None:
+            self.track_metrics(metrics)
+        self.evaluate_chunks(leaderboard, prune, checkpoint=checkpoint, metrics=metrics)
+        return leaderboard
+
+
+class CollapsedGridSearch:
+    def __init__(self, grid, t1_set, t2_set, observed_pratio_set, engine='series', n_max=N_MAX, tolerance=None, term_histogram=None, max_chunk_elements=MAX_CHUNK_ELEMENTS, search_class=TensorGridSearch, survival_tables=None):
+        #the sub searches look up their survival columns among those of the full grid
+        if survival_tables is None:
+            survival_tables = SurvivalTableCache()
+        self.survival_tables = survival_tables
+        #the full grid numbers the models and gives the survival tables the representatives are picked from
+        self.full_search = search_class(grid, t1_set, t2_set, observed_pratio_set, engine, n_max, tolerance, term_histogram, max_chunk_elements, survival_tables)
+        full = self.full_search
+        representatives = {
+            'Alt_func': first_finite_parameter_set(full.alt_table),
+            'Dos': first_finite_parameter_set(full.dos_table),
+            'Non': first_finite_parameter_set(full.non_table),
+            'switch': 0,
+        }
+        groups = {}
+        for each_one, mixture in enumerate(full.mixtures):
+            groups.setdefault(tuple(dead_dimensions(mixture[0], mixture[1], mixture[2], full.switches)), []).append(each_one)
+        #(sub search, full index of each of its Alt_func, Dos, Non, mixture and switch indices)
+        self.searches = []
+        for dead, mixture_indices in groups.items():
+            maps = [list(range(len(full.alt_parameter_sets))), list(range(len(full.dos_parameter_sets))), list(range(len(full.non_parameter_sets))), mixture_indices, list(range(len(full.switches)))]
+            for dimension, position in [('Alt_func', 0), ('Dos', 1), ('Non', 2), ('switch', 4)]:
+                if dimension in dead:
+                    maps[position] = [] if representatives[dimension] is None or len(maps[position]) == 0 else [representatives[dimension]]
+            if any(len(each_map) == 0 for each_map in maps):
+                #no parameter set of a dead category has finite survival: none of these models are valid
+                continue
+            alt_sets = [full.alt_parameter_sets[each_alt] for each_alt in maps[0]]
+            dos_sets = [full.dos_parameter_sets[each_dos] for each_dos in maps[1]]
+            non_sets = [full.non_parameter_sets[each_non] for each_non in maps[2]]
+            mixtures = [full.mixtures[each_one] for each_one in maps[3]]
+            sub_grid = ParameterGrid([mixture[0] for mixture in mixtures], [mixture[1] for mixture in mixtures], [mixture[2] for mixture in mixtures], [full.switches[each_switch] for each_switch in maps[4]], *self._parameter_lists(grid, dead, alt_sets, dos_sets, non_sets))
+            self.searches.append((search_class(sub_grid, t1_set, t2_set, observed_pratio_set, engine, n_max, tolerance, term_histogram, max_chunk_elements, survival_tables), maps))
+        self.number_of_models = full.number_of_models
+        self.number_of_distinct_models = sum(search.number_of_models for search, maps in self.searches)
+        self.pruning_statistics = PruningStatistics()
+
+    @staticmethod
+    def _parameter_lists(grid, dead, alt_sets, dos_sets, non_sets):
+        #value lists of the sub grid: the grid's own for live categories, the representative's for dead ones
+        if 'Alt_func' in dead:
+            alt_lists = [[alt_sets[0][0]], [alt_sets[0][1]], [alt_sets[0][2]], [alt_sets[0][3]]]
+        else:
+            alt_lists = [grid.b_alt_funcs, grid.c_alt_funcs, grid.d_alt_funcs, grid.f_alt_funcs]
+        if 'Dos' in dead:
+            dos_lists = [[dos_sets[0][0]], [dos_sets[0][1]], [dos_sets[0][2]]]
+        else:
+            dos_lists = [grid.b_doses, grid.c_doses, grid.d_doses]
+        if 'Non' in dead:
+            non_lists = [[non_sets[0][2]], [non_sets[0][3]]]
+        else:
+            non_lists = [grid.d_nons, grid.f_nons]
+        return alt_lists + dos_lists + non_lists
+
+    def mixture_report(self):
+        """(mixture, unidentifiable parameters) of every mixture of the grid."""
+        full = self.full_search
+        return [(mixture, unidentifiable_parameters(mixture[0], mixture[1], mixture[2], full.switches)) for mixture in full.mixtures]
+
+    def full_row(self, search, maps, row):
+        """Leaderboard row of a sub search renumbered with the full grid's model_identifier."""
+        indices = search.model_indices(row[0])
+        full_identifier = self.full_search.model_identifier(*[each_map[index] for each_map, index in zip(maps, indices)])
+        return [full_identifier] + list(row[1:])
+
+    def shard(self, shard, shards):
+        """Search only shard `shard` of `shards`: that shard of the pairs of every group."""
+        for search, maps in self.searches:
+            search.shard(shard, shards)
+
+    def run(self, top_k=TOP_K, delta_ssr=DELTA_SSR, prune=False, workers=1, checkpoint=None, metrics=None):
+        leaderboard = Leaderboard(top_k, delta_ssr)
+        if checkpoint is not None:
+            checkpoint.track('leaderboard', leaderboard)
+        if metrics is not None:
+            #the full grid only computed the survival tables
+            metrics.track_phases(self.full_search.phase_timer)
+            metrics.track_cache('survival_tables', self.survival_tables.info)
+            for search, maps in self.searches:
+                search.track_metrics(metrics)
+        for each_search, (search, maps) in enumerate(self.searches):
+            #rows of a group join the combined leaderboard once the group is done, until then they are checkpointed on their own
+            search_name = 'search ' + str(each_search)
+            search_leaderboard = Leaderboard(top_k, delta_ssr)
+            if checkpoint is not None:
+                checkpoint.track(search_name, search_leaderboard)
+            if workers > 1:
+                parallel_grid_search(search, workers, top_k, delta_ssr, prune, checkpoint, search_name, search_leaderboard, metrics)
+            else:
+                #the bound of the combined leaderboard lets one group prune against the others
+                search.evaluate_chunks(search_leaderboard, prune, leaderboard.threshold, checkpoint, search_name, metrics)
+            for row in search_leaderboard.rows():
+                leaderboard.add(self.full_row(search, maps, row))
+            if checkpoint is not None:
+                checkpoint.untrack(search_name)
+            self.pruning_statistics.add(search.pruning_statistics)
+        return leaderboard
+
+
+def write_result_files(minimum_file_name, leaderboard, model_category):
+    """The minimum CSV (the best model) and the leaderboard CSV of a search."""
+    minimum_file = open(minimum_file_name + '.csv', 'w+', newline='')
+    writer = csv.writer(minimum_file, delimiter=',')
+    writer.writerow(RESULT_HEADER)
+    if leaderboard.best() is not None:
+        writer.writerow(leaderboard.best())
+    minimum_file.close()
+    #top k models and every model within delta_ssr of the best
+    leaderboard_file = open(minimum_file_name.replace('_minimum', '') + '_leaderboard.csv', 'w+', newline='')
+    writer = csv.writer(leaderboard_file, delimiter=',')
+    writer.writerow(LEADERBOARD_HEADER)
+    for row in leaderboard_csv_rows(leaderboard, model_category):
+        writer.writerow(row)
+    leaderboard_file.close()
+
+
+def leaderboard_csv_rows(leaderboard, model_category):
+    """Leaderboard rows in the LEADERBOARD_HEADER layout."""
+    rows = []
+    for rank, row in enumerate(leaderboard.rows()):
+        #parameters this model's mixture and switch leave without effect on the pratio
+        unidentifiable = unidentifiable_parameters(row[14], row[15], row[16], [row[17]])
+        rows.append(list(row) + [rank + 1, row[1] - leaderboard.best_sum_of_squares, model_category, " ".join(unidentifiable)])
+    return rows
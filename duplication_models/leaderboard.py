@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Leaderboard of the best models of a grid search
+
+Keeps the top_k models with the smallest sum of squared residuals in a bounded heap,
+plus every model whose sum of squares is within delta_ssr of the best one. Models are
+ordered by (sum of squares, model_identifier), so the same set of offered rows gives
+the same leaderboard whatever order they arrive in; chunk or worker leaderboards can
+be merged into one.
+
+Rows use the layout of the model selection minimum CSV (grid_search.RESULT_HEADER):
+row[0] is the model_identifier and row[1] the sum of squared residuals.
+"""
+
+import heapq
+import math
+
+TOP_K = 10
+DELTA_SSR = 0.0
+
+
+class Leaderboard:
+    def __init__(self, top_k=TOP_K, delta_ssr=DELTA_SSR):
+        if top_k < 1:
+            raise ValueError("top_k has to be at least 1")
+        self.top_k = top_k
+        self.delta_ssr = delta_ssr
+        self.best_sum_of_squares = math.inf
+        #max-heap of the top_k rows through negated keys
+        self._top = []
+        #rows outside the top_k within delta_ssr of the best, by model_identifier
+        self._near = {}
+
+    def __len__(self):
+        return len(self.rows())
+
+    def threshold(self):
+        """Largest sum of squares a model can have and still make the leaderboard."""
+        if len(self._top) < self.top_k:
+            return math.inf
+        return max(-self._top[0][0], self.best_sum_of_squares + self.delta_ssr)
+
+    def add(self, row):
+        model_identifier, sum_of_squares = row[0], row[1]
+        if not sum_of_squares < math.inf:
+            return
+        if sum_of_squares < self.best_sum_of_squares:
+            self.best_sum_of_squares = sum_of_squares
+            limit = self.best_sum_of_squares + self.delta_ssr
+            self._near = {identifier: near_row for identifier, near_row in self._near.items() if near_row[1] <= limit}
+        entry = (-sum_of_squares, -model_identifier, row)
+        if len(self._top) < self.top_k:
+            heapq.heappush(self._top, entry)
+            return
+        if (sum_of_squares, model_identifier) < (-self._top[0][0], -self._top[0][1]):
+            entry = heapq.heapreplace(self._top, entry)
+        self._keep_if_near(entry[2])
+
+    def _keep_if_near(self, row):
+        if row[1] <= self.best_sum_of_squares + self.delta_ssr:
+            self._near[row[0]] = row
+
+    def merge(self, other):
+        for row in other.rows():
+            self.add(row)
+
+    def rows(self):
+        """Leaderboard rows, best first."""
+        limit = self.best_sum_of_squares + self.delta_ssr
+        rows = [entry[2] for entry in self._top]
+        rows = rows + [row for row in self._near.values() if row[1] <= limit]
+        return sorted(rows, key=lambda row: (row[1], row[0]))
+
+    def best(self):
+        if len(self._top) == 0:
+            return None
+        return min((entry[2] for entry in self._top), key=lambda row: (row[1], row[0]))
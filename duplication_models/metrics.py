@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput and ETA of a grid search
+
+PhaseTimer adds up the seconds a search spends in each of METRICS_PHASES:
+    survival   survival tables, or survival cache lookups of the scalar loop
+    pratio     expected pratio of the models
+    reduction  squared residuals, sums of squares and leaderboard selection
+Phases nest, a phase entered inside another pauses the outer one, so the seconds are
+exclusive. Worker processes time their chunks in their own PhaseTimer, added to the
+parent's, so with workers > 1 the phase seconds are CPU seconds and can pass the wall
+clock time.
+
+RunMetrics is handed to a search's run() like a Checkpoint. The search tells it how
+many models it will evaluate (expect) and how many it has covered (advance, or skip
+for ranges a resumed checkpoint has already finished), and write_if_due appends a json
+record to the metrics file at most every `interval` seconds:
+    {"time", "elapsed_seconds", "models_done", "models_total", "fraction_done",
+     "models_per_second", "eta_seconds", "phase_seconds", "caches", "final"}
+models_per_second and the ETA only count the models of this session. close() writes a
+last record with "final": true.
+"""
+
+import contextlib
+import json
+import time
+from datetime import datetime
+
+METRICS_INTERVAL = 30
+METRICS_PHASES = ('survival', 'pratio', 'reduction')
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.seconds = dict.fromkeys(METRICS_PHASES, 0.0)
+        self._running = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        now = time.perf_counter()
+        #the enclosing phase stops counting while this one runs
+        if self._running:
+            outer, started = self._running[-1]
+            self.seconds[outer] += now - started
+        self._running.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            name, started = self._running.pop()
+            self.seconds[name] += now - started
+            if self._running:
+                self._running[-1][1] = now
+
+    def add(self, other):
+        for name, seconds in other.seconds.items():
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def summary(self):
+        return dict(self.seconds)
+
+
+class RunMetrics:
+    def __init__(self, path, interval=METRICS_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.models_total = 0
+        #models covered, and those of them evaluated in this session rather than skipped on resume
+        self.models_done = 0
+        self.models_evaluated = 0
+        self._phase_timers = []
+        self._caches = {}
+        self._start = time.monotonic()
+        self._last_write = self._start
+        #a fresh file for each run
+        open(self.path, 'w').close()
+
+    def expect(self, models):
+        self.models_total += models
+
+    def track_phases(self, phase_timer):
+        """Include the seconds of this PhaseTimer in the records."""
+        if all(tracked is not phase_timer for tracked in self._phase_timers):
+            self._phase_timers.append(phase_timer)
+
+    def track_cache(self, name, info):
+        """Include info(), a dict with 'hits' and 'misses', in the records under name."""
+        self._caches[name] = info
+
+    def advance(self, models):
+        self.models_done += models
+        self.models_evaluated += models
+        self.write_if_due()
+
+    def skip(self, models):
+        self.models_done += models
+
+    def record(self, final=False):
+        elapsed = time.monotonic() - self._start
+        models_per_second = (self.models_evaluated/elapsed) if elapsed > 0 else 0.0
+        remaining = max(self.models_total - self.models_done, 0)
+        if final or remaining == 0:
+            eta = 0.0
+        elif models_per_second > 0:
+            eta = remaining/models_per_second
+        else:
+            eta = None
+        phase_seconds = dict.fromkeys(METRICS_PHASES, 0.0)
+        for phase_timer in self._phase_timers:
+            for name, seconds in phase_timer.seconds.items():
+                phase_seconds[name] = phase_seconds.get(name, 0.0) + seconds
+        return {
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'elapsed_seconds': elapsed,
+            'models_done': self.models_done,
+            'models_total': self.models_total,
+            'fraction_done': (self.models_done/self.models_total) if self.models_total else 1.0,
+            'models_per_second': models_per_second,
+            'eta_seconds': eta,
+            'phase_seconds': phase_seconds,
+            'caches': {name: info() for name, info in self._caches.items()},
+            'final': final,
+        }
+
+    def write(self, final=False):
+        record = self.record(final)
+        with open(self.path, 'a') as metrics_file:
+            metrics_file.write(json.dumps(record) + '\n')
+        self._last_write = time.monotonic()
+        return record
+
+    def write_if_due(self):
+        if time.monotonic() - self._last_write >= self.interval:
+            self.write()
+
+    def close(self):
+        return self.write(final=True)
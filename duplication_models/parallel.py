@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Process pool grid search
+
+The (Alt_func, Dos) pairs of a TensorGridSearch are cut into chunks and handed out to
+a pool of worker processes. Each worker returns the leaderboard rows of its chunk and
+the parent merges them into one Leaderboard. Rows are ordered by sum of squares with
+ties broken by model_identifier, so the result is the one a serial run gives whatever
+order chunks finish in.
+
+The survival tables are moved to shared memory first (shared_tables), so worker memory
+does not grow with their number and starting a worker does not serialize the tables.
+
+Chunks are handed out a few at a time rather than all at once, so each carries the
+parent leaderboard's current threshold; with prune=True workers branch and bound
+against it, and the data point order the parent has learned so far.
+"""
+
+import collections
+import math
+import multiprocessing
+from duplication_models.leaderboard import TOP_K, DELTA_SSR, Leaderboard
+from duplication_models.pruning import DataPointOrder, PruningStatistics
+from duplication_models.metrics import PhaseTimer
+
+#chunks handed out per worker, so workers that finish early pick up more work
+CHUNKS_PER_WORKER = 4
+
+_worker_grid_search = None
+
+
+def _initialize_worker(tensor_grid_search):
+    global _worker_grid_search
+    _worker_grid_search = tensor_grid_search
+
+
+def _leaderboard_rows_of_chunk(task):
+    first_pair, last_pair, top_k, delta_ssr, prune, threshold, order = task
+    leaderboard = Leaderboard(top_k, delta_ssr)
+    data_point_order = DataPointOrder(_worker_grid_search.number_of_points)
+    data_point_order.order = order
+    statistics = PruningStatistics()
+    #seconds of this chunk only, the parent adds them to its own
+    _worker_grid_search.phase_timer = PhaseTimer()
+    _worker_grid_search.evaluate(first_pair, last_pair, leaderboard, prune, threshold, data_point_order, statistics)
+    return leaderboard.rows(), statistics, data_point_order, _worker_grid_search.phase_timer
+
+
+def _pool_context():
+    #fork: workers start from the parent's memory instead of re-importing the script that called us
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def parallel_chunks(tensor_grid_search, workers):
+    pairs_per_chunk = min(tensor_grid_search.pairs_per_chunk, max(1, math.ceil(tensor_grid_search.number_of_pairs/(workers*CHUNKS_PER_WORKER))))
+    return list(tensor_grid_search.chunks(pairs_per_chunk=pairs_per_chunk))
+
+
+def parallel_grid_search(tensor_grid_search, workers, top_k=TOP_K, delta_ssr=DELTA_SSR, prune=False, checkpoint=None, checkpoint_name='pairs', leaderboard=None, metrics=None):
+    """
+    Same leaderboard as tensor_grid_search.run(top_k, delta_ssr, prune), computed by `workers` processes.
+    With a checkpoint, pairs it has finished are skipped and every merged chunk is
+    recorded under checkpoint_name; rows go into leaderboard if one is given. Merged
+    chunks are counted in metrics, which tensor_grid_search.track_metrics must have
+    been given to.
+    """
+    chunks = collections.deque(parallel_chunks(tensor_grid_search, workers))
+    if checkpoint is not None:
+        chunks = collections.deque(each_range for first_pair, last_pair in chunks for each_range in checkpoint.uncovered(checkpoint_name, first_pair, last_pair))
+    if metrics is not None:
+        metrics.skip((tensor_grid_search.shard_pairs[1] - tensor_grid_search.shard_pairs[0] - sum(last_pair - first_pair for first_pair, last_pair in chunks))*tensor_grid_search.models_per_pair)
+    data_point_order = tensor_grid_search.data_point_order
+    #every worker maps the same survival tables instead of holding a copy
+    tensor_grid_search.share_tables()
+    if leaderboard is None:
+        leaderboard = Leaderboard(top_k, delta_ssr)
+        if checkpoint is not None:
+            checkpoint.track('leaderboard', leaderboard)
+    pending = collections.deque()
+    with _pool_context().Pool(workers, initializer=_initialize_worker, initargs=(tensor_grid_search,)) as pool:
+        while chunks or pending:
+            while chunks and len(pending) < 2*workers:
+                first_pair, last_pair = chunks.popleft()
+                if prune:
+                    data_point_order.refresh()
+                task = (first_pair, last_pair, top_k, delta_ssr, prune, leaderboard.threshold(), data_point_order.order)
+                pending.append(((first_pair, last_pair), pool.apply_async(_leaderboard_rows_of_chunk, (task,))))
+            (first_pair, last_pair), result = pending.popleft()
+            rows, statistics, chunk_data_point_order, phase_timer = result.get()
+            for row in rows:
+                leaderboard.add(row)
+            tensor_grid_search.pruning_statistics.add(statistics)
+            tensor_grid_search.phase_timer.add(phase_timer)
+            data_point_order.update(chunk_data_point_order.squared_residual_totals, chunk_data_point_order.models)
+            if checkpoint is not None:
+                checkpoint.complete(checkpoint_name, first_pair, last_pair)
+                checkpoint.save_if_due()
+            if metrics is not None:
+                metrics.advance((last_pair - first_pair)*tensor_grid_search.models_per_pair)
+    return leaderboard
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Expected probability ratio (pratio) and residuals
+
+    pratio = P(both copies retained at t2 | retained at t1) / P(both copies retained at t2 | lost at t1)
+
+for a genome starting with alt_func_percent, dos_percent and non_percent of its genes in
+the Alt_func, Dos and Non categories, where alt_switch_percent of the Alt_func genes
+retained through t1 switch to the Non category in t2.
+
+calculate_pratio_2d only uses arithmetic operators, so it accepts NumPy arrays as well
+as floats and broadcasts them against each other.
+"""
+
+import numpy as np
+from duplication_models.survival import calculate_probability_of_survival_of_duplicate_gene_copy_by_time
+
+
+def calculate_pratio_2d(st1_alt_func, st1_dos, st1_non, st2_alt_func, st2_dos, st2_non, alt_func_percent, dos_percent, non_percent, alt_switch_percent):    
+    alt_ret =  (2*alt_func_percent*st1_alt_func)
+    alt_ret_ret_switch = alt_ret*st2_non *alt_switch_percent
+    alt_ret_ret_noswitch = alt_ret*st2_alt_func * (1-alt_switch_percent)
+    dos_ret = (2*dos_percent*st1_dos)
+    dos_ret_ret = dos_ret * st2_dos   
+    non_ret = (2*non_percent*st1_non)
+    non_ret_ret = non_ret * st2_non
+    alt_noret = ((1-st1_alt_func)*alt_func_percent)
+    alt_noret_ret = alt_noret * st2_alt_func
+    dos_noret = ((1-st1_dos)*dos_percent)
+    dos_noret_ret = dos_noret * st2_dos    
+    non_noret = ((1-st1_non)*non_percent)
+    non_noret_ret = non_noret * st2_non
+    pratio = ((alt_ret_ret_noswitch + alt_ret_ret_switch + dos_ret_ret + non_ret_ret)/(alt_noret_ret + dos_noret_ret + non_noret_ret)) * ((alt_noret + dos_noret + non_noret)/(alt_ret + dos_ret + non_ret))                                 
+    return pratio  
+
+
+def calculate_pratio_over_switches(st1_alt_func, st1_dos, st1_non, st2_alt_func, st2_dos, st2_non, alt_func_percent, dos_percent, non_percent, alt_switch_percents):
+    """
+    pratio for every switch value (last axis) from one set of survival values, which may
+    be arrays over data points. alt_switch_percent only scales the Alt_func retained
+    terms, so everything else is computed once; each value is the float
+    calculate_pratio_2d gives for that switch.
+    """
+    survival = [np.asarray(each_survival, dtype=float)[..., None] for each_survival in (st1_alt_func, st1_dos, st1_non, st2_alt_func, st2_dos, st2_non)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return calculate_pratio_2d(*survival, alt_func_percent, dos_percent, non_percent, np.asarray(alt_switch_percents, dtype=float))
+
+
+def calculate_expected_pratio(t1, t2, alt_func_percent, dos_percent, non_percent, alt_switch_percent, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non):
+    alt_func_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_alt_func, c_alt_func, d_alt_func, f_alt_func, t1)
+    dos_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_dos, c_dos, d_dos, f_dos, t1)
+    non_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_non, c_non, d_non, f_non, t1)   
+    alt_func_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_alt_func, c_alt_func, d_alt_func, f_alt_func, t2)
+    dos_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_dos, c_dos, d_dos, f_dos, t2)
+    non_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_non, c_non, d_non, f_non, t2)       
+    probability_ratio_2d = calculate_pratio_2d(alt_func_survival_t1, dos_survival_t1, non_survival_t1, alt_func_survival_t2, dos_survival_t2, non_survival_t2, alt_func_percent, dos_percent, non_percent, alt_switch_percent)
+    return probability_ratio_2d
+
+
+def calculate_residual(observed_pratio, expected_pratio):
+    residual = observed_pratio - expected_pratio
+    return residual    
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Observed data set and preset grids of the seven model categories
+
+MODEL CATEGORIES
+1.	3 Mixture Gene Duplicability Model (3mix_dup)
+2.	2 Mix (Alt+Dos) Gene Duplicability Model (alt_dos_dup)
+3.	2 Mix (Alt+Non) Gene Duplicability Model (alt_non_dup)
+4.	2 Mix (Non+Dos) Gene Duplicability Model (non_dos_dup)
+5.	2 Mix (Alt+Non) Mutational Opportunity Model (alt_non_mut)
+6.	Independence Model (ind)
+7.	3 Mixture Mutational Opportunity Model (3mix_mut)
+
+These are the values the model selection script searched on 03 16 2024. They live here
+so every script, and any worker process, gets them by import instead of by copy.
+"""
+
+from duplication_models.dataset import Fish, Plants, DataSet
+from duplication_models.grid_search import ParameterGrid
+
+MODEL_CATEGORIES = ["3mix_dup", "alt_dos_dup", "alt_non_dup", "non_dos_dup", "alt_non_mut", "ind", "3mix_mut"]
+
+
+def observed_data_set():
+    # #initialize Data Set
+    atlantic_salmon = Fish("Atlantic Salmon", 240, 80, 0.97)
+    nick_p_equestrius = Plants("Nick's Phalaenopsis equestrius", 54, 76, 0.94)
+    nick_p1_p_halli = Plants("Nick's Pair 1 Panicum halli", 8, 99, 0.92) # 110 mya, 107.5mya(t1 = 2.5, t2 = 107.5)OR t1 = 0-35, t2 = 100-120
+    nick_p1_o_brachyantha = Plants("Nick's Pair 1 Oryza brachyantha", 8, 99, 0.93) #110 mya, 107.5mya (t1 = 2.5, t2 = 107.5)OR t1 = 0-35, t2 = 100-120
+    nick_p2_p_halli = Plants("Nick's Pair 2 Panicum halli", 25, 99, 0.88)#122.5mya, 107.5mya(t1 = 15, t2 = 107.5) OR t1 = 0-40, t2 = 95-120
+    nick_p2_o_brachyantha = Plants("Nick's Pair 2 Oryza brachyantha", 25, 99, 0.87)#122.5mya,107.5mya (t1 = 15, t2 = 107.5) OR  t1 = 0-40, t2 = 95-120
+    nick_p3_p_halli = Plants("Nick's Pair 3 Panicum halli", 17, 107, 0.87)#122.5mya, 110mya (t1 =12.5, t2 =110)OR  t1 = 5-25, t2 = 95-120
+    nick_p3_o_brachyantha = Plants("Nick's Pair 3 Oryza brachyantha", 17, 107, 0.86)#122.5mya, 110mya(t1 =12.5, t2 =110)OR t1 = 5-25, t2 = 95-120
+    nick_p3_a_comosus = Plants("Nick's Pair 3 Ananas comosus", 17, 107, 0.87)
+    nick_p4_e_guineensis = Plants("Nick's Pair 4 Elaeis guineensis", 49, 75, 0.91)
+    nick_p4_p_dactylifera = Plants("Nick's Pair 4 Phoenix dactylifera", 49, 75, 0.90)
+    return DataSet([atlantic_salmon, nick_p_equestrius, nick_p1_p_halli, nick_p1_o_brachyantha, nick_p2_p_halli, nick_p2_o_brachyantha, nick_p3_p_halli, nick_p3_o_brachyantha, nick_p3_a_comosus, nick_p4_e_guineensis, nick_p4_p_dactylifera])
+
+
+#mixtures of the 3 mixture models
+_THREE_MIXTURE_ALTS = [0.80, 0.10, 0.10,
+                       0.60, 0.60, 0.60,
+                       0.40, 0.40, 0.20,
+                       0.20, 0.20]
+_THREE_MIXTURE_DOSES = [0.10, 0.10, 0.80,
+                        0.10, 0.20, 0.30,
+                        0.40, 0.20, 0.40,
+                        0.60, 0.20]
+_THREE_MIXTURE_NONS = [0.10, 0.80, 0.10,
+                       0.30, 0.20, 0.10,
+                       0.20, 0.40, 0.40,
+                       0.20, 0.6]
+
+#coarse grids of each category's survival parameters
+_B_ALT_FUNCS = [5, 10, 15, 30, 35]
+_C_ALT_FUNCS = [0.5, 1, 3, 5]
+_D_ALT_FUNCS = [50, 5, 0.5, 0.05, 0.0005]
+_F_ALT_FUNCS = [0.5, 2, 5, 8, 10]
+_B_DOSES = [-1, -10, -12, -14, -16, -18, -20, -30, -50]
+_C_DOSES = [0.025, 0.05, 0.2, 0.4, 0.6, 0.8]
+_D_DOSES = [-0.03, -0.0003, -0.000003, -0.00000003, -0.0000000003]
+
+#INITIALIZE PARAMTER VALUES of every preset; b_non = 0 and c_non = 1 in all of them
+PRESET_GRIDS = {
+    #1.	3 Mixture Gene Duplicability Model
+    '3mix_dup': {
+        'file3_name': 'model_selection_03_16_2024_coarse_3mix_dup_sum_of_squares_minimum',
+        'alts': _THREE_MIXTURE_ALTS, 'doses': _THREE_MIXTURE_DOSES, 'nons': _THREE_MIXTURE_NONS,
+        'switches': [0],
+        'b_alt_funcs': _B_ALT_FUNCS, 'c_alt_funcs': _C_ALT_FUNCS, 'd_alt_funcs': _D_ALT_FUNCS, 'f_alt_funcs': _F_ALT_FUNCS,
+        'b_doses': _B_DOSES, 'c_doses': _C_DOSES, 'd_doses': _D_DOSES,
+        'd_nons': [10.01], 'f_nons': [0.01, 5, 20, 50],
+    },
+    #2.	2 Mix (Alt+Dos) Gene Duplicability Model
+    'alt_dos_dup': {
+        'file3_name': 'model_selection_03_16_2024_coarse_alt_dos_dup_sum_of_squares_minimum',
+        'alts': [0.9, 0.80, 0.60, 0.20, 0.10], 'doses': [0.1, 0.20, 0.40, 0.80, 0.90], 'nons': [0.0, 0.0, 0.0, 0.0, 0.0],
+        'switches': [0],
+        'b_alt_funcs': _B_ALT_FUNCS, 'c_alt_funcs': _C_ALT_FUNCS, 'd_alt_funcs': _D_ALT_FUNCS, 'f_alt_funcs': _F_ALT_FUNCS,
+        'b_doses': _B_DOSES, 'c_doses': _C_DOSES, 'd_doses': _D_DOSES,
+        'd_nons': [10.01], 'f_nons': [0.01],
+    },
+    #3.	2 Mix (Alt+Non) Gene Duplicability Model
+    'alt_non_dup': {
+        'file3_name': 'model_selection_03_16_2024_coarse_alt_non_dup_sum_of_squares_minimum',
+        'alts': [0.9, 0.80, 0.60, 0.20, 0.10], 'doses': [0.0, 0.0, 0.0, 0.0, 0.0], 'nons': [0.1, 0.20, 0.40, 0.80, 0.90],
+        'switches': [0],
+        'b_alt_funcs': _B_ALT_FUNCS, 'c_alt_funcs': _C_ALT_FUNCS, 'd_alt_funcs': _D_ALT_FUNCS, 'f_alt_funcs': _F_ALT_FUNCS,
+        'b_doses': [-12], 'c_doses': [0.6], 'd_doses': [-0.03],
+        'd_nons': [10.01, 20], 'f_nons': [0.01, 5, 20, 50],
+    },
+    #4.	2 Mix (Non+Dos) Gene Duplicability Model
+    'non_dos_dup': {
+        'file3_name': 'model_selection_03_16_2024_coarse_non_dos_dup_sum_of_squares_minimum',
+        'alts': [0.0, 0.0, 0.0, 0.0, 0.0], 'doses': [0.9, 0.80, 0.60, 0.20, 0.10], 'nons': [0.1, 0.20, 0.40, 0.80, 0.90],
+        'switches': [0],
+        'b_alt_funcs': [35], 'c_alt_funcs': [0.5], 'd_alt_funcs': [50], 'f_alt_funcs': [10],
+        'b_doses': _B_DOSES, 'c_doses': _C_DOSES, 'd_doses': _D_DOSES,
+        'd_nons': [10.01, 20], 'f_nons': [0.01, 5, 10, 20, 50],
+    },
+    #5.	2 Mix (Alt+Non) Mutational Opportunity Model
+    'alt_non_mut': {
+        'file3_name': 'model_selection_03_16_2024_coarse_alt_non_mut_sum_of_squares_minimum',
+        'alts': [0.9, 0.80, 0.60, 0.20, 0.10], 'doses': [0.0, 0.0, 0.0, 0.0, 0.0], 'nons': [0.1, 0.20, 0.40, 0.80, 0.90],
+        'switches': [0.1, 0.20, 0.5],
+        'b_alt_funcs': _B_ALT_FUNCS, 'c_alt_funcs': _C_ALT_FUNCS, 'd_alt_funcs': _D_ALT_FUNCS, 'f_alt_funcs': _F_ALT_FUNCS,
+        'b_doses': [-12], 'c_doses': [0.6], 'd_doses': [-0.03],
+        'd_nons': [10.01, 20], 'f_nons': [0.01, 5, 20, 50],
+    },
+    #6.	Independence Model
+    'ind': {
+        'file3_name': 'model_selection_03_16_2024_2024_coarse_ind_sum_of_squares_minimum',
+        'alts': [0.0], 'doses': [0.0], 'nons': [1.0],
+        'switches': [0],
+        'b_alt_funcs': [35], 'c_alt_funcs': [0.5], 'd_alt_funcs': [50], 'f_alt_funcs': [10],
+        'b_doses': [-12], 'c_doses': [0.6], 'd_doses': [-0.03],
+        'd_nons': [10.01], 'f_nons': [0.01],
+    },
+    #7.	3 Mixture Mutational Opportunity Model
+    '3mix_mut': {
+        'file3_name': 'model_selection_03_16_2024_coarse_3mix_mut_sum_of_squares_minimum',
+        'alts': _THREE_MIXTURE_ALTS, 'doses': _THREE_MIXTURE_DOSES, 'nons': _THREE_MIXTURE_NONS,
+        'switches': [0.1, 0.20, 0.5],
+        'b_alt_funcs': _B_ALT_FUNCS, 'c_alt_funcs': _C_ALT_FUNCS, 'd_alt_funcs': _D_ALT_FUNCS, 'f_alt_funcs': _F_ALT_FUNCS,
+        'b_doses': _B_DOSES, 'c_doses': _C_DOSES, 'd_doses': _D_DOSES,
+        'd_nons': [10.01], 'f_nons': [0.01, 5, 20, 50],
+    },
+}
+
+
+def preset_grid(model_category):
+    """ParameterGrid of a preset model category and the name of its minimum CSV."""
+    if model_category not in PRESET_GRIDS:
+        raise ValueError(model_category + " is not a preset model category, the presets are " + ", ".join(MODEL_CATEGORIES))
+    preset = PRESET_GRIDS[model_category]
+    grid = ParameterGrid(preset['alts'], preset['doses'], preset['nons'], preset['switches'], preset['b_alt_funcs'], preset['c_alt_funcs'], preset['d_alt_funcs'], preset['f_alt_funcs'], preset['b_doses'], preset['c_doses'], preset['d_doses'], preset['d_nons'], preset['f_nons'])
+    return grid, preset['file3_name']
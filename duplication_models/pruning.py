@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Branch and bound for the sum of squared residuals
+
+Every squared residual is >= 0, so once the partial sum of squares of a model is above
+the leaderboard threshold the remaining data points cannot bring it back and the model
+is abandoned. Accumulating the data points with the largest residuals first makes that
+happen sooner; DataPointOrder learns that order from the models fully evaluated so far.
+
+Pruning decides from partial sums in that order, but the sum of squares kept for a
+model that survives is still accumulated in data point order, so the leaderboard is
+the one an exhaustive search gives. PRUNING_MARGIN covers the rounding difference
+between the two summation orders.
+"""
+
+import math
+import numpy as np
+
+PRUNING_MARGIN = 1e-12
+
+
+def pruning_limit(threshold):
+    """Partial sums of squares above this can not make a leaderboard with this threshold."""
+    if threshold == math.inf:
+        return math.inf
+    return threshold*(1 + PRUNING_MARGIN)
+
+
+class DataPointOrder:
+    """Data points by mean squared residual, largest first."""
+    def __init__(self, number_of_points):
+        self.squared_residual_totals = np.zeros(number_of_points)
+        self.models = 0
+        self.order = list(range(number_of_points))
+
+    def update(self, squared_residual_totals, models=1):
+        #nan residuals (invalid models) say nothing about the order
+        self.squared_residual_totals += np.nan_to_num(np.asarray(squared_residual_totals, dtype=float), nan=0.0, posinf=0.0)
+        self.models += models
+
+    def refresh(self):
+        self.order = [int(each_data_point) for each_data_point in np.argsort(-self.squared_residual_totals, kind='stable')]
+        return self.order
+
+
+class PruningStatistics:
+    def __init__(self):
+        self.models_evaluated = 0
+        self.models_pruned = 0
+        self.point_evaluations = 0
+        self.point_evaluations_skipped = 0
+
+    def add(self, other):
+        self.models_evaluated += other.models_evaluated
+        self.models_pruned += other.models_pruned
+        self.point_evaluations += other.point_evaluations
+        self.point_evaluations_skipped += other.point_evaluations_skipped
+
+    def summary(self):
+        total = self.point_evaluations + self.point_evaluations_skipped
+        return {
+            'models_evaluated': self.models_evaluated,
+            'models_pruned': self.models_pruned,
+            'point_evaluations': self.point_evaluations,
+            'point_evaluations_skipped': self.point_evaluations_skipped,
+            'fraction_skipped': (self.point_evaluations_skipped/total) if total else 0.0,
+        }
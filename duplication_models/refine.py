@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Continuous refinement of the best models of a grid search
+
+The preset grids are coarse (d_alt_funcs jumps from 0.05 to 0.0005), so the grid
+minimum is only near the best model. refine_leaderboard takes the best leaderboard rows
+and runs a bounded local optimizer from each, scipy's Nelder-Mead by default or
+L-BFGS-B, on the sum of squared residuals.
+
+The optimizer moves the parameters of the categories the mixture uses, within each
+category's constraints (constraints.CATEGORY_CONSTRAINTS):
+    Alt_func: b, c, d and f, bounded below by 0
+    Dos: b (bounded above by 0), c (between 0 and 1) and d, with f = -d
+    Non: d (bounded below by 10) and f, with b = 0 and c = 1
+plus the nonzero mixture weights (the last of them is 1 minus the others) and the
+switch when alt_func_percent > 0. The bounds are the closed versions of the sign rules.
+A model that breaks a strict rule, the Dos hazard or a negative last weight gets
+INFEASIBLE_SUM_OF_SQUARES, and so does one whose survival overflows. Weights of 0 stay
+0 and dead parameters (dead_dimensions) keep their grid values, so a refined model has
+the same unidentifiable parameters as its grid row. Each coordinate is divided by its
+starting magnitude, which lets one optimizer step size fit d = 50 and d = 0.0005.
+
+The objective computes survival with survival_table, as the grid search does, so the
+optimizer starts from the grid row's own sum of squares; refine_row checks that it
+does, within START_RTOL.
+"""
+
+import math
+import numpy as np
+from scipy import optimize
+from duplication_models.survival import N_MAX
+from duplication_models.pratio import calculate_pratio_2d
+from duplication_models.grid_search import survival_table
+from duplication_models.constraints import CATEGORY_CONSTRAINTS
+from duplication_models.dead_dimensions import dead_dimensions
+from duplication_models.parallel import _pool_context
+
+REFINE_METHODS = ('Nelder-Mead', 'L-BFGS-B')
+REFINE_CANDIDATES = 5
+MAX_FUNCTION_EVALUATIONS = 2000
+#finite, so L-BFGS-B can take differences across the edge of the valid region
+INFEASIBLE_SUM_OF_SQUARES = 1e10
+#the simplex search rearranges the pratio, its sums of squares are not bit for bit the series'
+START_RTOL = 1e-12
+REFINED_HEADER = ["grid_sum_of_squared_residuals", "improvement", "function_evaluations", "method", "converged"]
+
+#positions in a model row (grid_search.RESULT_HEADER)
+_CATEGORY_COLUMNS = {'Alt_func': 2, 'Dos': 6, 'Non': 10}
+_MIXTURE_COLUMN = 14
+_SWITCH_COLUMN = 17
+#column offset within a category's (b, c, d, f) and its bounds
+_FREE_PARAMETERS = {
+    'Alt_func': [(0, 0, None), (1, 0, None), (2, 0, None), (3, 0, None)],
+    'Dos': [(0, None, 0), (1, 0, 1), (2, None, None)],
+    'Non': [(2, 10, None), (3, None, None)],
+}
+
+
+class ModelObjective:
+    """Sum of squared residuals of the model of one leaderboard row as a function of its free parameters."""
+    def __init__(self, row, t1_set, t2_set, observed_pratio_set, engine='series', n_max=N_MAX, tolerance=None):
+        self.row = [float(value) for value in row]
+        self.engine = engine
+        self.n_max = n_max
+        self.tolerance = tolerance
+        self.number_of_points = len(observed_pratio_set)
+        self.observed_pratio = np.array(observed_pratio_set, dtype=float)
+        self.times = list(t1_set) + list(t2_set)
+        mixture = self.row[_MIXTURE_COLUMN:_MIXTURE_COLUMN + 3]
+        dead = dead_dimensions(mixture[0], mixture[1], mixture[2], [self.row[_SWITCH_COLUMN]])
+        self.live_categories = [category for category in ['Alt_func', 'Dos', 'Non'] if category not in dead]
+        #(column, lower, upper) of every free parameter
+        self.free = []
+        for category in self.live_categories:
+            for offset, lower, upper in _FREE_PARAMETERS[category]:
+                self.free.append((_CATEGORY_COLUMNS[category] + offset, lower, upper))
+        self.weight_columns = [_MIXTURE_COLUMN + each_weight for each_weight in range(3) if mixture[each_weight] > 0]
+        for column in self.weight_columns[:-1]:
+            self.free.append((column, 0, 1))
+        if 'switch' not in dead:
+            self.free.append((_SWITCH_COLUMN, 0, 1))
+        self.scale = np.array([abs(self.row[column]) or 1.0 for column, lower, upper in self.free])
+        self.function_evaluations = 0
+
+    def start(self):
+        return np.array([self.row[column] for column, lower, upper in self.free])/self.scale
+
+    def bounds(self):
+        return [(None if lower is None else lower/scale, None if upper is None else upper/scale) for (column, lower, upper), scale in zip(self.free, self.scale)]
+
+    def model_row(self, x):
+        """The row with the free parameters set from x (in units of their scale)."""
+        row = list(self.row)
+        for (column, lower, upper), value in zip(self.free, np.asarray(x)*self.scale):
+            row[column] = float(value)
+        row[_CATEGORY_COLUMNS['Dos'] + 3] = -row[_CATEGORY_COLUMNS['Dos'] + 2]
+        #the grid's last weight is kept as it is until the others move: 1 - 0.8 - 0.1 is not 0.1
+        free_weights = [row[column] for column in self.weight_columns[:-1]]
+        if free_weights != [self.row[column] for column in self.weight_columns[:-1]]:
+            row[self.weight_columns[-1]] = 1 - sum(free_weights)
+        return row
+
+    def feasible(self, row):
+        if len(self.weight_columns) > 0 and row[self.weight_columns[-1]] < 0:
+            return False
+        for category in self.live_categories:
+            b, c, d, f = [np.array([value]) for value in row[_CATEGORY_COLUMNS[category]:_CATEGORY_COLUMNS[category] + 4]]
+            if not all(constraint.holds(b, c, d, f)[0] for constraint in CATEGORY_CONSTRAINTS[category]):
+                return False
+        return True
+
+    def sum_of_squares_of_row(self, row):
+        if not self.feasible(row):
+            return INFEASIBLE_SUM_OF_SQUARES
+        survival = []
+        for category in ['Alt_func', 'Dos', 'Non']:
+            column = _CATEGORY_COLUMNS[category]
+            with np.errstate(over='ignore', invalid='ignore'):
+                survival.append(survival_table([tuple(row[column:column + 4])], self.times, self.engine, self.n_max, self.tolerance)[:, 0])
+        n = self.number_of_points
+        with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+            pratio = calculate_pratio_2d(survival[0][:n], survival[1][:n], survival[2][:n], survival[0][n:], survival[1][n:], survival[2][n:], row[_MIXTURE_COLUMN], row[_MIXTURE_COLUMN + 1], row[_MIXTURE_COLUMN + 2], row[_SWITCH_COLUMN])
+        residual = self.observed_pratio - pratio
+        sum_of_squares = 0
+        for each_data_point in range(n):
+            sum_of_squares = (residual[each_data_point]*residual[each_data_point]) + sum_of_squares
+        if not sum_of_squares < math.inf:
+            return INFEASIBLE_SUM_OF_SQUARES
+        return float(sum_of_squares)
+
+    def __call__(self, x):
+        self.function_evaluations += 1
+        return self.sum_of_squares_of_row(self.model_row(x))
+
+
+class RefinementResult:
+    def __init__(self, grid_row, row, method, function_evaluations, converged, message):
+        self.grid_row = grid_row
+        #refined model in the layout of the grid row, with its own sum of squares in row[1]
+        self.row = row
+        self.method = method
+        self.function_evaluations = function_evaluations
+        self.converged = converged
+        self.message = message
+
+    def improvement(self):
+        return self.grid_row[1] - self.row[1]
+
+    def csv_row(self):
+        return self.row + [self.grid_row[1], self.improvement(), self.function_evaluations, self.method, self.converged]
+
+    def summary(self):
+        return "model " + str(self.grid_row[0]) + ": sum of squares " + str(self.grid_row[1]) + " -> " + str(self.row[1]) + " (improvement " + str(self.improvement()) + ") in " + str(self.function_evaluations) + " " + self.method + " evaluations, " + ("converged" if self.converged else "not converged: " + str(self.message))
+
+
+def refine_row(row, t1_set, t2_set, observed_pratio_set, method='Nelder-Mead', engine='series', n_max=N_MAX, max_function_evaluations=MAX_FUNCTION_EVALUATIONS, tolerance=None):
+    """Local optimum of the sum of squares starting from the model of a leaderboard row."""
+    if method not in REFINE_METHODS:
+        raise ValueError("method has to be one of " + ", ".join(REFINE_METHODS))
+    objective = ModelObjective(row, t1_set, t2_set, observed_pratio_set, engine, n_max, tolerance)
+    start = objective.start()
+    start_sum_of_squares = objective(start)
+    #an improvement is only one if the optimizer starts from the grid's own sum of squares
+    if not math.isclose(start_sum_of_squares, row[1], rel_tol=START_RTOL, abs_tol=0.0):
+        raise ValueError("model " + str(row[0]) + " evaluates to a sum of squares of " + str(start_sum_of_squares) + " rather than its grid value " + str(row[1]) + ", refine with the engine settings of the grid search")
+    if len(start) == 0:
+        return RefinementResult(list(row), [row[0], start_sum_of_squares] + objective.row[2:], method, objective.function_evaluations, True, "no free parameters")
+    if method == 'Nelder-Mead':
+        options = {'maxfev': max_function_evaluations, 'xatol': 1e-8, 'fatol': 1e-14, 'adaptive': len(start) > 4}
+    else:
+        options = {'maxfun': max_function_evaluations}
+    result = optimize.minimize(objective, start, method=method, bounds=objective.bounds(), options=options)
+    #the optimizer only returns its best point, never a worse one than the grid row
+    if result.fun < start_sum_of_squares:
+        refined = objective.model_row(result.x)
+        refined_sum_of_squares = objective.sum_of_squares_of_row(refined)
+    else:
+        refined = objective.model_row(start)
+        refined_sum_of_squares = start_sum_of_squares
+    return RefinementResult(list(row), [row[0], refined_sum_of_squares] + refined[2:], method, objective.function_evaluations, bool(result.success), result.message)
+
+
+def _refine_task(task):
+    return refine_row(*task)
+
+
+def refine_leaderboard(leaderboard, t1_set, t2_set, observed_pratio_set, candidates=REFINE_CANDIDATES, method='Nelder-Mead', engine='series', n_max=N_MAX, workers=1, max_function_evaluations=MAX_FUNCTION_EVALUATIONS, tolerance=None):
+    """RefinementResult of each of the best `candidates` leaderboard rows, best refined sum of squares first."""
+    tasks = [(row, t1_set, t2_set, observed_pratio_set, method, engine, n_max, max_function_evaluations, tolerance) for row in leaderboard.rows()[:candidates]]
+    if workers > 1 and len(tasks) > 1:
+        with _pool_context().Pool(min(workers, len(tasks))) as pool:
+            results = pool.map(_refine_task, tasks)
+    else:
+        results = [_refine_task(task) for task in tasks]
+    return sorted(results, key=lambda result: (result.row[1], result.row[0]))
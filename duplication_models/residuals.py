@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Residual records and the residual CSV
+
+Data_Point holds one model's parameters with its expected pratio and residual at one data
+point. The residual CSV (RESIDUAL_HEADER) has a row per model and data point, written
+by residual_calc_model_selection_03_18_2024.py and read back with read_residual_csv by
+the likelihood, normality and residual graph scripts.
+"""
+
+import csv
+
+RESIDUAL_HEADER = ["t1", "t2", "expected_pratio", "b_alt", "c_alt", "d_alt", "f_alt", "b_dos", "c_dos", "d_dos", "f_dos", "b_non", "c_non", "d_non", "f_non", "percent_alt", "percent_dos", "percent_non", "percent_switch", "observed_pratio", "residual", "absolute residual", "model_identifier", "data_point_identifier", "model_category"]
+
+
+class Data_Point:
+    def __init__(self, alt_value, dos_value, non_value, switch_value, b_alt_func_value, c_alt_func_value, d_alt_func_value, f_alt_func_value, b_dos_value, c_dos_value, d_dos_value, f_dos_value, b_non_value, c_non_value, d_non_value, f_non_value, expected_pratio_value, residual_value, absolute_residual_value):
+        self.alt_value = alt_value
+        self.dos_value = dos_value
+        self.non_value = non_value
+        self.switch_value = switch_value
+        self.b_alt_func_value = b_alt_func_value
+        self.c_alt_func_value = c_alt_func_value
+        self.d_alt_func_value = d_alt_func_value
+        self.f_alt_func_value = f_alt_func_value
+        self.b_dos_value = b_dos_value
+        self.c_dos_value = c_dos_value
+        self.d_dos_value = d_dos_value
+        self.f_dos_value = f_dos_value
+        self.b_non_value = b_non_value
+        self.c_non_value = c_non_value
+        self.d_non_value = d_non_value
+        self.f_non_value = f_non_value
+        self.expected_pratio_value = expected_pratio_value
+        self.residual_value = residual_value
+        self.absolute_residual_value = absolute_residual_value
+
+
+class ResidualRow:
+    """One row of a residual CSV, values as the strings csv reads."""
+    def __init__(self, row):
+        self.t1 = row["t1"]
+        self.t2 = row["t2"]
+        self.expected_probability_ratio = row["expected_pratio"]
+        self.b_alt_func = row["b_alt"]
+        self.c_alt_func = row["c_alt"]
+        self.d_alt_func = row["d_alt"]
+        self.f_alt_func = row["f_alt"]
+        self.b_dos = row["b_dos"]
+        self.c_dos = row["c_dos"]
+        self.d_dos = row["d_dos"]
+        self.f_dos = row["f_dos"]
+        self.b_non = row["b_non"]
+        self.c_non = row["c_non"]
+        self.d_non = row["d_non"]
+        self.f_non = row["f_non"]
+        self.alt = row["percent_alt"]
+        self.dos = row["percent_dos"]
+        self.non = row["percent_non"]
+        self.switch_percent = row["percent_switch"]
+        self.observed_pratio = row["observed_pratio"]
+        self.residual = row["residual"]
+        self.model_identifier = row["model_identifier"]
+        self.data_point_identifier = row["data_point_identifier"]
+        self.model_category = row.get("model_category")
+
+
+def read_residual_csv(file_name):
+    with open(file_name, "r") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield ResidualRow(row)
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Quasi-random sampling of the parameter space
+
+Instead of the product of the preset value lists, SamplingSearch draws models from a
+Sobol or Latin hypercube sequence (scipy.stats.qmc) over the range each preset list
+spans. The d and f axes span decades and are sampled on a log scale, as are any other
+axes whose values share a sign and span a factor of 10 or more; the remaining axes are
+linear. Axes with a single preset value stay fixed, and so do the parameters of a
+category no preset mixture uses (dead_dimensions). Dos f is -d as in the grid.
+
+The mixture is drawn uniformly over the simplex of the weights some preset mixture
+makes nonzero, so weights that are 0 in every preset stay 0 and the model category does
+not change. Models that break a category constraint are counted and skipped.
+
+Samples are evaluated batch by batch with the same survival (survival_table) and pratio
+code as the grid, so a sampled model has the sum of squares the grid gives it and the
+leaderboards can be merged; the leaderboard is usable whenever the run stops: after `samples` models, or
+at the first batch ending past `time_limit` seconds. With the same seed and batch size
+the sequence is the same, so a shorter run's samples are the start of a longer one's,
+and a checkpointed run stopped by its time limit can be resumed. Each Latin hypercube
+batch is a hypercube of its own.
+"""
+
+import math
+import time
+import warnings
+import numpy as np
+from scipy.stats import qmc
+from duplication_models.survival import N_MAX
+from duplication_models.pratio import calculate_pratio_2d
+from duplication_models.leaderboard import TOP_K, DELTA_SSR, Leaderboard
+from duplication_models.constraints import constraint_mask
+from duplication_models.dead_dimensions import dead_dimensions
+from duplication_models.grid_search import shard_range, survival_table
+
+SAMPLING_METHODS = ('sobol', 'lhs')
+SAMPLING_BATCH_SIZE = 4096
+SAMPLING_SEED = 0
+#parameters sampled on a log scale whenever their preset values share a sign
+LOG_SCALE_AXES = ('d_alt_funcs', 'f_alt_funcs', 'd_doses', 'd_nons', 'f_nons')
+
+#ParameterGrid axes, their category and their position in a model row (grid_search.RESULT_HEADER)
+SAMPLED_AXES = [('b_alt_funcs', 'Alt_func', 2), ('c_alt_funcs', 'Alt_func', 3), ('d_alt_funcs', 'Alt_func', 4), ('f_alt_funcs', 'Alt_func', 5), ('b_doses', 'Dos', 6), ('c_doses', 'Dos', 7), ('d_doses', 'Dos', 8), ('d_nons', 'Non', 12), ('f_nons', 'Non', 13), ('switches', 'switch', 17)]
+_MIXTURE_COLUMN = 14
+
+
+class SampledAxis:
+    """Map from [0, 1) to the range of one preset value list."""
+    def __init__(self, name, values):
+        self.name = name
+        self.lower = min(values)
+        self.upper = max(values)
+        same_sign = self.lower > 0 or self.upper < 0
+        self.log_scale = same_sign and (name in LOG_SCALE_AXES or max(abs(self.lower), abs(self.upper)) >= 10*min(abs(self.lower), abs(self.upper)))
+
+    def fixed(self):
+        return self.lower == self.upper
+
+    def values(self, unit):
+        if self.log_scale:
+            sign = 1 if self.lower > 0 else -1
+            low, high = sorted([math.log(abs(self.lower)), math.log(abs(self.upper))])
+            return sign*np.exp(low + unit*(high - low))
+        return self.lower + unit*(self.upper - self.lower)
+
+
+def simplex_weights(unit, number_of_weights):
+    """Uniform points on the simplex of number_of_weights weights from number_of_weights - 1 columns of [0, 1) values."""
+    if number_of_weights == 1:
+        return np.ones((len(unit), 1))
+    if number_of_weights == 2:
+        return np.column_stack([unit[:, 0], 1 - unit[:, 0]])
+    root = np.sqrt(unit[:, 0])
+    return np.column_stack([1 - root, root*(1 - unit[:, 1]), root*unit[:, 1]])
+
+
+class SamplingReport:
+    def __init__(self, method, seed):
+        self.method = method
+        self.seed = seed
+        self.batches = 0
+        self.samples = 0
+        #samples a resumed run's checkpoint had already evaluated
+        self.resumed_samples = 0
+        self.invalid_samples = 0
+        self.seconds = 0.0
+        self.stopped_by_time_limit = False
+
+    def summary(self):
+        return {
+            'method': self.method,
+            'seed': self.seed,
+            'batches': self.batches,
+            'samples': self.samples,
+            'resumed_samples': self.resumed_samples,
+            'invalid_samples': self.invalid_samples,
+            'seconds': self.seconds,
+            'samples_per_second': (self.samples - self.resumed_samples)/self.seconds if self.seconds > 0 else 0.0,
+            'stopped_by_time_limit': self.stopped_by_time_limit,
+        }
+
+
+class SamplingSearch:
+    def __init__(self, grid, t1_set, t2_set, observed_pratio_set, method='sobol', seed=SAMPLING_SEED, engine='series', n_max=N_MAX, batch_size=SAMPLING_BATCH_SIZE, tolerance=None):
+        if method not in SAMPLING_METHODS:
+            raise ValueError("method has to be one of " + ", ".join(SAMPLING_METHODS))
+        self.grid = grid
+        self.method = method
+        self.seed = seed
+        self.engine = engine
+        self.n_max = n_max
+        self.tolerance = tolerance
+        self.batch_size = batch_size
+        self.number_of_points = len(observed_pratio_set)
+        self.observed_pratio = np.array(observed_pratio_set, dtype=float)
+        self.times = list(t1_set) + list(t2_set)
+        mixtures = grid.mixtures()
+        largest_weights = [max(mixture[each_weight] for mixture in mixtures) for each_weight in range(3)]
+        dead = dead_dimensions(largest_weights[0], largest_weights[1], largest_weights[2], grid.switches)
+        self.weight_columns = [each_weight for each_weight in range(3) if largest_weights[each_weight] > 0]
+        #axes drawn from the sequence; the others keep their first preset value, or for a
+        #dead category the first valid parameter set, as the collapsed grid search does
+        self.fixed_values = {}
+        self.sampled_axes = []
+        for axis, category, column in SAMPLED_AXES:
+            sampled_axis = SampledAxis(axis, getattr(grid, axis))
+            if category in dead or sampled_axis.fixed():
+                self.fixed_values[column] = getattr(grid, axis)[0]
+            else:
+                self.sampled_axes.append((sampled_axis, column))
+        for category, column, parameter_sets in [('Alt_func', 2, grid.alt_parameter_sets), ('Dos', 6, grid.dos_parameter_sets), ('Non', 10, grid.non_parameter_sets)]:
+            valid_sets = parameter_sets()
+            if category in dead and len(valid_sets) > 0:
+                for each_parameter, value in enumerate(valid_sets[0]):
+                    self.fixed_values[column + each_parameter] = value
+        #at least one dimension, so a category with nothing to sample still draws a sequence
+        self.dimensions = max(len(self.sampled_axes) + max(len(self.weight_columns) - 1, 0), 1)
+        self.report = SamplingReport(method, seed)
+        #(shard, shards) of the sequence this process evaluates
+        self.shard_batches = (0, 1)
+
+    def _engine(self):
+        if self.method == 'sobol':
+            return qmc.Sobol(self.dimensions, scramble=True, seed=self.seed)
+        return qmc.LatinHypercube(self.dimensions, seed=self.seed)
+
+    def parameters(self, unit):
+        """Models (rows) in the column layout of a model row from [samples x dimensions] values in [0, 1)."""
+        parameters = np.zeros((len(unit), 18))
+        for column, value in self.fixed_values.items():
+            parameters[:, column] = value
+        for each_axis, (sampled_axis, column) in enumerate(self.sampled_axes):
+            parameters[:, column] = sampled_axis.values(unit[:, each_axis])
+        parameters[:, 9] = -parameters[:, 8]
+        parameters[:, 10] = 0
+        parameters[:, 11] = 1
+        weights = simplex_weights(unit[:, len(self.sampled_axes):], len(self.weight_columns))
+        for each_weight, weight_column in enumerate(self.weight_columns):
+            parameters[:, _MIXTURE_COLUMN + weight_column] = weights[:, each_weight]
+        return parameters
+
+    def sum_of_squares(self, parameters):
+        """Sum of squared residuals of every model (row) of parameters, inf where a constraint is broken or survival overflows."""
+        valid = np.ones(len(parameters), dtype=bool)
+        survival = []
+        for category, column in [('Alt_func', 2), ('Dos', 6), ('Non', 10)]:
+            #a category with fixed parameters has one set for the whole batch
+            parameter_sets, each_set = np.unique(parameters[:, column:column + 4], axis=0, return_inverse=True)
+            each_set = each_set.reshape(-1)
+            valid = valid & constraint_mask(category, parameter_sets)[0][each_set]
+            with np.errstate(over='ignore', invalid='ignore'):
+                survival.append(survival_table([tuple(parameter_set) for parameter_set in parameter_sets], self.times, self.engine, self.n_max, self.tolerance)[:, each_set])
+        n = self.number_of_points
+        with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+            pratio = calculate_pratio_2d(survival[0][:n], survival[1][:n], survival[2][:n], survival[0][n:], survival[1][n:], survival[2][n:], parameters[:, 14], parameters[:, 15], parameters[:, 16], parameters[:, 17])
+        residual = self.observed_pratio[:, None] - pratio
+        sum_of_squares = np.zeros(len(parameters))
+        for each_data_point in range(n):
+            sum_of_squares = (residual[each_data_point]*residual[each_data_point]) + sum_of_squares
+        sum_of_squares[~valid | ~(sum_of_squares < math.inf)] = math.inf
+        return sum_of_squares
+
+    def _draw(self, engine, batch):
+        with warnings.catch_warnings():
+            #Sobol balance wants powers of 2, the last batch of a run may not be one
+            warnings.simplefilter('ignore', UserWarning)
+            return engine.random(batch)
+
+    def shard(self, shard, shards):
+        self.shard_batches = (shard, shards)
+
+    def shard_samples(self, samples):
+        """[first, last) samples of this shard; shards are whole batches so each batch is the one an unsharded run draws."""
+        first_batch, last_batch = shard_range(math.ceil(samples/self.batch_size), *self.shard_batches)
+        return first_batch*self.batch_size, min(last_batch*self.batch_size, samples)
+
+    def run(self, samples, top_k=TOP_K, delta_ssr=DELTA_SSR, time_limit=None, progress=None, checkpoint=None):
+        """
+        Leaderboard of up to `samples` sampled models, or of this shard of them;
+        model_identifier is the position in the sequence. Samples before the shard, or
+        finished by the run a checkpoint is resumed from, are drawn again but not evaluated.
+        """
+        leaderboard = Leaderboard(top_k, delta_ssr)
+        engine = self._engine()
+        first_sample, last_sample = self.shard_samples(samples)
+        position = first_sample
+        if checkpoint is not None:
+            checkpoint.track('leaderboard', leaderboard)
+            position = checkpoint.finished('samples', first_sample)
+            self.report.resumed_samples = position - first_sample
+            self.report.invalid_samples = checkpoint.values.get('invalid_samples', 0)
+        drawn = 0
+        while drawn < position:
+            self._draw(engine, min(self.batch_size, position - drawn))
+            drawn = min(drawn + self.batch_size, position)
+        self.report.samples = position - first_sample
+        start = time.perf_counter()
+        while position < last_sample:
+            batch = min(self.batch_size, last_sample - position)
+            unit = self._draw(engine, batch)
+            parameters = self.parameters(unit)
+            sum_of_squares = self.sum_of_squares(parameters)
+            threshold = leaderboard.threshold()
+            for each_sample in np.flatnonzero(sum_of_squares <= threshold):
+                row = [position + int(each_sample), float(sum_of_squares[each_sample])] + [float(value) for value in parameters[each_sample, 2:]]
+                leaderboard.add(row)
+            self.report.invalid_samples += int(np.count_nonzero(~(sum_of_squares < math.inf)))
+            if checkpoint is not None:
+                checkpoint.complete('samples', position, position + batch)
+                checkpoint.values['invalid_samples'] = self.report.invalid_samples
+                checkpoint.save_if_due()
+            position += batch
+            self.report.samples += batch
+            self.report.batches += 1
+            self.report.seconds = time.perf_counter() - start
+            if progress is not None:
+                progress(self.report, leaderboard)
+            if time_limit is not None and self.report.seconds >= time_limit:
+                self.report.stopped_by_time_limit = position < last_sample
+                break
+        return leaderboard
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Scalar grid search: the nested loops of model selection
+
+ScalarGridSearch walks a ParameterGrid in the enumeration order TensorGridSearch
+reproduces,
+    Alt_func (b, c, d, f) x valid Dos (b, c, d) x Non (d, f) x mixture x switch
+one model at a time, with the survival of each category's parameter sets memoized in a
+SurvivalCache and the pratio of every switch value computed from one set of survival
+values. It is the reference the tensor search is checked against and the search of
+grid_search_engine = 'scalar' in the model selection script. Models whose mixture
+leaves a category dead are only evaluated at that category's representative parameter
+set unless collapse=False; with prune=True a model stops summing squared residuals
+once it can no longer make the leaderboard.
+
+The squared residuals of a model's data points come out of numpy as one list per switch
+value, so the loop over data points only adds them up; a model's parameters only become
+a row when it makes the leaderboard.
+"""
+
+import time
+import numpy as np
+from duplication_models.survival import N_MAX
+from duplication_models.cache import SURVIVAL_CACHE_SIZE, SurvivalCache
+from duplication_models.pratio import calculate_pratio_over_switches, calculate_residual
+from duplication_models.leaderboard import TOP_K, DELTA_SSR, Leaderboard
+from duplication_models.pruning import DataPointOrder, PruningStatistics, pruning_limit
+from duplication_models.dead_dimensions import dead_dimensions, first_finite_parameter_set
+from duplication_models.grid_search import shard_range, survival_table
+from duplication_models.metrics import PhaseTimer
+
+
+class ScalarGridSearch:
+    def __init__(self, grid, t1_set, t2_set, observed_pratio_set, engine='series', n_max=N_MAX, tolerance=None, term_histogram=None, cache_size=SURVIVAL_CACHE_SIZE):
+        self.grid = grid
+        self.engine = engine
+        self.n_max = n_max
+        self.tolerance = tolerance
+        self.alt_parameter_sets = grid.alt_parameter_sets()
+        self.dos_parameter_sets = grid.dos_parameter_sets()
+        self.non_parameter_sets = grid.non_parameter_sets()
+        self.mixtures = grid.mixtures()
+        self.switches = list(grid.switches)
+        self.data_set = len(observed_pratio_set)
+        self.observed_pratios = np.array(observed_pratio_set)
+        self.data_point_times = list(t1_set) + list(t2_set)
+        #survival of each category at t1 then t2 of every data point, computed once per parameter set
+        self.alt_survival_cache = SurvivalCache(self.data_point_times, cache_size, engine, n_max, tolerance, term_histogram)
+        self.dos_survival_cache = SurvivalCache(self.data_point_times, cache_size, engine, n_max, tolerance, term_histogram)
+        self.non_survival_cache = SurvivalCache(self.data_point_times, cache_size, engine, n_max, tolerance, term_histogram)
+        #every Alt_func parameter set numbers the same number of models
+        self.models_per_alt_parameter_set = len(self.dos_parameter_sets)*len(self.non_parameter_sets)*len(self.mixtures)*len(self.switches)
+        self.number_of_models = len(self.alt_parameter_sets)*self.models_per_alt_parameter_set
+        #Alt_func parameter sets this process searches, all of them unless the grid is split into shards
+        self.shard_alt_parameter_sets = (0, len(self.alt_parameter_sets))
+        self.pruning_statistics = PruningStatistics()
+        self.phase_timer = PhaseTimer()
+
+    def shard(self, shard, shards):
+        self.shard_alt_parameter_sets = shard_range(len(self.alt_parameter_sets), shard, shards)
+
+    def squared_residuals_over_switches(self, alt_survival, dos_survival, non_survival, alt, dos, non, switch_values):
+        #squared residual of every switch value (rows) and data point (columns) from one set of survival values
+        data_set = self.data_set
+        expected_probability_ratios = calculate_pratio_over_switches(alt_survival[:data_set], dos_survival[:data_set], non_survival[:data_set], alt_survival[data_set:], dos_survival[data_set:], non_survival[data_set:], alt, dos, non, switch_values)
+        residuals = calculate_residual(self.observed_pratios[:, None], expected_probability_ratios)
+        absolute_value_residuals = np.abs(residuals)
+        return (absolute_value_residuals*absolute_value_residuals).T.tolist()
+
+    def cache_info(self):
+        return {'Alt_func': self.alt_survival_cache.info(), 'Dos': self.dos_survival_cache.info(), 'Non': self.non_survival_cache.info()}
+
+    def run(self, top_k=TOP_K, delta_ssr=DELTA_SSR, prune=False, collapse=True, checkpoint=None, progress=None, metrics=None):
+        """
+        Leaderboard of the models of this shard. progress(each_alt_parameter_set) is called
+        after every Alt_func parameter set; a checkpoint records the finished ones and
+        metrics counts their models.
+        """
+        alt_parameter_sets = self.alt_parameter_sets
+        dos_parameter_sets = self.dos_parameter_sets
+        non_parameter_sets = self.non_parameter_sets
+        switches = self.switches
+        data_set = self.data_set
+        first_alt_parameter_set, last_alt_parameter_set = self.shard_alt_parameter_sets
+        model_identifier = first_alt_parameter_set*self.models_per_alt_parameter_set
+        leaderboard = Leaderboard(top_k, delta_ssr)
+        #Alt_func parameter sets already searched by the run being resumed
+        if checkpoint is not None:
+            checkpoint.track('leaderboard', leaderboard)
+            first_alt_parameter_set = checkpoint.finished('alt parameter sets', first_alt_parameter_set)
+            model_identifier = checkpoint.values.get('model_identifier', model_identifier)
+        if metrics is not None:
+            metrics.expect((last_alt_parameter_set - self.shard_alt_parameter_sets[0])*self.models_per_alt_parameter_set)
+            metrics.skip((first_alt_parameter_set - self.shard_alt_parameter_sets[0])*self.models_per_alt_parameter_set)
+            metrics.track_phases(self.phase_timer)
+            metrics.track_cache('Alt_func', self.alt_survival_cache.info)
+            metrics.track_cache('Dos', self.dos_survival_cache.info)
+            metrics.track_cache('Non', self.non_survival_cache.info)
+        #seconds of each phase, added up by hand: a context manager per lookup would cost more than the lookup
+        phase_seconds = self.phase_timer.seconds
+        clock = time.perf_counter
+        #data points in the order their squared residuals are summed: largest residuals first when pruning
+        data_point_order = DataPointOrder(data_set)
+        pruning_statistics = self.pruning_statistics
+        #with collapsing, a dead category is only evaluated at its first parameter set with finite survival
+        if collapse:
+            mixture_dead_dimensions = [dead_dimensions(alt, dos, non, switches) for alt, dos, non in self.mixtures]
+        else:
+            mixture_dead_dimensions = [[] for mixture in self.mixtures]
+        alt_representative = first_finite_parameter_set(survival_table(alt_parameter_sets, self.data_point_times, self.engine, self.n_max, self.tolerance))
+        dos_representative = first_finite_parameter_set(survival_table(dos_parameter_sets, self.data_point_times, self.engine, self.n_max, self.tolerance))
+        non_representative = first_finite_parameter_set(survival_table(non_parameter_sets, self.data_point_times, self.engine, self.n_max, self.tolerance))
+        for each_alt_parameter_set in range(first_alt_parameter_set, last_alt_parameter_set):
+            b_alt_func, c_alt_func, d_alt_func, f_alt_func = alt_parameter_sets[each_alt_parameter_set]
+            if prune:
+                data_point_order.refresh()
+            started = clock()
+            alt_survival = self.alt_survival_cache.get(b_alt_func, c_alt_func, d_alt_func, f_alt_func)
+            phase_seconds['survival'] += clock() - started
+            for each_dos_parameter_set in range(len(dos_parameter_sets)):
+                b_dos, c_dos, d_dos, f_dos = dos_parameter_sets[each_dos_parameter_set]
+                started = clock()
+                dos_survival = self.dos_survival_cache.get(b_dos, c_dos, d_dos, f_dos)
+                phase_seconds['survival'] += clock() - started
+                for each_non_parameter_set in range(len(non_parameter_sets)):
+                    b_non, c_non, d_non, f_non = non_parameter_sets[each_non_parameter_set]
+                    started = clock()
+                    non_survival = self.non_survival_cache.get(b_non, c_non, d_non, f_non)
+                    phase_seconds['survival'] += clock() - started
+                    for each_one in range(len(self.mixtures)):
+                        alt, dos, non = self.mixtures[each_one]
+                        dead = mixture_dead_dimensions[each_one]
+                        if ('Alt_func' in dead and each_alt_parameter_set != alt_representative) or ('Dos' in dead and each_dos_parameter_set != dos_representative) or ('Non' in dead and each_non_parameter_set != non_representative):
+                            model_identifier = model_identifier + len(switches)
+                            continue
+                        started = clock()
+                        squared_residuals_of_switches = self.squared_residuals_over_switches(alt_survival, dos_survival, non_survival, alt, dos, non, switches)
+                        finished_pratio = clock()
+                        phase_seconds['pratio'] += finished_pratio - started
+                        for each_switch in range(len(switches)):
+                            if 'switch' in dead and each_switch != 0:
+                                model_identifier = model_identifier+1
+                                continue
+                            squared_residuals = squared_residuals_of_switches[each_switch]
+                            data_points_evaluated = data_set
+                            if prune:
+                                limit_of_partial_sum = pruning_limit(leaderboard.threshold())
+                                partial_sum_of_squares = 0
+                                data_points_evaluated = 0
+                                for each_data_point in data_point_order.order:
+                                    partial_sum_of_squares = squared_residuals[each_data_point] + partial_sum_of_squares
+                                    data_points_evaluated = data_points_evaluated + 1
+                                    if partial_sum_of_squares > limit_of_partial_sum:
+                                        break
+                            pruning_statistics.models_evaluated = pruning_statistics.models_evaluated + 1
+                            pruning_statistics.point_evaluations = pruning_statistics.point_evaluations + data_points_evaluated
+                            pruning_statistics.point_evaluations_skipped = pruning_statistics.point_evaluations_skipped + data_set - data_points_evaluated
+                            if data_points_evaluated < data_set:
+                                pruning_statistics.models_pruned = pruning_statistics.models_pruned + 1
+                            else:
+                                #summed again in data point order, as the exhaustive search adds them up
+                                sum_of_squares_counter = 0
+                                for each_squared_residual in squared_residuals:
+                                    sum_of_squares_counter = each_squared_residual + sum_of_squares_counter
+                                if prune:
+                                    data_point_order.update(squared_residuals)
+                                if sum_of_squares_counter <= leaderboard.threshold():
+                                    leaderboard.add([model_identifier, sum_of_squares_counter, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non, alt, dos, non, switches[each_switch]])
+                            model_identifier = model_identifier+1
+                        phase_seconds['reduction'] += clock() - finished_pratio
+            if checkpoint is not None:
+                checkpoint.complete('alt parameter sets', each_alt_parameter_set, each_alt_parameter_set + 1)
+                checkpoint.values['model_identifier'] = model_identifier
+                checkpoint.save_if_due()
+            if metrics is not None:
+                metrics.advance(self.models_per_alt_parameter_set)
+            if progress is not None:
+                progress(each_alt_parameter_set)
+        return leaderboard
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Grids split into shards that run as separate processes
+
+model_selection_03_16_2024.py --shard i/M searches only the i-th (0 to M-1) of M
+contiguous ranges of the enumeration: pairs of (Alt_func, Dos) parameter sets for the
+tensor search, Alt_func parameter sets for the scalar loop, batches of samples for
+--samples. Model identifiers stay those of the whole grid. Instead of the result CSVs
+the shard writes a shard result file with its leaderboard rows, the leaderboard size
+and a fingerprint of the category, grid and settings.
+
+Every row of the whole grid's leaderboard is on the leaderboard of its own shard, so the
+merge of the M shard leaderboards is the leaderboard of a single run. The merge command
+
+    python -m duplication_models.shards <shard result files>
+
+checks that the files are the M shards of one run, merges them, and writes the minimum
+and leaderboard CSVs the single run would have written.
+"""
+
+import argparse
+import json
+import os
+from duplication_models.leaderboard import Leaderboard
+from duplication_models.grid_search import write_result_files
+
+SHARD_FORMAT = 1
+
+
+def parse_shard(text):
+    """(i, M) from 'i/M', for argparse."""
+    try:
+        shard, shards = [int(part) for part in text.split('/')]
+    except ValueError:
+        raise argparse.ArgumentTypeError("a shard is given as i/M, e.g. 0/4")
+    if shards < 1 or not 0 <= shard < shards:
+        raise argparse.ArgumentTypeError("shard i/M needs M >= 1 and 0 <= i < M")
+    return shard, shards
+
+
+def shard_file_name(minimum_file_name, shard, shards):
+    return minimum_file_name.replace('_minimum', '') + '_shard_' + str(shard) + '_of_' + str(shards) + '.json'
+
+
+def write_shard_result(path, leaderboard, shard, shards, fingerprint, model_category, minimum_file_name):
+    state = {
+        'format': SHARD_FORMAT,
+        'fingerprint': fingerprint,
+        'shard': shard,
+        'shards': shards,
+        'model_category': model_category,
+        'minimum_file_name': minimum_file_name,
+        'top_k': leaderboard.top_k,
+        'delta_ssr': leaderboard.delta_ssr,
+        'rows': leaderboard.rows(),
+    }
+    #written whole or not at all, a half written shard can not be merged by mistake
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as shard_file:
+        json.dump(state, shard_file)
+    os.replace(temporary_path, path)
+
+
+def merge_shard_results(paths):
+    """Leaderboard of the run the shard result files split, its model category and minimum CSV name."""
+    states = []
+    for path in paths:
+        with open(path) as shard_file:
+            states.append(json.load(shard_file))
+    if len(states) == 0:
+        raise ValueError("no shard result files to merge")
+    first = states[0]
+    for state in states:
+        if state.get('format') != SHARD_FORMAT or state['fingerprint'] != first['fingerprint'] or state['shards'] != first['shards']:
+            raise ValueError("the shard result files come from different grids, settings or numbers of shards")
+    found = sorted(state['shard'] for state in states)
+    if found != list(range(first['shards'])):
+        missing = sorted(set(range(first['shards'])) - set(found))
+        raise ValueError("shards " + str(found) + " of " + str(first['shards']) + " given, missing " + str(missing) + " or given twice")
+    leaderboard = Leaderboard(first['top_k'], first['delta_ssr'])
+    for state in states:
+        for row in state['rows']:
+            leaderboard.add(row)
+    return leaderboard, first['model_category'], first['minimum_file_name']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge the shard result files of a model selection run split with --shard into its minimum and leaderboard CSVs")
+    parser.add_argument('shard_files', nargs='+', help="the shard result (.json) files of every shard")
+    args = parser.parse_args(argv)
+    leaderboard, model_category, minimum_file_name = merge_shard_results(args.shard_files)
+    write_result_files(minimum_file_name, leaderboard, model_category)
+    print("merged " + str(len(args.shard_files)) + " shards into " + minimum_file_name + ".csv and its leaderboard")
+
+
+if __name__ == '__main__':
+    main()
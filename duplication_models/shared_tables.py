@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Survival tables in shared memory
+
+A SharedArray keeps a NumPy array in a multiprocessing.shared_memory block. Pickling
+one only sends the block's name, shape and dtype, and unpickling it in another process
+maps the same block, so worker processes read the parent's tables without a copy of
+their own and without serializing the data. The process that created the block unlinks
+it when the SharedArray is garbage collected or the process exits.
+
+TensorGridSearch.share_tables moves its survival tables into SharedArrays before
+parallel.parallel_grid_search starts its pool. Under the fork start method the workers
+inherit the mapping; under spawn or forkserver they attach to it by name.
+"""
+
+import os
+import weakref
+from multiprocessing import shared_memory
+import numpy as np
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        #before python 3.13 attaching also registers the block with the resource tracker;
+        #pool workers share the parent's tracker, where it is registered already
+        return shared_memory.SharedMemory(name=name)
+
+
+def _unlink(block, creator):
+    #forked workers inherit the finalizer, only the creating process unlinks
+    if os.getpid() == creator:
+        block.unlink()
+
+
+class SharedArray:
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.shape = array.shape
+        self.dtype = array.dtype
+        self._block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.name = self._block.name
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._block.buf)
+        self.array[...] = array
+        weakref.finalize(self, _unlink, self._block, os.getpid())
+
+    def __getstate__(self):
+        return {'name': self.name, 'shape': self.shape, 'dtype': self.dtype.str}
+
+    def __setstate__(self, state):
+        self.name = state['name']
+        self.shape = tuple(state['shape'])
+        self.dtype = np.dtype(state['dtype'])
+        self._block = _attach(self.name)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._block.buf)
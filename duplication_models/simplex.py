@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Grid search over a lattice of the mixture proportion simplex
+
+Given the six survival values, the four sums in calculate_pratio_2d are linear in the
+mixture (alt_func_percent, dos_percent, non_percent):
+    retained numerator   = alt*2*St1_alt*(St2_non*switch + St2_alt*(1-switch)) + dos*2*St1_dos*St2_dos + non*2*St1_non*St2_non
+    retained denominator = alt*(1-St1_alt)*St2_alt + dos*(1-St1_dos)*St2_dos + non*(1-St1_non)*St2_non
+    lost numerator       = alt*(1-St1_alt) + dos*(1-St1_dos) + non*(1-St1_non)
+    lost denominator     = alt*2*St1_alt + dos*2*St1_dos + non*2*St1_non
+    pratio = (retained numerator/retained denominator) * (lost numerator/lost denominator)
+SimplexGridSearch computes the per category terms once for every (Alt_func, Dos, Non,
+switch) combination and multiplies them against the [3 x mixtures] weight matrix, so a
+dense lattice costs little more than a handful of hand typed mixtures. The product
+has an inner dimension of 3 and is written out as three broadcast multiply-adds, which
+keeps it bit for bit the same between the full tensor and the per model gather used
+when pruning. Values agree with calculate_pratio_2d to rounding.
+"""
+
+import numpy as np
+from duplication_models.grid_search import ParameterGrid, TensorGridSearch
+
+SIMPLEX_STEP = 0.01
+
+
+def simplex_lattice(step=SIMPLEX_STEP):
+    """Every (alt, dos, non) on the simplex with coordinates a multiple of step, alt then dos ascending."""
+    divisions = int(round(1/step))
+    lattice = []
+    for each_alt in range(divisions + 1):
+        for each_dos in range(divisions + 1 - each_alt):
+            lattice.append((each_alt/divisions, each_dos/divisions, (divisions - each_alt - each_dos)/divisions))
+    return lattice
+
+
+def simplex_parameter_grid(grid, step=SIMPLEX_STEP):
+    """The grid with its mixtures replaced by the simplex lattice."""
+    lattice = simplex_lattice(step)
+    return ParameterGrid([mixture[0] for mixture in lattice], [mixture[1] for mixture in lattice], [mixture[2] for mixture in lattice], grid.switches, grid.b_alt_funcs, grid.c_alt_funcs, grid.d_alt_funcs, grid.f_alt_funcs, grid.b_doses, grid.c_doses, grid.d_doses, grid.d_nons, grid.f_nons, len(lattice))
+
+
+def _mixture_terms(st1, st2):
+    #retained denominator, lost numerator and lost denominator terms of one category
+    return (1 - st1)*st2, 1 - st1, 2*st1
+
+
+def simplex_pratio(st1_alt_func, st1_dos, st1_non, st2_alt_func, st2_dos, st2_non, alt_func_percent, dos_percent, non_percent, alt_switch_percent):
+    """calculate_pratio_2d through the linear terms of the mixture."""
+    retained_numerator_alt = 2*st1_alt_func*((st2_non*alt_switch_percent) + (st2_alt_func*(1 - alt_switch_percent)))
+    retained_numerator_dos = 2*st1_dos*st2_dos
+    retained_numerator_non = 2*st1_non*st2_non
+    alt_terms = _mixture_terms(st1_alt_func, st2_alt_func)
+    dos_terms = _mixture_terms(st1_dos, st2_dos)
+    non_terms = _mixture_terms(st1_non, st2_non)
+    retained_numerator = alt_func_percent*retained_numerator_alt + dos_percent*retained_numerator_dos + non_percent*retained_numerator_non
+    retained_denominator, lost_numerator, lost_denominator = [alt_func_percent*alt_term + dos_percent*dos_term + non_percent*non_term for alt_term, dos_term, non_term in zip(alt_terms, dos_terms, non_terms)]
+    return (retained_numerator/retained_denominator) * (lost_numerator/lost_denominator)
+
+
+class SimplexGridSearch(TensorGridSearch):
+    def pratio(self, first_pair, last_pair):
+        pairs = np.arange(first_pair, last_pair)
+        each_alt, each_dos = np.divmod(pairs, len(self.dos_parameter_sets))
+        n = self.number_of_points
+        alt_survival = self.alt_table[:, each_alt][:, :, None, None, None]
+        dos_survival = self.dos_table[:, each_dos][:, :, None, None, None]
+        with np.errstate(divide='ignore', invalid='ignore'), self.phase_timer.phase('pratio'):
+            pratio = simplex_pratio(alt_survival[:n], dos_survival[:n], self._non_t1, alt_survival[n:], dos_survival[n:], self._non_t2, self._alt_percent, self._dos_percent, self._non_percent, self._switch)
+        return pratio
+
+    def squared_residual_of_models(self, each_data_point, model_indices):
+        each_alt, each_dos, each_non, each_one, each_switch = model_indices
+        n = self.number_of_points
+        mixtures = self._alt_percent.reshape(-1), self._dos_percent.reshape(-1), self._non_percent.reshape(-1)
+        with np.errstate(divide='ignore', invalid='ignore'), self.phase_timer.phase('pratio'):
+            pratio = simplex_pratio(self.alt_table[each_data_point, each_alt], self.dos_table[each_data_point, each_dos], self.non_table[each_data_point, each_non], self.alt_table[n + each_data_point, each_alt], self.dos_table[n + each_data_point, each_dos], self.non_table[n + each_data_point, each_non], mixtures[0][each_one], mixtures[1][each_one], mixtures[2][each_one], self._switch.reshape(-1)[each_switch])
+        residual = self.observed_pratio[each_data_point] - pratio
+        return residual*residual
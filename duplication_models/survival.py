@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Probability of survival of a duplicate gene copy by time
+
+    S(t) = exp(-d*t - f * sum_n ((-b)^n * t^(c*n+1)) / (c*n*n! + n!))
+
+The sum is the power series of the integral of exp(-b*s^c) from 0 to t, truncated
+at n_max terms. survival_probability_series evaluates it for whole arrays of b, c,
+d, f and time in one broadcasted call, with the float operations of the original
+scalar loop, so every value is the loop's bit for bit; the scalar function used by
+the scripts is a thin wrapper around it. Where the loop stops with an OverflowError
+or ZeroDivisionError, the value is nan. Given a tolerance, the series stops early for
+each element once the bound on its remaining terms falls below tolerance*|sum|, and
+the number of terms used can be collected in a SeriesTermHistogram.
+
+Survival engines:
+    'series' : the truncated power series above (the original calculation)
+    'gamma'  : closed form of the same integral through the incomplete gamma function,
+               O(1) per evaluation and without the cancellation the alternating series
+               suffers for large b*t^c
+"""
+
+import math
+from functools import lru_cache
+import numpy as np
+from scipy import special
+
+N_MAX = 100
+SURVIVAL_ENGINES = ('series', 'gamma')
+
+
+def _python_number(value):
+    #the presets give integral parameters as python ints, and the loop's int arithmetic
+    #((-b)**n, c*n*n! + n!) is exact where the float one rounds
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except OverflowError:
+        return math.nan
+
+
+#distinct (b, c) pairs whose terms are kept; the optimizer and the sampling mode draw new ones
+SERIES_TERMS_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=SERIES_TERMS_CACHE_SIZE)
+def _series_terms(b, c, n_max):
+    """(-b)^n, c*n + 1 and c*n*n! + n! of every term, as floats, as the scalar loop computes them."""
+    minus_b_powers = np.empty(n_max)
+    exponents = np.empty(n_max)
+    denominators = np.empty(n_max)
+    for n in range(n_max):
+        nfac = math.factorial(n)
+        minus_b_powers[n] = _to_float((-b)**n)
+        exponents[n] = (c*n)+1
+        denominator = (c*n*nfac) + nfac
+        #the loop divides by zero here
+        denominators[n] = _to_float(denominator) if denominator != 0 else math.nan
+    for terms in (minus_b_powers, exponents, denominators):
+        terms.flags.writeable = False
+    return minus_b_powers, exponents, denominators
+
+
+def _python_pow(time, exponent):
+    try:
+        return time**exponent
+    except (OverflowError, ZeroDivisionError):
+        return math.nan
+
+
+def _python_exp(value):
+    try:
+        return math.exp(value)
+    except OverflowError:
+        return math.nan
+
+
+#numpy's pow and exp are vectorized approximations that can differ from the C library's
+#in the last bit, which the alternating series magnifies; these use python's
+_pow = np.frompyfunc(_python_pow, 2, 1)
+_exp = np.frompyfunc(_python_exp, 1, 1)
+
+
+class _SeriesTerms:
+    """
+    The terms of the series for the flattened broadcast of b, c and time. The parts of a
+    term that depend only on (b, c) are computed once per distinct pair, and t^(c*n+1)
+    once per distinct time and exponent.
+    """
+    def __init__(self, b, c, time, n_max):
+        pairs, self.pair_index = np.unique(np.stack([b, c], axis=1), axis=0, return_inverse=True)
+        self.pair_index = self.pair_index.ravel()
+        unique_times, self.time_index = np.unique(time, return_inverse=True)
+        self.time_index = self.time_index.ravel()
+        terms = [_series_terms(_python_number(pair_b), _python_number(pair_c), n_max) for pair_b, pair_c in pairs]
+        self.minus_b_powers = np.array([pair_terms[0] for pair_terms in terms]).reshape(len(pairs), n_max)
+        exponents = np.array([pair_terms[1] for pair_terms in terms]).reshape(len(pairs), n_max)
+        self.denominators = np.array([pair_terms[2] for pair_terms in terms]).reshape(len(pairs), n_max)
+        unique_exponents, self.exponent_index = np.unique(exponents, return_inverse=True)
+        self.exponent_index = self.exponent_index.reshape(exponents.shape)
+        self.time_powers = np.asarray(_pow(unique_times[:, np.newaxis], unique_exponents[np.newaxis, :]), dtype=float)
+
+    def term(self, n, elements=slice(None)):
+        pair_index = self.pair_index[elements]
+        time_powers = self.time_powers[self.time_index[elements], self.exponent_index[pair_index, n]]
+        return (self.minus_b_powers[pair_index, n]*time_powers)/self.denominators[pair_index, n]
+
+
+class SeriesTermHistogram:
+    """Counts of how many series terms each adaptive evaluation needed."""
+    def __init__(self, n_max=N_MAX):
+        self.n_max = n_max
+        self.counts = np.zeros(n_max+1, dtype=np.int64)
+        self.slowest_terms = 0
+        self.slowest_parameters = None
+
+    def add(self, terms_used, b, c, time):
+        if terms_used.size == 0:
+            return
+        self.counts += np.bincount(terms_used, minlength=self.n_max+1)[:self.n_max+1]
+        slowest = int(np.argmax(terms_used))
+        if terms_used[slowest] > self.slowest_terms:
+            self.slowest_terms = int(terms_used[slowest])
+            self.slowest_parameters = (float(b[slowest]), float(c[slowest]), float(time[slowest]))
+
+    def evaluations(self):
+        return int(self.counts.sum())
+
+    def mean_terms(self):
+        if self.evaluations() == 0:
+            return 0.0
+        return float(np.dot(np.arange(self.n_max+1), self.counts)/self.evaluations())
+
+    def summary(self):
+        evaluations = self.evaluations()
+        return {
+            'evaluations': evaluations,
+            'mean_terms': self.mean_terms(),
+            'fraction_of_terms_saved': (1 - self.mean_terms()/self.n_max) if evaluations else 0.0,
+            'not_converged': int(self.counts[self.n_max]),
+            'slowest_terms': self.slowest_terms,
+            'slowest_b_c_time': self.slowest_parameters,
+            'histogram': {terms: int(count) for terms, count in enumerate(self.counts) if count},
+        }
+
+
+def _series_summation(b, c, time, n_max):
+    shape = np.broadcast_shapes(b.shape, c.shape, time.shape)
+    terms = _SeriesTerms(np.broadcast_to(b, shape).ravel(), np.broadcast_to(c, shape).ravel(), np.broadcast_to(time, shape).ravel(), n_max)
+    summation = np.zeros(int(np.prod(shape)))
+    #terms are added in order of n so the sum matches the scalar loop
+    for n in range(n_max):
+        summation = summation + terms.term(n)
+    return summation.reshape(shape)
+
+
+def _series_summation_adaptive(b, c, time, n_max, tolerance, term_histogram):
+    #successive terms shrink by at most x/(n+1) with x = |b|*t^c, so once n+2 > x the
+    #terms after n are bounded by the geometric tail |beta_n| * q/(1-q), q = x/(n+2)
+    shape = np.broadcast_shapes(b.shape, c.shape, time.shape)
+    b = np.broadcast_to(b, shape).ravel()
+    c = np.broadcast_to(c, shape).ravel()
+    time = np.broadcast_to(time, shape).ravel()
+    terms = _SeriesTerms(b, c, time, n_max)
+    x = np.abs(b)*(time**c)
+    summation = np.zeros(b.size)
+    terms_used = np.full(b.size, n_max)
+    active = np.arange(b.size)
+    for n in range(n_max):
+        beta = terms.term(n, active)
+        active_summation = summation[active] + beta
+        summation[active] = active_summation
+        q = x[active]/(n+2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tail = np.abs(beta)*q/(1-q)
+        converged = (q < 1) & (tail <= tolerance*np.abs(active_summation))
+        terms_used[active[converged]] = n+1
+        active = active[~converged]
+        if active.size == 0:
+            break
+    if term_histogram is not None:
+        term_histogram.add(terms_used, b, c, time)
+    return summation.reshape(shape)
+
+
+def survival_probability_series(b, c, d, f, time, n_max=N_MAX, tolerance=None, term_histogram=None):
+    """Survival probability for every element of the broadcast of b, c, d, f and time.
+
+    With tolerance=None all n_max terms are summed, as in the original scripts.
+    """
+    b = np.asarray(b, dtype=float)
+    c = np.asarray(c, dtype=float)
+    d = np.asarray(d, dtype=float)
+    f = np.asarray(f, dtype=float)
+    time = np.asarray(time, dtype=float)
+    #inf - inf and overflowing products give nan and inf, as the loop's floats do, silently
+    with np.errstate(over='ignore', invalid='ignore'):
+        if tolerance is None:
+            summation = _series_summation(b, c, time, n_max)
+        else:
+            summation = _series_summation_adaptive(b, c, time, n_max, tolerance, term_histogram)
+        survival_probability = np.asarray(_exp(-d*time - f*summation), dtype=float)
+    return survival_probability
+
+
+def integral_of_exp_minus_b_s_c(b, c, time):
+    """Closed form of the integral of exp(-b*s^c) from 0 to time, with a = 1/c and x = |b|*time^c."""
+    b, c, time = np.broadcast_arrays(np.asarray(b, dtype=float), np.asarray(c, dtype=float), np.asarray(time, dtype=float))
+    a = 1/c
+    x = np.abs(b)*(time**c)
+    integral = np.array(time, dtype=float)
+    #b > 0, x >= a: Gamma(a+1) * b^-a * P(a, x), P the regularized lower incomplete gamma
+    upper = (b > 0) & (x >= a)
+    integral[upper] = time[upper]*np.exp(special.gammaln(a[upper]+1) - a[upper]*np.log(x[upper]))*special.gammainc(a[upper], x[upper])
+    #b > 0, x < a: P(a, x) underflows here, use Kummer's form t*exp(-x)*M(1, a+1, x) whose terms are all positive
+    lower = (b > 0) & (x < a)
+    integral[lower] = time[lower]*np.exp(-x[lower])*special.hyp1f1(1, a[lower]+1, x[lower])
+    #b < 0: t*M(a, a+1, x), the lower incomplete gamma at a negative argument, terms all positive
+    negative = b < 0
+    integral[negative] = time[negative]*special.hyp1f1(a[negative], a[negative]+1, x[negative])
+    #b = 0: the integral is time itself
+    return integral
+
+
+def survival_probability_gamma(b, c, d, f, time):
+    """Survival probability from the incomplete gamma closed form, same broadcasting as the series."""
+    d = np.asarray(d, dtype=float)
+    f = np.asarray(f, dtype=float)
+    time = np.asarray(time, dtype=float)
+    summation = integral_of_exp_minus_b_s_c(b, c, time)
+    survival_probability = np.exp(-d*time - f*summation)
+    return survival_probability
+
+
+def survival_probability(b, c, d, f, time, engine='series', n_max=N_MAX, tolerance=None, term_histogram=None):
+    if engine == 'series':
+        return survival_probability_series(b, c, d, f, time, n_max, tolerance, term_histogram)
+    elif engine == 'gamma':
+        return survival_probability_gamma(b, c, d, f, time)
+    else:
+        raise ValueError("unknown survival engine '" + str(engine) + "', options are " + str(SURVIVAL_ENGINES))
+
+
+def calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b, c, d, f, time, n_max=N_MAX, engine='series', tolerance=None, term_histogram=None):
+    survival_probability_value = survival_probability(b, c, d, f, time, engine, n_max, tolerance, term_histogram)
+    return float(survival_probability_value)
+
+
+def compare_survival_engines(b, c, d, f, time, n_max=N_MAX):
+    """Error of the truncated series against the gamma closed form over the broadcast of the inputs."""
+    b, c, d, f, time = np.broadcast_arrays(np.asarray(b, dtype=float), np.asarray(c, dtype=float), np.asarray(d, dtype=float), np.asarray(f, dtype=float), np.asarray(time, dtype=float))
+    series = survival_probability_series(b, c, d, f, time, n_max)
+    gamma = survival_probability_gamma(b, c, d, f, time)
+    absolute_error = np.abs(series - gamma)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative_error = np.where(gamma != 0, absolute_error/np.abs(gamma), absolute_error)
+    #a series that overflowed to inf/nan counts as the worst case
+    non_finite = ~np.isfinite(series)
+    absolute_error[non_finite] = np.inf
+    relative_error[non_finite] = np.inf
+    worst = np.unravel_index(np.argmax(relative_error), relative_error.shape)
+    report = {
+        'evaluations': int(relative_error.size),
+        'non_finite_series': int(non_finite.sum()),
+        'max_absolute_error': float(absolute_error.max()),
+        'max_relative_error': float(relative_error[worst]),
+        'worst_b': float(b[worst]),
+        'worst_c': float(c[worst]),
+        'worst_d': float(d[worst]),
+        'worst_f': float(f[worst]),
+        'worst_time': float(time[worst]),
+        'worst_series': float(series[worst]),
+        'worst_gamma': float(gamma[worst]),
+    }
+    return report
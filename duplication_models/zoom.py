@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive multi-resolution grid search
+
+Instead of a finer Cartesian product over every axis, ZoomSearch starts from the preset
+grid and only subdivides around promising cells. Level 0 is the preset grid itself;
+every model whose sum of squares is within `threshold` of the best found so far is the
+centre of a cell. Subdividing a cell evaluates the local grid made of, on every axis the
+model depends on, its value and the midpoints to the next known values on either side,
+and for the mixture, moves of half the current mixture step between each pair of its
+nonzero weights. The midpoints join the known values of their axis, so a cell that is
+still promising at the next level is subdivided again at half the spacing; two levels
+give 4x the resolution of the preset grid around the best models.
+
+Midpoints of values a decade or more apart with the same sign are geometric
+(d_alt_funcs jumps from 0.05 to 0.0005), the others arithmetic. Axes with a single
+preset value, zero mixture weights and the parameters a mixture leaves dead
+(dead_dimensions) are never subdivided, so the model category does not change. Cells
+are subdivided best first until `budget` models have been evaluated; each level is
+recorded in a ZoomLevel.
+"""
+
+import math
+from duplication_models.survival import N_MAX
+from duplication_models.leaderboard import TOP_K, DELTA_SSR, Leaderboard
+from duplication_models.pruning import PruningStatistics
+from duplication_models.dead_dimensions import dead_dimensions
+from duplication_models.grid_search import ParameterGrid, TensorGridSearch, CollapsedGridSearch
+
+ZOOM_LEVELS = 2
+ZOOM_THRESHOLD = 0.0005
+ZOOM_BUDGET = 5000000
+#spacing of the preset mixtures, halved at every level
+ZOOM_MIXTURE_STEP = 0.1
+ZOOM_LOG_HEADER = ["level", "mixture_step", "cells_subdivided", "cells_over_budget", "models_evaluated", "total_models_evaluated", "best_sum_of_squared_residuals", "models_within_threshold"]
+
+#ParameterGrid axes and the category whose survival parameters they are
+ZOOM_AXES = [('b_alt_funcs', 'Alt_func', 2), ('c_alt_funcs', 'Alt_func', 3), ('d_alt_funcs', 'Alt_func', 4), ('f_alt_funcs', 'Alt_func', 5), ('b_doses', 'Dos', 6), ('c_doses', 'Dos', 7), ('d_doses', 'Dos', 8), ('d_nons', 'Non', 12), ('f_nons', 'Non', 13), ('switches', 'switch', 17)]
+_MIXTURE_COLUMN = 14
+
+
+def midpoint(value, other):
+    if value != 0 and other != 0 and (value > 0) == (other > 0) and max(abs(value), abs(other)) >= 10*min(abs(value), abs(other)):
+        return math.copysign(math.sqrt(value*other), value)
+    return (value + other)/2
+
+
+def neighbouring_values(axis_values, value):
+    """value and the midpoints to the next smaller and larger of axis_values."""
+    smaller = [each_value for each_value in axis_values if each_value < value]
+    larger = [each_value for each_value in axis_values if each_value > value]
+    values = [value]
+    if smaller:
+        values.insert(0, midpoint(value, max(smaller)))
+    if larger:
+        values.append(midpoint(value, min(larger)))
+    return values
+
+
+def neighbouring_mixtures(mixture, step):
+    """mixture and the mixtures moving step/2 from one nonzero weight to another, keeping every nonzero weight above 0."""
+    mixtures = [tuple(mixture)]
+    nonzero = [each_weight for each_weight in range(3) if mixture[each_weight] > 0]
+    for giver in nonzero:
+        for taker in nonzero:
+            if giver == taker or mixture[giver] - step/2 <= 0:
+                continue
+            moved = list(mixture)
+            moved[giver] = round(moved[giver] - step/2, 12)
+            moved[taker] = round(moved[taker] + step/2, 12)
+            mixtures.append(tuple(moved))
+    return mixtures
+
+
+class ZoomLevel:
+    def __init__(self, level, mixture_step):
+        self.level = level
+        self.mixture_step = mixture_step
+        self.cells_subdivided = 0
+        self.cells_over_budget = 0
+        self.models_evaluated = 0
+        self.total_models_evaluated = 0
+        self.best_sum_of_squares = math.inf
+        self.models_within_threshold = 0
+
+    def csv_row(self):
+        return [self.level, self.mixture_step, self.cells_subdivided, self.cells_over_budget, self.models_evaluated, self.total_models_evaluated, self.best_sum_of_squares, self.models_within_threshold]
+
+    def summary(self):
+        return "zoom level " + str(self.level) + ": " + str(self.cells_subdivided) + " cells subdivided (" + str(self.cells_over_budget) + " over budget), " + str(self.models_evaluated) + " models evaluated (" + str(self.total_models_evaluated) + " in total), best sum of squares " + str(self.best_sum_of_squares) + ", " + str(self.models_within_threshold) + " models within threshold"
+
+
+class ZoomSearch:
+    def __init__(self, grid, t1_set, t2_set, observed_pratio_set, engine='series', n_max=N_MAX, tolerance=None, term_histogram=None, threshold=ZOOM_THRESHOLD, budget=ZOOM_BUDGET, levels=ZOOM_LEVELS, mixture_step=ZOOM_MIXTURE_STEP, search_class=TensorGridSearch):
+        self.grid = grid
+        self.search_arguments = (t1_set, t2_set, observed_pratio_set, engine, n_max, tolerance, term_histogram)
+        self.threshold = threshold
+        self.budget = budget
+        self.levels = levels
+        self.mixture_step = mixture_step
+        self.search_class = search_class
+        #known values of every axis, preset values first then the midpoints added by each level
+        self.axis_values = {axis: sorted(set(getattr(grid, axis))) for axis, category, column in ZOOM_AXES}
+        self.log = []
+        self.total_models_evaluated = 0
+        self.pruning_statistics = PruningStatistics()
+
+    def cell_grid(self, row, mixture_step):
+        """ParameterGrid of the local grid around the model of a leaderboard row."""
+        mixture = row[_MIXTURE_COLUMN:_MIXTURE_COLUMN + 3]
+        dead = dead_dimensions(mixture[0], mixture[1], mixture[2], [row[17]])
+        values = {}
+        for axis, category, column in ZOOM_AXES:
+            if category in dead:
+                values[axis] = [row[column]]
+            else:
+                values[axis] = neighbouring_values(self.axis_values[axis], row[column])
+        mixtures = neighbouring_mixtures(mixture, mixture_step)
+        return ParameterGrid([each_mixture[0] for each_mixture in mixtures], [each_mixture[1] for each_mixture in mixtures], [each_mixture[2] for each_mixture in mixtures], values['switches'], values['b_alt_funcs'], values['c_alt_funcs'], values['d_alt_funcs'], values['f_alt_funcs'], values['b_doses'], values['c_doses'], values['d_doses'], values['d_nons'], values['f_nons'])
+
+    def _record(self, zoom_level, leaderboard, models):
+        self.total_models_evaluated += models
+        zoom_level.models_evaluated += models
+        zoom_level.total_models_evaluated = self.total_models_evaluated
+        zoom_level.best_sum_of_squares = leaderboard.best_sum_of_squares
+
+    def run(self, top_k=TOP_K, delta_ssr=DELTA_SSR, prune=False, workers=1):
+        """Leaderboard over every model evaluated at any level."""
+        leaderboard = Leaderboard(top_k, delta_ssr)
+        #every model within threshold of the best so far, by parameters
+        promising = Leaderboard(1, self.threshold)
+        zoom_level = ZoomLevel(0, self.mixture_step)
+        preset_search = CollapsedGridSearch(self.grid, *self.search_arguments, search_class=self.search_class)
+        preset_leaderboard = preset_search.run(top_k, max(delta_ssr, self.threshold), prune, workers)
+        for row in preset_leaderboard.rows():
+            leaderboard.add(row)
+            promising.add(row)
+        self._record(zoom_level, leaderboard, preset_search.number_of_distinct_models)
+        self.pruning_statistics.add(preset_search.pruning_statistics)
+        zoom_level.models_within_threshold = len(promising.rows())
+        self.log.append(zoom_level)
+        next_model_identifier = preset_search.number_of_models
+        subdivided = set()
+        seen = {tuple(row[2:]) for row in leaderboard.rows()}
+        for level in range(1, self.levels + 1):
+            mixture_step = self.mixture_step/2**(level - 1)
+            zoom_level = ZoomLevel(level, mixture_step/2)
+            new_axis_values = {axis: set() for axis, category, column in ZOOM_AXES}
+            for row in promising.rows():
+                if tuple(row[2:]) in subdivided:
+                    continue
+                cell_grid = self.cell_grid(row, mixture_step)
+                #a search computes its survival tables when constructed, so the budget is checked first
+                if self.total_models_evaluated + cell_grid.number_of_models() > self.budget:
+                    zoom_level.cells_over_budget += 1
+                    continue
+                cell_search = self.search_class(cell_grid, *self.search_arguments)
+                subdivided.add(tuple(row[2:]))
+                zoom_level.cells_subdivided += 1
+                cell_leaderboard = cell_search.run(top_k, max(delta_ssr, self.threshold), prune)
+                for cell_row in cell_leaderboard.rows():
+                    #neighbouring cells share models, each is kept once under its first identifier
+                    if tuple(cell_row[2:]) in seen:
+                        continue
+                    seen.add(tuple(cell_row[2:]))
+                    cell_row = [next_model_identifier + cell_row[0]] + cell_row[1:]
+                    leaderboard.add(cell_row)
+                    promising.add(cell_row)
+                next_model_identifier += cell_search.number_of_models
+                self._record(zoom_level, leaderboard, cell_search.number_of_models)
+                self.pruning_statistics.add(cell_search.pruning_statistics)
+                for axis, category, column in ZOOM_AXES:
+                    new_axis_values[axis].update(getattr(cell_grid, axis))
+            for axis, values in new_axis_values.items():
+                self.axis_values[axis] = sorted(set(self.axis_values[axis]) | values)
+            zoom_level.best_sum_of_squares = leaderboard.best_sum_of_squares
+            zoom_level.total_models_evaluated = self.total_models_evaluated
+            zoom_level.models_within_threshold = len(promising.rows())
+            self.log.append(zoom_level)
+            if zoom_level.cells_subdivided == 0:
+                break
+        return leaderboard
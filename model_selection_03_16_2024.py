@@ -38,219 +38,79 @@ switch : percent of gene duplicates retained through ALt_func that switch to Non
 
 """
 
+
 import math
 import csv
 from datetime import datetime
 import sys
+import argparse
+from duplication_models.survival import SURVIVAL_ENGINES, compare_survival_engines, SeriesTermHistogram
+from duplication_models.presets import MODEL_CATEGORIES, observed_data_set, preset_grid
+from duplication_models.leaderboard import TOP_K, DELTA_SSR
+from duplication_models.grid_search import RESULT_HEADER, switch_sweep, ParameterGrid, TensorGridSearch, CollapsedGridSearch, write_result_files
+from duplication_models.scalar_search import ScalarGridSearch
+from duplication_models.simplex import SimplexGridSearch, simplex_lattice
+from duplication_models.dead_dimensions import unidentifiable_parameters
+from duplication_models.parallel import parallel_grid_search
+from duplication_models.pruning import PruningStatistics
+from duplication_models.constraints import violated_constraints
+from duplication_models.zoom import ZOOM_THRESHOLD, ZOOM_BUDGET, ZOOM_LOG_HEADER, ZoomSearch
+from duplication_models.sampling import SAMPLING_METHODS, SAMPLING_BATCH_SIZE, SAMPLING_SEED, SamplingSearch
+from duplication_models.checkpoint import CHECKPOINT_INTERVAL, Checkpoint, checkpoint_fingerprint
+from duplication_models.metrics import METRICS_INTERVAL, RunMetrics
+from duplication_models.shards import parse_shard, shard_file_name, write_shard_result
+from duplication_models.refine import REFINE_METHODS, REFINED_HEADER, refine_leaderboard
 
-print("start time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-
-input_model = input("Enter your model category. \n     Pre-set options include '3_mix_dup', 'alt_dos_dup', 'alt_non_dup', 'non_dos_dup', 'alt_non_mut', 'ind', '3_mix_mut'.\n     Or you can input 'other' and each parameter value yourself. \nThe Default is 'ind' : \n") or 'ind'
+#survival engine: 'series' is the truncated power series, 'gamma' the incomplete gamma closed form
+survival_engine = 'series'
+#survival_engine = 'gamma'
+#series_tolerance: None sums all n_max terms, a number stops each series once its remaining terms fall below series_tolerance*|sum|
+series_tolerance = None
+#series_tolerance = 2.220446049250313e-16
+#largest number of parameter sets each category's survival cache holds before evicting the least recently used
+survival_cache_size = 4096
+#grid search engine: 'tensor' evaluates the grid by broadcasting over survival tables, 'scalar' runs the nested loops
+grid_search_engine = 'tensor'
+#grid_search_engine = 'scalar'
+GRID_SEARCH_ENGINES = ['tensor', 'scalar']
+#the four settings above are the defaults of --survival-engine, --series-tolerance, --survival-cache-size and --grid-search-engine
 
 
-###########################################################################
-# #initialize Data Set
-data_set = 11
+def build_parser():
+    parser = argparse.ArgumentParser(description="Grid search for the best model of one model category")
+    parser.add_argument('--model', choices=MODEL_CATEGORIES + ['other'], default=None, help="model category to search; asked for when not given")
+    parser.add_argument('--survival-engine', choices=SURVIVAL_ENGINES, default=survival_engine, help="survival engine (default %(default)s)")
+    parser.add_argument('--series-tolerance', type=float, default=series_tolerance, help="stop each series once its remaining terms fall below this times |sum| (default %(default)s, all terms)")
+    parser.add_argument('--survival-cache-size', type=int, default=survival_cache_size, help="parameter sets each category's survival cache of the scalar engine holds (default %(default)s)")
+    parser.add_argument('--grid-search-engine', choices=GRID_SEARCH_ENGINES, default=grid_search_engine, help="'tensor' broadcasts over survival tables, 'scalar' runs the nested loops (default %(default)s)")
+    parser.add_argument('--workers', type=int, default=1, help="number of processes the tensor grid search is sharded across (default 1)")
+    parser.add_argument('--top-k', type=int, default=TOP_K, help="number of best models kept in the leaderboard (default %(default)s)")
+    parser.add_argument('--delta-ssr', type=float, default=DELTA_SSR, help="also keep every model within this sum of squares of the best (default %(default)s)")
+    parser.add_argument('--no-collapse', action='store_true', help="also evaluate the models that only differ in parameters a zero mixture weight makes unidentifiable")
+    parser.add_argument('--simplex-step', type=float, default=None, help="replace the preset mixtures with every (alt, dos, non) on the simplex in steps of this size, e.g. 0.01 for 5151 mixtures")
+    parser.add_argument('--switch-step', type=float, default=None, help="replace the preset switches with 0 to 1 in steps of this size, e.g. 0.01")
+    parser.add_argument('--prune', action='store_true', help="stop summing a model's squared residuals once it can no longer make the leaderboard (same results, fewer evaluations)")
+    parser.add_argument('--zoom-levels', type=int, default=0, help="after the preset grid, subdivide the cells within --zoom-threshold of the best this many times, each halving their spacing (default 0, preset grid only)")
+    parser.add_argument('--zoom-threshold', type=float, default=ZOOM_THRESHOLD, help="subdivide the cells whose sum of squares is within this of the best (default %(default)s)")
+    parser.add_argument('--zoom-budget', type=int, default=ZOOM_BUDGET, help="stop subdividing once this many models have been evaluated (default %(default)s)")
+    parser.add_argument('--samples', type=int, default=0, help="instead of the grid, evaluate this many models drawn from the ranges of the preset values, d and f on a log scale (default 0, grid search)")
+    parser.add_argument('--sample-method', choices=SAMPLING_METHODS, default='sobol', help="quasi-random sequence of --samples (default %(default)s)")
+    parser.add_argument('--seed', type=int, default=SAMPLING_SEED, help="seed of the --samples sequence (default %(default)s)")
+    parser.add_argument('--batch-size', type=int, default=SAMPLING_BATCH_SIZE, help="models of --samples evaluated together (default %(default)s)")
+    parser.add_argument('--time-limit', type=float, default=None, help="stop --samples after the first batch ending past this many seconds, keeping the leaderboard so far")
+    parser.add_argument('--refine', type=int, default=0, help="refine this many of the best leaderboard models with a bounded local optimizer (default 0, no refinement)")
+    parser.add_argument('--refine-method', choices=REFINE_METHODS, default='Nelder-Mead', help="local optimizer of --refine (default %(default)s)")
+    parser.add_argument('--checkpoint-interval', type=float, default=CHECKPOINT_INTERVAL, help="seconds between checkpoints of the search, written next to the results (default %(default)s)")
+    parser.add_argument('--no-checkpoint', action='store_true', help="do not write checkpoints")
+    parser.add_argument('--resume', action='store_true', help="continue from the checkpoint of an interrupted run with the same model category and settings")
+    parser.add_argument('--metrics', action='store_true', help="write progress records (models per second, fraction done, ETA, cache hit rates, seconds in survival, pratio and reduction) as json lines next to the results")
+    parser.add_argument('--metrics-interval', type=float, default=METRICS_INTERVAL, help="seconds between --metrics records (default %(default)s)")
+    parser.add_argument('--shard', type=parse_shard, default=None, help="search only shard i (0 to M-1) of M and write a shard result file; merge the M files with python -m duplication_models.shards")
+    return parser
 
-class Fish:
-    def __init__(self, name, t1_mya, t2_mya, observed_pratio):
-        self.name = name
-        self.t1_mya = t1_mya
-        self.t2_mya = t2_mya
-        self.observed_pratio = observed_pratio
-        self.t1 = self.calculate_t(self.t1_mya)
-        self.t2 = self.calculate_t(self.t2_mya) 
-    def calculate_t(self, t_mya):
-        fish_substitution_per_year = 0.00000000413 #BMC Genomics, Fu et al 2010
-        t = (t_mya * 1000000 * fish_substitution_per_year)
-        return(t)        
 
-    
-class Plants:
-    def __init__(self, name, t1_mya, t2_mya, observed_pratio):
-        self.name = name
-        self.t1_mya = t1_mya
-        self.t2_mya = t2_mya
-        self.observed_pratio = observed_pratio
-        self.t1 = self.calculate_t(t1_mya)
-        self.t2 = self.calculate_t(t2_mya)  
-    def calculate_t(self, t_mya):
-        plant_substitution_per_year = 0.000000006 #PNAS Wolfe et al 1987, PNAS Schultz et al 1999
-        t = (t_mya * 1000000 * plant_substitution_per_year)
-        return(t)        
-
-
-atlantic_salmon = Fish("Atlantic Salmon", 240, 80, 0.97)
-nick_p_equestrius = Plants("Nick's Phalaenopsis equestrius", 54, 76, 0.94)
-nick_p1_p_halli = Plants("Nick's Pair 1 Panicum halli", 8, 99, 0.92) # 110 mya, 107.5mya(t1 = 2.5, t2 = 107.5)OR t1 = 0-35, t2 = 100-120
-nick_p1_o_brachyantha = Plants("Nick's Pair 1 Oryza brachyantha", 8, 99, 0.93) #110 mya, 107.5mya (t1 = 2.5, t2 = 107.5)OR t1 = 0-35, t2 = 100-120
-nick_p2_p_halli = Plants("Nick's Pair 2 Panicum halli", 25, 99, 0.88)#122.5mya, 107.5mya(t1 = 15, t2 = 107.5) OR t1 = 0-40, t2 = 95-120
-nick_p2_o_brachyantha = Plants("Nick's Pair 2 Oryza brachyantha", 25, 99, 0.87)#122.5mya,107.5mya (t1 = 15, t2 = 107.5) OR  t1 = 0-40, t2 = 95-120
-nick_p3_p_halli = Plants("Nick's Pair 3 Panicum halli", 17, 107, 0.87)#122.5mya, 110mya (t1 =12.5, t2 =110)OR  t1 = 5-25, t2 = 95-120
-nick_p3_o_brachyantha = Plants("Nick's Pair 3 Oryza brachyantha", 17, 107, 0.86)#122.5mya, 110mya(t1 =12.5, t2 =110)OR t1 = 5-25, t2 = 95-120
-nick_p3_a_comosus = Plants("Nick's Pair 3 Ananas comosus", 17, 107, 0.87)
-nick_p4_e_guineensis = Plants("Nick's Pair 4 Elaeis guineensis", 49, 75, 0.91)
-nick_p4_p_dactylifera = Plants("Nick's Pair 4 Phoenix dactylifera", 49, 75, 0.90)
-
-t1_set = [atlantic_salmon.t1, nick_p_equestrius.t1, nick_p1_p_halli.t1, nick_p1_o_brachyantha.t1, nick_p2_p_halli.t1, nick_p2_o_brachyantha.t1, nick_p3_p_halli.t1, nick_p3_o_brachyantha.t1, nick_p3_a_comosus.t1, nick_p4_e_guineensis.t1, nick_p4_p_dactylifera.t1]
-t2_set = [atlantic_salmon.t2, nick_p_equestrius.t2, nick_p1_p_halli.t2, nick_p1_o_brachyantha.t2, nick_p2_p_halli.t2, nick_p2_o_brachyantha.t2, nick_p3_p_halli.t2, nick_p3_o_brachyantha.t2, nick_p3_a_comosus.t2, nick_p4_e_guineensis.t2, nick_p4_p_dactylifera.t2]
-observed_pratio_set = [atlantic_salmon.observed_pratio, nick_p_equestrius.observed_pratio, nick_p1_p_halli.observed_pratio, nick_p1_o_brachyantha.observed_pratio, nick_p2_p_halli.observed_pratio, nick_p2_o_brachyantha.observed_pratio, nick_p3_p_halli.observed_pratio, nick_p3_o_brachyantha.observed_pratio, nick_p3_a_comosus.observed_pratio, nick_p4_e_guineensis.observed_pratio, nick_p4_p_dactylifera.observed_pratio]
-
-
-###########################################################################
-#INITIALIZE PARAMTER VALUES
-if input_model == '3mix_dup':
-    #1.	3 Mixture Gene Duplicability Model
-    file3_name = 'model_selection_03_16_2024_coarse_3mix_dup_sum_of_squares_minimum'
-    number_of_percent_combos = 11
-    alts = [0.80, 0.10, 0.10,
-            0.60, 0.60, 0.60,
-            0.40, 0.40, 0.20,
-            0.20, 0.20]
-    doses = [0.10, 0.10, 0.80,
-             0.10, 0.20, 0.30,
-             0.40, 0.20, 0.40,
-             0.60, 0.20]
-    nons = [0.10, 0.80, 0.10,
-            0.30, 0.20, 0.10, 
-            0.20, 0.40, 0.40,
-            0.20, 0.6]
-    switches = [0]
-    b_alt_funcs = [5, 10, 15, 30, 35]
-    c_alt_funcs = [0.5, 1, 3, 5]
-    d_alt_funcs = [50, 5, 0.5, 0.05, 0.0005]
-    f_alt_funcs = [0.5, 2, 5, 8, 10]
-    b_doses= [-1, -10, -12, -14, -16, -18, -20, -30, -50]
-    c_doses = [0.025, 0.05, 0.2, 0.4, 0.6, 0.8]
-    d_doses = [-0.03, -0.0003, -0.000003, -0.00000003, -0.0000000003]
-    b_nons = [0]
-    c_nons = [1]
-    d_nons = [10.01]
-    f_nons = [0.01, 5, 20, 50]
-elif input_model == 'alt_dos_dup':
-    #2.	2 Mix (Alt+Dos) Gene Duplicability Model
-    file3_name = 'model_selection_03_16_2024_coarse_alt_dos_dup_sum_of_squares_minimum'
-    number_of_percent_combos = 5
-    alts = [0.9, 0.80, 0.60, 0.20, 0.10]
-    doses = [0.1, 0.20, 0.40, 0.80, 0.90]
-    nons = [0.0, 0.0, 0.0, 0.0, 0.0]
-    switches = [0]
-    b_alt_funcs = [5, 10, 15, 30, 35]
-    c_alt_funcs = [0.5, 1, 3, 5]
-    d_alt_funcs = [50, 5, 0.5, 0.05, 0.0005]
-    f_alt_funcs = [0.5, 2, 5, 8, 10]
-    b_doses= [-1, -10, -12, -14, -16, -18, -20, -30, -50]
-    c_doses = [0.025, 0.05, 0.2, 0.4, 0.6, 0.8]
-    d_doses = [-0.03, -0.0003, -0.000003, -0.00000003, -0.0000000003]
-    b_nons = [0]
-    c_nons = [1]
-    d_nons = [10.01]
-    f_nons = [0.01]
-elif input_model == 'alt_non_dup':
-    #3.	2 Mix (Alt+Non) Gene Duplicability Model
-    file3_name = 'model_selection_03_16_2024_coarse_alt_non_dup_sum_of_squares_minimum'
-    number_of_percent_combos = 5
-    alts = [0.9, 0.80, 0.60, 0.20, 0.10]
-    doses = [0.0, 0.0, 0.0, 0.0, 0.0]
-    nons = [0.1, 0.20, 0.40, 0.80, 0.90]
-    switches = [0]
-    b_alt_funcs = [5, 10, 15, 30, 35]
-    c_alt_funcs = [0.5, 1, 3, 5]
-    d_alt_funcs = [50, 5, 0.5, 0.05, 0.0005]
-    f_alt_funcs = [0.5, 2, 5, 8, 10]
-    b_doses= [-12]
-    c_doses = [0.6]
-    d_doses = [-0.03]
-    b_nons = [0]
-    c_nons = [1]
-    d_nons = [10.01, 20]
-    f_nons = [0.01, 5, 20, 50]
-elif input_model == 'non_dos_dup':
-    #4.	2 Mix (Non+Dos) Gene Duplicability Model
-    file3_name = 'model_selection_03_16_2024_coarse_non_dos_dup_sum_of_squares_minimum'
-    number_of_percent_combos = 5
-    alts = [0.0, 0.0, 0.0, 0.0, 0.0]
-    doses = [0.9, 0.80, 0.60, 0.20, 0.10]
-    nons = [0.1, 0.20, 0.40, 0.80, 0.90]
-    switches = [0]
-    b_alt_funcs = [35]
-    c_alt_funcs = [0.5]
-    d_alt_funcs = [50]
-    f_alt_funcs = [10]
-    b_doses= [-1, -10, -12, -14, -16, -18, -20, -30, -50]
-    c_doses = [0.025, 0.05, 0.2, 0.4, 0.6, 0.8]
-    d_doses = [-0.03, -0.0003, -0.000003, -0.00000003, -0.0000000003]
-    b_nons = [0]
-    c_nons = [1]
-    d_nons = [10.01, 20]
-    f_nons = [0.01, 5, 10, 20, 50]
-elif input_model == 'alt_non_mut':
-    #5.	2 Mix (Alt+Non) Mutational Opportunity Model
-    file3_name = 'model_selection_03_16_2024_coarse_alt_non_mut_sum_of_squares_minimum'
-    number_of_percent_combos = 5
-    alts = [0.9, 0.80, 0.60, 0.20, 0.10]
-    doses = [0.0, 0.0, 0.0, 0.0, 0.0]
-    nons = [0.1, 0.20, 0.40, 0.80, 0.90]
-    switches = [0.1, 0.20, 0.5]
-    b_alt_funcs = [5, 10, 15, 30, 35]
-    c_alt_funcs = [0.5, 1, 3, 5]
-    d_alt_funcs = [50, 5, 0.5, 0.05, 0.0005]
-    f_alt_funcs = [0.5, 2, 5, 8, 10]
-    b_doses= [-12]
-    c_doses = [0.6]
-    d_doses = [-0.03]
-    b_nons = [0]
-    c_nons = [1]
-    d_nons = [10.01, 20]
-    f_nons = [0.01, 5, 20, 50]
-elif input_model == 'ind':
-    #6.	Independence Model
-    file3_name = 'model_selection_03_16_2024_2024_coarse_ind_sum_of_squares_minimum'
-    number_of_percent_combos = 1
-    alts = [0.0]
-    doses = [0.0]
-    nons = [1.0]
-    switches = [0]
-    b_alt_funcs = [35]
-    c_alt_funcs = [0.5]
-    d_alt_funcs = [50]
-    f_alt_funcs = [10]
-    b_doses= [-12]
-    c_doses = [0.6]
-    d_doses = [-0.03]
-    b_nons = [0]
-    c_nons = [1]
-    d_nons = [10.01]
-    f_nons = [0.01]
-elif input_model == "3mix_mut":
-    #7.	3 Mixture Mutational Opportunity Model
-    file3_name = 'model_selection_03_16_2024_coarse_3mix_mut_sum_of_squares_minimum'
-    number_of_percent_combos = 11
-    alts = [0.80, 0.10, 0.10,
-            0.60, 0.60, 0.60,
-            0.40, 0.40, 0.20,
-            0.20, 0.20]
-    doses = [0.10, 0.10, 0.80,
-             0.10, 0.20, 0.30,
-             0.40, 0.20, 0.40,
-             0.60, 0.20]
-    nons = [0.10, 0.80, 0.10,
-            0.30, 0.20, 0.10, 
-            0.20, 0.40, 0.40,
-            0.20, 0.6]
-    switches = [0.1, 0.20, 0.5]
-    b_alt_funcs = [5, 10, 15, 30, 35]
-    c_alt_funcs = [0.5, 1, 3, 5]
-    d_alt_funcs = [50, 5, 0.5, 0.05, 0.0005]
-    f_alt_funcs = [0.5, 2, 5, 8, 10]
-    b_doses= [-1, -10, -12, -14, -16, -18, -20, -30, -50]
-    c_doses = [0.025, 0.05, 0.2, 0.4, 0.6, 0.8]
-    d_doses = [-0.03, -0.0003, -0.000003, -0.00000003, -0.0000000003]
-    b_nons = [0]
-    c_nons = [1]
-    d_nons = [10.01]
-    f_nons = [0.01, 5, 20, 50]
-elif input_model == 'other':
+def prompt_for_model():
+    """Minimum CSV name and one model ParameterGrid from parameter values typed in, exits on an invalid value."""
     file3_name = input("Enter your model name: ")
     alt = float(input("Enter the proportion of your starting genome that starts in the Alt_func category: "))
     dos = float(input("Enter the proportion of your starting genome that starts in the Dos category: "))
@@ -268,37 +128,37 @@ elif input_model == 'other':
     else:
         pass
     b_alt_func = float(input("Enter the b parameter for the Alt_func category: "))
-    if b_alt_func <= 0:
+    if violated_constraints('Alt_func', b=b_alt_func):
         print("you've entered an invalid parameter value, please try again")
         sys.exit()
     else:
         pass
     c_alt_func = float(input("Enter the c parameter for the Alt_func category: "))
-    if c_alt_func <= 0:
+    if violated_constraints('Alt_func', c=c_alt_func):
         print("you've entered an invalid parameter value, please try again")
         sys.exit()
     else:
         pass
     d_alt_func = float(input("Enter the d parameter for the Alt_func category: "))
-    if d_alt_func <= 0:
+    if violated_constraints('Alt_func', d=d_alt_func):
         print("you've entered an invalid parameter value, please try again")
         sys.exit()
     else:
         pass
     f_alt_func = float(input("Enter the f parameter for the Alt_func category: "))
-    if f_alt_func <= 0:
+    if violated_constraints('Alt_func', f=f_alt_func):
         print("you've entered an invalid parameter value, please try again")
         sys.exit()
     else:
         pass
     b_dos = float(input("Enter the b parameter for the Dos category: "))
-    if b_dos >= 0:
+    if violated_constraints('Dos', b=b_dos):
         print("you've entered an invalid parameter value, please try again")
         sys.exit()
     else:
         pass
     c_dos = float(input("Enter the c parameter for the Dos category: "))
-    if c_dos <= 0 or c_dos > 1:
+    if violated_constraints('Dos', c=c_dos):
         print("you've entered an invalid parameter value, please try again")
         sys.exit()
     else:
@@ -310,182 +170,246 @@ elif input_model == 'other':
         sys.exit()
     else:
         pass
-    number_of_percent_combos = 1
-    alts = []
-    doses = []
-    nons = []
-    switches = []
-    b_alt_funcs = []
-    c_alt_funcs = []
-    d_alt_funcs = []
-    f_alt_funcs = []
-    b_doses= []
-    c_doses = []
-    d_doses = []
-    b_nons = [0]
-    c_nons = [1]
-    d_nons = [10.01]
-    f_nons = []
-    alts.append(alt)
-    doses.append(dos)
-    nons.append(non)
-    switches.append(switch)
-    b_alt_funcs.append(b_alt_func)
-    c_alt_funcs.append(c_alt_func)
-    d_alt_funcs.append(d_alt_func)
-    f_alt_funcs.append(f_alt_func)
-    b_doses.append(b_dos)
-    c_doses.append(c_dos)
-    d_doses.append(d_dos)
-    f_nons.append(f_non)
-
-
-###########################################################################
-
-class Data_Point:
-    def __init__(self, alt_value, dos_value, non_value, switch_value, b_alt_func_value, c_alt_func_value, d_alt_func_value, f_alt_func_value, b_dos_value, c_dos_value, d_dos_value, f_dos_value, b_non_value, c_non_value, d_non_value, f_non_value, expected_pratio_value, residual_value, absolute_residual_value):
-        self.alt_value = alt_value
-        self.dos_value = dos_value
-        self.non_value = non_value
-        self.switch_value = switch_value
-        self.b_alt_func_value = b_alt_func_value
-        self.c_alt_func_value = c_alt_func_value
-        self.d_alt_func_value = d_alt_func_value
-        self.f_alt_func_value = f_alt_func_value
-        self.b_dos_value = b_dos_value
-        self.c_dos_value = c_dos_value
-        self.d_dos_value = d_dos_value
-        self.f_dos_value = f_dos_value
-        self.b_non_value = b_non_value
-        self.c_non_value = c_non_value
-        self.d_non_value = d_non_value
-        self.f_non_value = f_non_value 
-        self.expected_pratio_value = expected_pratio_value
-        self.residual_value = residual_value
-        self.absolute_residual_value = absolute_residual_value
-###########################################################################
-        
-#Functions
-
-def calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b, c, d, f, time):  
-    summation = 0
-    n_max = 100
-    for n in range(0,n_max):
-        nfac = math.factorial(n)
-        beta = (((-b)**n)*(time**((c*n)+1)))/((c*n*nfac) + nfac)
-        summation = summation + beta
-        # print("summation: " + str(summation))
-    survival_probability = math.exp(-d*time - f*summation)
-    return survival_probability
-    
-def calculate_pratio_2d(st1_alt_func, st1_dos, st1_non, st2_alt_func, st2_dos, st2_non, alt_func_percent, dos_percent, non_percent, alt_switch_percent):    
-    alt_ret =  (2*alt_func_percent*st1_alt_func)
-    alt_ret_ret_switch = alt_ret*st2_non *alt_switch_percent
-    alt_ret_ret_noswitch = alt_ret*st2_alt_func * (1-alt_switch_percent)
-    dos_ret = (2*dos_percent*st1_dos)
-    dos_ret_ret = dos_ret * st2_dos   
-    non_ret = (2*non_percent*st1_non)
-    non_ret_ret = non_ret * st2_non
-    alt_noret = ((1-st1_alt_func)*alt_func_percent)
-    alt_noret_ret = alt_noret * st2_alt_func
-    dos_noret = ((1-st1_dos)*dos_percent)
-    dos_noret_ret = dos_noret * st2_dos    
-    non_noret = ((1-st1_non)*non_percent)
-    non_noret_ret = non_noret * st2_non
-    pratio = ((alt_ret_ret_noswitch + alt_ret_ret_switch + dos_ret_ret + non_ret_ret)/(alt_noret_ret + dos_noret_ret + non_noret_ret)) * ((alt_noret + dos_noret + non_noret)/(alt_ret + dos_ret + non_ret))                                 
-    return pratio  
-    
-def calculate_expected_pratio(t1, t2, alt_func_percent, dos_percent, non_percent, alt_switch_percent, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non):
-    alt_func_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_alt_func, c_alt_func, d_alt_func, f_alt_func, t1)
-    dos_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_dos, c_dos, d_dos, f_dos, t1)
-    non_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_non, c_non, d_non, f_non, t1)   
-    alt_func_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_alt_func, c_alt_func, d_alt_func, f_alt_func, t2)
-    dos_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_dos, c_dos, d_dos, f_dos, t2)
-    non_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_non, c_non, d_non, f_non, t2)       
-    probability_ratio_2d = calculate_pratio_2d(alt_func_survival_t1, dos_survival_t1, non_survival_t1, alt_func_survival_t2, dos_survival_t2, non_survival_t2, alt_func_percent, dos_percent, non_percent, alt_switch_percent)
-    return probability_ratio_2d
-
-def calculate_residual(observed_pratio, expected_pratio):
-    residual = observed_pratio - expected_pratio
-    return residual    
-
-def main(t1, t2, observed_pratio, alt, dos, non, switch, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non):
-    expected_probability_ratio = calculate_expected_pratio(t1, t2, alt, dos, non, switch, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non)
-    residual = calculate_residual(observed_pratio, expected_probability_ratio)
-    return expected_probability_ratio, residual
-
-########################################
-#LOOP ACROSS ALL VALID PARAMETER VALUES ACROSS GRID
-model_identifier = 0
-minimum_sum_of_squares = 1
-for each_b_alt_func in range(len(b_alt_funcs)):
-    for each_c_alt_func in range(len(c_alt_funcs)):
-        for each_d_alt_func in range(len(d_alt_funcs)):
-            for each_f_alt_func in range(len(f_alt_funcs)):
-                for each_b_dos in range(len(b_doses)):
-                    for each_c_dos in range(len(c_doses)):
-                        for each_d_dos in range(len(d_doses)):
-                            b_dos = b_doses[each_b_dos]
-                            c_dos = c_doses[each_c_dos]
-                            d_dos = d_doses[each_d_dos]
-                            f_dos = -1*d_doses[each_d_dos]
-                            llambda = f_dos * math.exp((-b_dos*(0.02**c_dos)) + d_dos)
-                            if llambda < 0.1:
-                                pass
-                            elif llambda >= 0.1:
-                                continue
-                                print('Dos category does not meet requirements of a hazard less than 0.1 for time = 0.02')
-                            else:
-                                print("error")  
-                                pass
-                            for each_d_non in range(len(d_nons)):
-                                for each_f_non in range(len(f_nons)):
-                                    for each_one in range(number_of_percent_combos):
-                                        for each_switch in range(len(switches)):   
-                                            sum_of_squares_counter = 0
-                                            for each_data_point in range(data_set):
-                                                t1 = t1_set[each_data_point]
-                                                t2 = t2_set[each_data_point]
-                                                observed_pratio = observed_pratio_set[each_data_point]       
-                                                alt = alts[each_one]
-                                                dos = doses[each_one]
-                                                non = nons[each_one]
-                                                switch = switches[each_switch]
-                                                b_alt_func = b_alt_funcs[each_b_alt_func]
-                                                c_alt_func = c_alt_funcs[each_c_alt_func]
-                                                d_alt_func = d_alt_funcs[each_d_alt_func]
-                                                f_alt_func = f_alt_funcs[each_f_alt_func]
-                                                b_dos = b_doses[each_b_dos]
-                                                c_dos = c_doses[each_c_dos]
-                                                d_dos = d_doses[each_d_dos]
-                                                f_dos = -1*d_doses[each_d_dos]
-                                                b_non = 0
-                                                c_non = 1
-                                                d_non = d_nons[each_d_non]
-                                                f_non = f_nons[each_f_non]  
-                                                main_output = main(t1, t2, observed_pratio, alt, dos, non, switch, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non)
-                                                expected_pratio = main_output[0]
-                                                residual = main_output[1]
-                                                absolute_value_residual = abs(residual)
-                                                sum_of_squares_counter = (absolute_value_residual*absolute_value_residual) + sum_of_squares_counter
-                                                data1 = Data_Point(alt, dos, non, switch, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non, expected_pratio, residual, absolute_value_residual) 
-                                                if each_data_point == (data_set-1):
-                                                    if sum_of_squares_counter < minimum_sum_of_squares:
-                                                        minimum_sum_of_squares = sum_of_squares_counter
-                                                        row_to_write3 = [model_identifier, sum_of_squares_counter, data1.b_alt_func_value, data1.c_alt_func_value, data1.d_alt_func_value, data1.f_alt_func_value, data1.b_dos_value, data1.c_dos_value, data1.d_dos_value, data1.f_dos_value, data1.b_non_value, data1.c_non_value, data1.d_non_value, data1.f_non_value, data1.alt_value, data1.dos_value, data1.non_value, data1.switch_value]
-                                                    else:
-                                                        pass
-                                                else:
-                                                    pass
-                                            model_identifier = model_identifier+1
-    print(str(each_b_alt_func))
-
-#PRINT BEST MODEL
-file3 = open(file3_name +'.csv', 'w+', newline='')
-writer3 = csv.writer(file3, delimiter=',')
-write_header_row3 = ["model_number", "sum_of_squared_residuals", "b_alt_func", "c_alt_func", "d_alt_func", "f_alt_func", "b_dos", "c_dos", "d_dos", "f_dos", "b_non", "c_non", "d_non", "f_non", "alt_percent", "dos_percent", "non_percent", "percent_switch"]
-writer3.writerow(write_header_row3)    
-writer3.writerow(row_to_write3)
-file3.close()
-
-print("end time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    return file3_name, ParameterGrid([alt], [dos], [non], [switch], [b_alt_func], [c_alt_func], [d_alt_func], [f_alt_func], [b_dos], [c_dos], [d_dos], [10.01], [f_non], 1)
+
+
+#ERROR OF THE SERIES AGAINST THE GAMMA CLOSED FORM ACROSS THIS GRID
+def print_survival_engine_report(category, parameter_sets, data_point_times):
+    b = [[parameters[0]] for parameters in parameter_sets]
+    c = [[parameters[1]] for parameters in parameter_sets]
+    d = [[parameters[2]] for parameters in parameter_sets]
+    f = [[parameters[3]] for parameters in parameter_sets]
+    report = compare_survival_engines(b, c, d, f, data_point_times)
+    print(category + " survival, series vs gamma over " + str(report['evaluations']) + " evaluations: max absolute error " + str(report['max_absolute_error']) + ", max relative error " + str(report['max_relative_error']) + " at b=" + str(report['worst_b']) + " c=" + str(report['worst_c']) + " d=" + str(report['worst_d']) + " f=" + str(report['worst_f']) + " t=" + str(report['worst_time']) + ", non-finite series values: " + str(report['non_finite_series']))
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.resume and args.zoom_levels > 0:
+        parser.error("--resume does not apply to --zoom-levels")
+    if args.shard is not None and (args.zoom_levels > 0 or args.refine > 0):
+        parser.error("--shard does not apply to --zoom-levels or --refine, which need the whole leaderboard")
+
+    survival_engine = args.survival_engine
+    series_tolerance = args.series_tolerance
+    survival_cache_size = args.survival_cache_size
+    grid_search_engine = args.grid_search_engine
+
+    print("start time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    input_model = args.model or input("Enter your model category. \n     Pre-set options include " + ", ".join("'" + model_category + "'" for model_category in MODEL_CATEGORIES) + ".\n     Or you can input 'other' and each parameter value yourself. \nThe Default is 'ind' : \n") or 'ind'
+    series_term_histogram = SeriesTermHistogram()
+
+    ###########################################################################
+    # #initialize Data Set
+    data_points = observed_data_set()
+    t1_set = data_points.t1_set
+    t2_set = data_points.t2_set
+    observed_pratio_set = data_points.observed_pratio_set
+    data_point_times = data_points.times
+
+    ###########################################################################
+    #INITIALIZE PARAMTER VALUES
+    if input_model == 'other':
+        file3_name, grid = prompt_for_model()
+    elif input_model in MODEL_CATEGORIES:
+        grid, file3_name = preset_grid(input_model)
+    else:
+        print(input_model + " is not a model category, please try again")
+        sys.exit()
+
+    ###########################################################################
+    #DENSE MIXTURE LATTICE instead of the preset mixtures
+    if args.simplex_step is not None:
+        lattice = simplex_lattice(args.simplex_step)
+        grid.alts = [mixture[0] for mixture in lattice]
+        grid.doses = [mixture[1] for mixture in lattice]
+        grid.nons = [mixture[2] for mixture in lattice]
+        grid.number_of_percent_combos = len(lattice)
+        file3_name = file3_name.replace('_minimum', '_simplex_' + str(args.simplex_step) + '_minimum')
+        #pratio through the terms that are linear in the mixture, one product against the whole lattice
+        tensor_search_class = SimplexGridSearch
+    else:
+        tensor_search_class = TensorGridSearch
+
+    #FINE SWEEP OF THE SWITCH instead of the preset switches; every switch value shares one survival computation
+    if args.switch_step is not None:
+        grid.switches = switch_sweep(args.switch_step)
+        file3_name = file3_name.replace('_minimum', '_switch_' + str(args.switch_step) + '_minimum')
+
+    ###########################################################################
+    #VALID PARAMETER SETS OF EACH CATEGORY, built once before the search
+    alt_parameter_sets = grid.alt_parameter_sets()
+    dos_parameter_sets = grid.dos_parameter_sets()
+    non_parameter_sets = grid.non_parameter_sets()
+    for category in ['Alt_func', 'Dos', 'Non']:
+        print(grid.constraint_reports[category].summary())
+
+    #parameters that a zero mixture weight leaves without effect: each distinct model is evaluated once unless --no-collapse
+    mixtures_by_unidentifiable_parameters = {}
+    for alt, dos, non in grid.mixtures():
+        unidentifiable = " ".join(unidentifiable_parameters(alt, dos, non, grid.switches)) or "none"
+        mixtures_by_unidentifiable_parameters.setdefault(unidentifiable, []).append((alt, dos, non))
+        if args.simplex_step is None:
+            print("mixture " + str((alt, dos, non)) + " unidentifiable parameters: " + unidentifiable)
+    if args.simplex_step is not None:
+        for unidentifiable, mixtures in mixtures_by_unidentifiable_parameters.items():
+            print(str(len(mixtures)) + " lattice mixtures with unidentifiable parameters: " + unidentifiable)
+
+    if survival_engine == 'gamma':
+        print_survival_engine_report("Alt_func", alt_parameter_sets, data_point_times)
+        print_survival_engine_report("Dos", dos_parameter_sets, data_point_times)
+        print_survival_engine_report("Non", non_parameter_sets, data_point_times)
+
+    if args.samples > 0:
+        file3_name = file3_name.replace('_minimum', '_' + args.sample_method + '_' + str(args.samples) + '_seed_' + str(args.seed) + '_minimum')
+    elif grid_search_engine == 'tensor' and args.zoom_levels > 0:
+        file3_name = file3_name.replace('_minimum', '_zoom_' + str(args.zoom_levels) + '_minimum')
+
+    #everything that decides the results of this run, checkpoints and shard results of a different run are refused
+    run_settings = {
+        'model_category': input_model,
+        'grid': {setting: value for setting, value in vars(grid).items() if setting != 'constraint_reports'},
+        'survival_engine': survival_engine,
+        'series_tolerance': series_tolerance,
+        'grid_search_engine': grid_search_engine,
+        'arguments': {setting: getattr(args, setting) for setting in ['top_k', 'delta_ssr', 'no_collapse', 'simplex_step', 'switch_step', 'samples', 'sample_method', 'seed', 'batch_size']},
+    }
+    if args.shard is not None:
+        shard, shards = args.shard
+        print("searching shard " + str(shard) + " of " + str(shards) + " (0 to " + str(shards - 1) + ")")
+
+    #CHECKPOINT: what has been searched so far, so an interrupted run can --resume
+    #the zoom search is not checkpointed, the grid, scalar and sampling searches are
+    if args.no_checkpoint or (grid_search_engine == 'tensor' and args.zoom_levels > 0 and args.samples == 0):
+        checkpoint = None
+    else:
+        if args.shard is None:
+            checkpoint_path = file3_name.replace('_minimum', '') + '_checkpoint.json'
+        else:
+            checkpoint_path = shard_file_name(file3_name, shard, shards).replace('.json', '_checkpoint.json')
+        checkpoint = Checkpoint(checkpoint_path, checkpoint_fingerprint(dict(run_settings, shard=args.shard)), args.checkpoint_interval)
+        if args.resume and checkpoint.load():
+            print("resuming from " + checkpoint.path)
+        elif args.resume:
+            print("no checkpoint at " + checkpoint.path + ", starting from the beginning")
+
+    #METRICS: throughput and ETA of the grid and scalar searches
+    if args.metrics and (args.samples > 0 or (grid_search_engine == 'tensor' and args.zoom_levels > 0)):
+        print("--metrics only applies to the grid and scalar searches, no metrics written")
+        metrics = None
+    elif args.metrics:
+        if args.shard is None:
+            metrics_path = file3_name.replace('_minimum', '') + '_metrics.jsonl'
+        else:
+            metrics_path = shard_file_name(file3_name, shard, shards).replace('.json', '_metrics.jsonl')
+        metrics = RunMetrics(metrics_path, args.metrics_interval)
+    else:
+        metrics = None
+
+    ########################################
+    #LOOP ACROSS ALL VALID PARAMETER VALUES ACROSS GRID
+    if args.samples > 0:
+        sampling_search = SamplingSearch(grid, t1_set, t2_set, observed_pratio_set, args.sample_method, args.seed, survival_engine, batch_size=args.batch_size, tolerance=series_tolerance)
+        if args.shard is not None:
+            sampling_search.shard(shard, shards)
+        def print_sampling_progress(report, leaderboard):
+            #a line whenever a batch finds a better model
+            if leaderboard.best_sum_of_squares < print_sampling_progress.best_sum_of_squares:
+                print(str(report.samples) + " samples in " + str(round(report.seconds, 2)) + " s, best sum of squares " + str(leaderboard.best_sum_of_squares))
+                print_sampling_progress.best_sum_of_squares = leaderboard.best_sum_of_squares
+        print_sampling_progress.best_sum_of_squares = math.inf
+        leaderboard = sampling_search.run(args.samples, args.top_k, args.delta_ssr, args.time_limit, print_sampling_progress, checkpoint)
+        print("sampling: " + str(sampling_search.report.summary()))
+        pruning_statistics = PruningStatistics()
+    elif grid_search_engine == 'tensor' and args.zoom_levels > 0:
+        tensor_grid_search = ZoomSearch(grid, t1_set, t2_set, observed_pratio_set, survival_engine, tolerance=series_tolerance, term_histogram=series_term_histogram, threshold=args.zoom_threshold, budget=args.zoom_budget, levels=args.zoom_levels, search_class=tensor_search_class)
+        leaderboard = tensor_grid_search.run(args.top_k, args.delta_ssr, args.prune, args.workers)
+        for zoom_level in tensor_grid_search.log:
+            print(zoom_level.summary())
+        pruning_statistics = tensor_grid_search.pruning_statistics
+    elif grid_search_engine == 'tensor' and not args.no_collapse:
+        tensor_grid_search = CollapsedGridSearch(grid, t1_set, t2_set, observed_pratio_set, survival_engine, tolerance=series_tolerance, term_histogram=series_term_histogram, search_class=tensor_search_class)
+        print("models in grid: " + str(tensor_grid_search.number_of_models) + ", distinct models evaluated: " + str(tensor_grid_search.number_of_distinct_models))
+        if args.shard is not None:
+            tensor_grid_search.shard(shard, shards)
+        leaderboard = tensor_grid_search.run(args.top_k, args.delta_ssr, args.prune, args.workers, checkpoint, metrics)
+        pruning_statistics = tensor_grid_search.pruning_statistics
+    elif grid_search_engine == 'tensor':
+        tensor_grid_search = tensor_search_class(grid, t1_set, t2_set, observed_pratio_set, survival_engine, tolerance=series_tolerance, term_histogram=series_term_histogram)
+        print("models in grid: " + str(tensor_grid_search.number_of_models))
+        if args.shard is not None:
+            tensor_grid_search.shard(shard, shards)
+        if args.workers > 1:
+            if metrics is not None:
+                tensor_grid_search.track_metrics(metrics)
+            leaderboard = parallel_grid_search(tensor_grid_search, args.workers, args.top_k, args.delta_ssr, args.prune, checkpoint, metrics=metrics)
+        else:
+            leaderboard = tensor_grid_search.run(args.top_k, args.delta_ssr, args.prune, checkpoint, metrics)
+        pruning_statistics = tensor_grid_search.pruning_statistics
+    else:
+        scalar_grid_search = ScalarGridSearch(grid, t1_set, t2_set, observed_pratio_set, survival_engine, tolerance=series_tolerance, term_histogram=series_term_histogram, cache_size=survival_cache_size)
+        if args.shard is not None:
+            scalar_grid_search.shard(shard, shards)
+        def print_alt_progress(each_alt_parameter_set):
+            #progress: index of b_alt_func once its last Alt_func parameter set is done
+            b_alt_func = alt_parameter_sets[each_alt_parameter_set][0]
+            if each_alt_parameter_set == len(alt_parameter_sets) - 1 or alt_parameter_sets[each_alt_parameter_set + 1][0] != b_alt_func:
+                print(str(grid.b_alt_funcs.index(b_alt_func)))
+        leaderboard = scalar_grid_search.run(args.top_k, args.delta_ssr, args.prune, not args.no_collapse, checkpoint, print_alt_progress, metrics)
+        pruning_statistics = scalar_grid_search.pruning_statistics
+
+    if grid_search_engine == 'tensor' and args.zoom_levels > 0 and args.samples == 0:
+        file6 = open(file3_name.replace('_minimum', '') + '_log.csv', 'w+', newline='')
+        writer6 = csv.writer(file6, delimiter=',')
+        writer6.writerow(ZOOM_LOG_HEADER)
+        for zoom_level in tensor_grid_search.log:
+            writer6.writerow(zoom_level.csv_row())
+        file6.close()
+
+    #the results are complete, an interrupted run no longer needs the checkpoint
+    if checkpoint is not None:
+        checkpoint.remove()
+    if metrics is not None:
+        final_metrics = metrics.close()
+        print("wrote " + metrics.path + ": " + str(final_metrics['models_done']) + " models at " + str(round(final_metrics['models_per_second'])) + " per second, seconds in " + str({phase: round(seconds, 2) for phase, seconds in final_metrics['phase_seconds'].items()}))
+
+    #PRINT BEST MODEL AND LEADERBOARD: top k models and every model within delta_ssr of the best
+    if args.shard is not None:
+        #a shard's leaderboard is only part of the answer, it waits for the other shards in its shard result file
+        write_shard_result(shard_file_name(file3_name, shard, shards), leaderboard, shard, shards, checkpoint_fingerprint(run_settings), input_model, file3_name)
+        print("wrote " + shard_file_name(file3_name, shard, shards))
+    else:
+        if leaderboard.best() is None:
+            print("no valid model in this grid")
+        write_result_files(file3_name, leaderboard, input_model)
+
+    #REFINE THE BEST MODELS off the grid
+    if args.refine > 0:
+        refinement_results = refine_leaderboard(leaderboard, t1_set, t2_set, observed_pratio_set, args.refine, args.refine_method, survival_engine, workers=args.workers, tolerance=series_tolerance)
+        for refinement_result in refinement_results:
+            print("refined " + refinement_result.summary())
+        file5_name = file3_name.replace('_minimum', '') + '_refined'
+        file5 = open(file5_name +'.csv', 'w+', newline='')
+        writer5 = csv.writer(file5, delimiter=',')
+        writer5.writerow(RESULT_HEADER + REFINED_HEADER)
+        for refinement_result in refinement_results:
+            writer5.writerow(refinement_result.csv_row())
+        file5.close()
+
+    if grid_search_engine == 'scalar':
+        cache_info = scalar_grid_search.cache_info()
+        print("Alt_func survival cache: " + str(cache_info['Alt_func']))
+        print("Dos survival cache: " + str(cache_info['Dos']))
+        print("Non survival cache: " + str(cache_info['Non']))
+    if args.prune:
+        print("pruning: " + str(pruning_statistics.summary()))
+    if survival_engine == 'series' and series_tolerance is not None:
+        print("series terms used: " + str(series_term_histogram.summary()))
+
+    print("end time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+
+if __name__ == '__main__':
+    main()
@@ -28,16 +28,13 @@ switch : percent of gene duplicates retained through ALt_func that switch to Non
 Results:
 
 """
-import math
 import csv
-import matplotlib.pyplot as plt
-from matplotlib import cm
-import pandas as pd
 import sys
+from duplication_models.survival import survival_probability_series
+from duplication_models.pratio import calculate_pratio_2d
+from duplication_models.constraints import violated_constraints
 
 
-input_switch = input("Type '0', '0.1', '0.2' for default results or 'other' to manually input parameter values: ")
-
 ###########################################################################
 #initialize parameters
 #n_max = 170
@@ -55,183 +52,11 @@ file_name_start = '03_18_2024_results'
 p_ratio = 'pratio'
 #p_ratio = 'log of pratio'
 ###############################################################################
-#TOP MODELS RESULTS FROM 03/16/2024
-
-if input_switch == '0':
-    number_of_combos = 4
-    model_categories = ["3mix", "alt_dos", "alt_non", "non_dos"]
-    alts = [0.80, 0.90, 0.60, 0.00]
-    doses= [0.10, 0.10, 0.00, 0.10]
-    nons =  [0.10, 0.00, 0.40, 0.90]
-    b_alt_funcs = [10, 5, 5, 35]
-    c_alt_funcs = [1, 5, 1, 0.5]
-    d_alt_funcs = [5, 0.0005, 5, 50]
-    f_alt_funcs = [2, 2, 10, 10]
-    b_doses = [-12, -20, -12, -20]
-    c_doses = [0.6, 0.6, 0.6, 0.8]
-    d_doses = [-0.03, -0.0003, -0.03, -0.03]
-    f_nons = [0.01, 0.01, 0.01, 0.01]
-    switch = 0
-    file_name_end = '_dup'
-    hypothesis  = "duplicability"
-elif input_switch == '0.1':
-    number_of_combos = 1
-    model_categories = ["3mix_mut"]
-    alts = [0.80]
-    doses= [0.10]
-    nons =  [0.10]
-    b_alt_funcs = [30]
-    c_alt_funcs = [3]
-    d_alt_funcs = [0.5]
-    f_alt_funcs = [5]
-    b_doses = [-12]
-    c_doses = [0.6]
-    d_doses = [-0.03]
-    f_nons = [5]
-    switch = 0.1
-    file_name_end = '_mut1'
-    hypothesis  = "mutational opportunity"
-elif input_switch == '0.2':
-    number_of_combos = 1
-    model_categories = ["alt_non"]
-    alts = [0.90]
-    doses= [0.00]
-    nons =  [0.10]
-    b_alt_funcs = [5]
-    c_alt_funcs = [5]
-    d_alt_funcs = [0.5]
-    f_alt_funcs = [8]
-    b_doses = [-12]
-    c_doses = [0.6]
-    d_doses = [-0.03]
-    f_nons = [0.01]
-    switch = 0.2
-    file_name_end = '_mut2'
-    hypothesis  = "mutational opportunity"
-elif input_switch == 'other':
-    number_of_combos = 1
-    model_categories = input("Enter your model name: ")
-    hypothesis = model_categories
-    file_name_end =  model_categories
-    alt = float(input("Enter the proportion of your starting genome that starts in the Alt_func category: "))
-    dos = float(input("Enter the proportion of your starting genome that starts in the Dos category: "))
-    non = float(input("Enter the proportion of your starting genome that starts in the Non category: "))
-    total = alt + dos + non
-    if total != 1:
-        print("your proportions do not add up to 1, please try again")
-        sys.exit()
-    else:
-        pass
-    switch = float(input("Enter the proportion of the genes retained through Alt_func switch to the Non category in t2: "))
-    if switch < 0 or switch > 1:
-        print("you've entered an invalid proportion, please try again")
-        sys.exit()
-    else:
-        pass
-    b_alt_func = float(input("Enter the b parameter for the Alt_func category: "))
-    if b_alt_func <= 0:
-        print("you've entered an invalid parameter value, please try again")
-        sys.exit()
-    else:
-        pass
-    c_alt_func = float(input("Enter the c parameter for the Alt_func category: "))
-    if c_alt_func <= 0:
-        print("you've entered an invalid parameter value, please try again")
-        sys.exit()
-    else:
-        pass
-    d_alt_func = float(input("Enter the d parameter for the Alt_func category: "))
-    if d_alt_func <= 0:
-        print("you've entered an invalid parameter value, please try again")
-        sys.exit()
-    else:
-        pass
-    f_alt_func = float(input("Enter the f parameter for the Alt_func category: "))
-    if f_alt_func <= 0:
-        print("you've entered an invalid parameter value, please try again")
-        sys.exit()
-    else:
-        pass
-    b_dos = float(input("Enter the b parameter for the Dos category: "))
-    if b_dos >= 0:
-        print("you've entered an invalid parameter value, please try again")
-        sys.exit()
-    else:
-        pass
-    c_dos = float(input("Enter the c parameter for the Dos category: "))
-    if c_dos <= 0 or c_dos > 1:
-        print("you've entered an invalid parameter value, please try again")
-        sys.exit()
-    else:
-        pass
-    d_dos = float(input("Enter the d parameter for the Dos category: "))
-    f_non = float(input("Enter the f parameter for the Non category: "))
-    if f_non <= 0:
-        print("you've entered an invalid parameter value, please try again")
-        sys.exit()
-    else:
-        pass
-    number_of_percent_combos = 1
-    alts = []
-    doses = []
-    nons = []
-    b_alt_funcs = []
-    c_alt_funcs = []
-    d_alt_funcs = []
-    f_alt_funcs = []
-    b_doses= []
-    c_doses = []
-    d_doses = []
-    b_nons = [0]
-    c_nons = [1]
-    d_nons = [10.01]
-    f_nons = []
-    alts.append(alt)
-    doses.append(dos)
-    nons.append(non)
-    b_alt_funcs.append(b_alt_func)
-    c_alt_funcs.append(c_alt_func)
-    d_alt_funcs.append(d_alt_func)
-    f_alt_funcs.append(f_alt_func)
-    b_doses.append(b_dos)
-    c_doses.append(c_dos)
-    d_doses.append(d_dos)
-    f_nons.append(f_non)
-else:
-    print("error")
-###########################################################################
 
 #Functions
 
-def calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b, c, d, f, time):  
-    summation = 0
-    for n in range(0,n_max):
-        nfac = math.factorial(n)
-        beta = (((-b)**n)*(time**((c*n)+1)))/((c*n*nfac) + nfac)
-        summation = summation + beta
-        # print("summation: " + str(summation))
-    survival_probability = math.exp(-d*time - f*summation)
-    return survival_probability
-    
-def calculate_pratio_2d(st1_alt_func, st1_dos, st1_non, st2_alt_func, st2_dos, st2_non, alt_func_percent, dos_percent, non_percent, alt_switch_percent):    
-    #probability of (survival in t2 given survived in t1)/(survival in t2 given lost in t1)
-    alt_ret =  (2*alt_func_percent*st1_alt_func)
-    alt_ret_ret_switch = alt_ret*st2_non *alt_switch_percent
-    alt_ret_ret_noswitch = alt_ret*st2_alt_func * (1-alt_switch_percent)
-    dos_ret = (2*dos_percent*st1_dos)
-    dos_ret_ret = dos_ret * st2_dos   
-    non_ret = (2*non_percent*st1_non)
-    non_ret_ret = non_ret * st2_non
-    alt_noret = ((1-st1_alt_func)*alt_func_percent)
-    alt_noret_ret = alt_noret * st2_alt_func
-    dos_noret = ((1-st1_dos)*dos_percent)
-    dos_noret_ret = dos_noret * st2_dos    
-    non_noret = ((1-st1_non)*non_percent)
-    non_noret_ret = non_noret * st2_non
-    pratio = ((alt_ret_ret_noswitch + alt_ret_ret_switch + dos_ret_ret + non_ret_ret)/(alt_noret_ret + dos_noret_ret + non_noret_ret)) * ((alt_noret + dos_noret + non_noret)/(alt_ret + dos_ret + non_ret))                                 
-    return pratio  
-
 def read_csv_file(file_name):
+    import pandas as pd
     file_name_full = (file_name_start + file_name +'.csv')
     df = pd.read_csv(file_name_full,
             header=0,
@@ -240,6 +65,8 @@ def read_csv_file(file_name):
     return df
     
 def print_3d_graph(percents, file_name, p_ratio, model_category):
+    import matplotlib.pyplot as plt
+    from matplotlib import cm
     df = read_csv_file(file_name)
     minimum_pratio = df['pratio'].min()
     print("Minimum Pratio: " + str(minimum_pratio))  
@@ -263,6 +90,7 @@ def print_3d_graph(percents, file_name, p_ratio, model_category):
     plt.pause(.001)
     
 def plot_survival_curves(file_name):
+    import matplotlib.pyplot as plt
     df = read_csv_file(file_name)
     #Plot survival curves
     fig, t1_plot = plt.subplots()
@@ -280,30 +108,34 @@ def calculate_and_make_csv(file_name, alt_func_percent, dos_percent, non_percent
     writer = csv.writer(file, delimiter=',')
     write_header_row = ["t1", "t2", "pratio", "alt_surv_t1", "dos_surv_t1", "non_surv_t1", "alt_surv_t2", "dos_surv_t2", "non_surv_t2", "log of pratio"]
     writer.writerow(write_header_row)
-    each_t1 = 0.01
+    #t1 and t2 both step through the same grid of time points
+    time_grid = []
+    each_t = 0.01
+    for i in range(0, time_points):
+        time_grid.append(each_t)
+        each_t = each_t+0.01
+    #survival of every category along the time grid in one batched call
+    alt_func_survival, dos_survival, non_survival = survival_probability_series([[b_alt_func], [b_dos], [b_non]], [[c_alt_func], [c_dos], [c_non]], [[d_alt_func], [d_dos], [d_non]], [[f_alt_func], [f_dos], [f_non]], time_grid, n_max).tolist()
     for i in range(0, time_points):  
-        alt_func_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_alt_func, c_alt_func, d_alt_func, f_alt_func, each_t1)
-        dos_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_dos, c_dos, d_dos, f_dos, each_t1)
-        non_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_non, c_non, d_non, f_non, each_t1)
-        each_t2 = 0.01
+        each_t1 = time_grid[i]
+        alt_func_survival_t1 = alt_func_survival[i]
+        dos_survival_t1 = dos_survival[i]
+        non_survival_t1 = non_survival[i]
         for j in range(0, time_points):
-            #print("t1: " + str(each_t1))
-            #print("t2: " + str(each_t2))        
-            alt_func_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_alt_func, c_alt_func, d_alt_func, f_alt_func, each_t2)
-            dos_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_dos, c_dos, d_dos, f_dos, each_t2)
-            non_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_non, c_non, d_non, f_non, each_t2)       
+            each_t2 = time_grid[j]
+            alt_func_survival_t2 = alt_func_survival[j]
+            dos_survival_t2 = dos_survival[j]
+            non_survival_t2 = non_survival[j]
             probability_ratio_2d = calculate_pratio_2d(alt_func_survival_t1, dos_survival_t1, non_survival_t1, alt_func_survival_t2, dos_survival_t2, non_survival_t2, alt_func_percent, dos_percent, non_percent, alt_switch_percent)
             #print("Probability ratio: " + str(probability_ratio_2d))
             #log_pratio = math.log10(probability_ratio_2d)
             row_to_write = [each_t1, each_t2, probability_ratio_2d, alt_func_survival_t1, dos_survival_t1, non_survival_t1, alt_func_survival_t2, dos_survival_t2, non_survival_t2]
             writer.writerow(row_to_write)
-            each_t2 = each_t2+0.01
-        each_t1 = each_t1+0.01                     
     file.close()
 #############################################################################
 
-def main(percent_alt_func, percent_dos, percent_non, percent_alt_switch, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non, model_category):    
-    percentages = str(100*switch) +"% switch,  \n" +str(100*percent_alt_func) +"% Alt_func, "+str(100*percent_dos)+"% Dos, "+str(100*percent_non)+"% Non, \n (" + hypothesis + " Hypothesis)"
+def plot_model(percent_alt_func, percent_dos, percent_non, percent_alt_switch, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non, model_category, hypothesis, file_name_end):    
+    percentages = str(100*percent_alt_switch) +"% switch,  \n" +str(100*percent_alt_func) +"% Alt_func, "+str(100*percent_dos)+"% Dos, "+str(100*percent_non)+"% Non, \n (" + hypothesis + " Hypothesis)"
     percentages_file_name = str(100*percent_alt_func)+'_'+str(100*percent_dos)+'_'+str(100*percent_non)+file_name_end
     print(percentages)
     calculate_and_make_csv(percentages_file_name, percent_alt_func, percent_dos, percent_non, percent_alt_switch,  b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non)
@@ -312,24 +144,179 @@ def main(percent_alt_func, percent_dos, percent_non, percent_alt_switch, b_alt_f
 
 
 #############################################################################
+#TOP MODELS RESULTS FROM 03/16/2024
+
+def main():
+    input_switch = input("Type '0', '0.1', '0.2' for default results or 'other' to manually input parameter values: ")
+
+    if input_switch == '0':
+        number_of_combos = 4
+        model_categories = ["3mix", "alt_dos", "alt_non", "non_dos"]
+        alts = [0.80, 0.90, 0.60, 0.00]
+        doses= [0.10, 0.10, 0.00, 0.10]
+        nons =  [0.10, 0.00, 0.40, 0.90]
+        b_alt_funcs = [10, 5, 5, 35]
+        c_alt_funcs = [1, 5, 1, 0.5]
+        d_alt_funcs = [5, 0.0005, 5, 50]
+        f_alt_funcs = [2, 2, 10, 10]
+        b_doses = [-12, -20, -12, -20]
+        c_doses = [0.6, 0.6, 0.6, 0.8]
+        d_doses = [-0.03, -0.0003, -0.03, -0.03]
+        f_nons = [0.01, 0.01, 0.01, 0.01]
+        switch = 0
+        file_name_end = '_dup'
+        hypothesis  = "duplicability"
+    elif input_switch == '0.1':
+        number_of_combos = 1
+        model_categories = ["3mix_mut"]
+        alts = [0.80]
+        doses= [0.10]
+        nons =  [0.10]
+        b_alt_funcs = [30]
+        c_alt_funcs = [3]
+        d_alt_funcs = [0.5]
+        f_alt_funcs = [5]
+        b_doses = [-12]
+        c_doses = [0.6]
+        d_doses = [-0.03]
+        f_nons = [5]
+        switch = 0.1
+        file_name_end = '_mut1'
+        hypothesis  = "mutational opportunity"
+    elif input_switch == '0.2':
+        number_of_combos = 1
+        model_categories = ["alt_non"]
+        alts = [0.90]
+        doses= [0.00]
+        nons =  [0.10]
+        b_alt_funcs = [5]
+        c_alt_funcs = [5]
+        d_alt_funcs = [0.5]
+        f_alt_funcs = [8]
+        b_doses = [-12]
+        c_doses = [0.6]
+        d_doses = [-0.03]
+        f_nons = [0.01]
+        switch = 0.2
+        file_name_end = '_mut2'
+        hypothesis  = "mutational opportunity"
+    elif input_switch == 'other':
+        number_of_combos = 1
+        model_categories = input("Enter your model name: ")
+        hypothesis = model_categories
+        file_name_end =  model_categories
+        alt = float(input("Enter the proportion of your starting genome that starts in the Alt_func category: "))
+        dos = float(input("Enter the proportion of your starting genome that starts in the Dos category: "))
+        non = float(input("Enter the proportion of your starting genome that starts in the Non category: "))
+        total = alt + dos + non
+        if total != 1:
+            print("your proportions do not add up to 1, please try again")
+            sys.exit()
+        else:
+            pass
+        switch = float(input("Enter the proportion of the genes retained through Alt_func switch to the Non category in t2: "))
+        if switch < 0 or switch > 1:
+            print("you've entered an invalid proportion, please try again")
+            sys.exit()
+        else:
+            pass
+        b_alt_func = float(input("Enter the b parameter for the Alt_func category: "))
+        if violated_constraints('Alt_func', b=b_alt_func):
+            print("you've entered an invalid parameter value, please try again")
+            sys.exit()
+        else:
+            pass
+        c_alt_func = float(input("Enter the c parameter for the Alt_func category: "))
+        if violated_constraints('Alt_func', c=c_alt_func):
+            print("you've entered an invalid parameter value, please try again")
+            sys.exit()
+        else:
+            pass
+        d_alt_func = float(input("Enter the d parameter for the Alt_func category: "))
+        if violated_constraints('Alt_func', d=d_alt_func):
+            print("you've entered an invalid parameter value, please try again")
+            sys.exit()
+        else:
+            pass
+        f_alt_func = float(input("Enter the f parameter for the Alt_func category: "))
+        if violated_constraints('Alt_func', f=f_alt_func):
+            print("you've entered an invalid parameter value, please try again")
+            sys.exit()
+        else:
+            pass
+        b_dos = float(input("Enter the b parameter for the Dos category: "))
+        if violated_constraints('Dos', b=b_dos):
+            print("you've entered an invalid parameter value, please try again")
+            sys.exit()
+        else:
+            pass
+        c_dos = float(input("Enter the c parameter for the Dos category: "))
+        if violated_constraints('Dos', c=c_dos):
+            print("you've entered an invalid parameter value, please try again")
+            sys.exit()
+        else:
+            pass
+        d_dos = float(input("Enter the d parameter for the Dos category: "))
+        f_non = float(input("Enter the f parameter for the Non category: "))
+        if f_non <= 0:
+            print("you've entered an invalid parameter value, please try again")
+            sys.exit()
+        else:
+            pass
+        number_of_percent_combos = 1
+        alts = []
+        doses = []
+        nons = []
+        b_alt_funcs = []
+        c_alt_funcs = []
+        d_alt_funcs = []
+        f_alt_funcs = []
+        b_doses= []
+        c_doses = []
+        d_doses = []
+        b_nons = [0]
+        c_nons = [1]
+        d_nons = [10.01]
+        f_nons = []
+        alts.append(alt)
+        doses.append(dos)
+        nons.append(non)
+        b_alt_funcs.append(b_alt_func)
+        c_alt_funcs.append(c_alt_func)
+        d_alt_funcs.append(d_alt_func)
+        f_alt_funcs.append(f_alt_func)
+        b_doses.append(b_dos)
+        c_doses.append(c_dos)
+        d_doses.append(d_dos)
+        f_nons.append(f_non)
+    else:
+        print("error")
+        return
+
+    for i in range (0, number_of_combos):
+        #the Dos hazard needs all of b, c, d and f, so it is checked once the set is complete
+        violated = violated_constraints('Alt_func', b_alt_funcs[i], c_alt_funcs[i], d_alt_funcs[i], f_alt_funcs[i]) + violated_constraints('Dos', b_doses[i], c_doses[i], d_doses[i], -d_doses[i]) + violated_constraints('Non', 0, 1, 10.01, f_nons[i])
+        if violated:
+            print("model " + str(i + 1) + " breaks the category constraints (" + ", ".join(violated) + "), skipped")
+            continue
+        alt = alts[i]
+        dos = doses[i]
+        non = nons[i]
+        b_alt_func = b_alt_funcs[i]
+        c_alt_func = c_alt_funcs[i]
+        d_alt_func = d_alt_funcs[i]
+        f_alt_func = f_alt_funcs[i]
+        b_dos = b_doses[i]
+        c_dos = c_doses[i]
+        d_dos = d_doses[i]
+        f_dos = -d_dos
+        b_non = 0
+        c_non = 1
+        d_non = 10.01
+        f_non = f_nons[i]
+        model_category = model_categories[i]
+        plot_model(alt, dos, non, switch,  b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non, model_category, hypothesis, file_name_end)
 
-for i in range (0, number_of_combos):
-    alt = alts[i]
-    dos = doses[i]
-    non = nons[i]
-    b_alt_func = b_alt_funcs[i]
-    c_alt_func = c_alt_funcs[i]
-    d_alt_func = d_alt_funcs[i]
-    f_alt_func = f_alt_funcs[i]
-    b_dos = b_doses[i]
-    c_dos = c_doses[i]
-    d_dos = d_doses[i]
-    f_dos = -d_dos
-    b_non = 0
-    c_non = 1
-    d_non = 10.01
-    f_non = f_nons[i]
-    model_category = model_categories[i]
-    main(alt, dos, non, switch,  b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non, model_category)
 
-########################################
+if __name__ == '__main__':
+    main()
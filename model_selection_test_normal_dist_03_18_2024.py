@@ -12,59 +12,17 @@ Tests if residual distribution matches a random normal and random laplace distri
 https://www.statology.org/normality-test-python/
 https://docs.scipy.org/doc/scipy/reference/stats.html#continuous-distributions
 """
-import csv
 from datetime import datetime
-import matplotlib.pyplot as plt
 import numpy as np
-import statsmodels.api as sm
 from scipy.stats import shapiro 
 from scipy.stats import kstest
 import statistics
 import scipy.stats as stats
+from duplication_models.residuals import read_residual_csv
 
-
-
-print("start time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-
-file_name_input = input("Enter your csv file of your residuals and models: ") or 'residuals_model_selection_03_16_2024_coarse.csv' 
-number_of_models = int(input("Enter the number of models you are testing: ") or '7')
-data_points = int(input("Enter the number of data points you have: ")or '11')
-
-
-class Row_values:
-    def __init__(self, row):
-        self.t1 = row["t1"]
-        self.t2 = row["t2"]
-        self.expected_probability_ratio = row["expected_pratio"]
-        self.b_alt_func = row["b_alt"]
-        self.c_alt_func = row["c_alt"]
-        self.d_alt_func = row["d_alt"]
-        self.f_alt_func = row["f_alt"]
-        self.b_dos = row["b_dos"]
-        self.c_dos = row["c_dos"]
-        self.d_dos = row["d_dos"]
-        self.f_dos = row["f_dos"]
-        self.b_non = row["b_non"]
-        self.c_non = row["c_non"]
-        self.d_non = row["d_non"]
-        self.f_non = row["f_non"]
-        self.alt = row["percent_alt"]
-        self.dos = row["percent_dos"]
-        self.non = row["percent_non"]
-        self.switch_percent = row["percent_switch"]
-        self.observed_pratio = row["observed_pratio"]
-        self.residual = row["residual"]
-        self.model_identifier = row["model_identifier"]
-        self.data_point_identifier = row["data_point_identifier"]
-
-def read_csv(filename):
-    with open(filename, "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            yield Row_values(row)
-        
         
 def plot_histogram(residual_list):
+    import matplotlib.pyplot as plt
     plt.hist(residual_list, alpha=0.5, bins = 10)
     #plt.set_xticks(bins)
     #plt.xticks(residual_list, rotation=90)
@@ -74,67 +32,79 @@ def plot_histogram(residual_list):
     plt.ylabel('Count of Residuals')
     plt.show()   
 
-instances = []
-for item in read_csv(file_name_input):
-    instances.append(item)
+def main():
+    import matplotlib.pyplot as plt
+    import statsmodels.api as sm
+
+    print("start time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    file_name_input = input("Enter your csv file of your residuals and models: ") or 'residuals_model_selection_03_16_2024_coarse.csv' 
+    number_of_models = int(input("Enter the number of models you are testing: ") or '7')
+    data_points = int(input("Enter the number of data points you have: ")or '11')
 
-residual_list = []
-log_residual_list = []
-sq_residual_list = []
-for each_instance in range(len(instances)):
-    resid = float(instances[each_instance].residual)
-    residual_list.append(resid)
+    instances = list(read_residual_csv(file_name_input))
 
-plot_histogram(residual_list) 
+    residual_list = []
+    log_residual_list = []
+    sq_residual_list = []
+    for each_instance in range(len(instances)):
+        resid = float(instances[each_instance].residual)
+        residual_list.append(resid)
 
-residual_array = np.array(residual_list)
-mean = statistics.mean(residual_list)
-sd = statistics.stdev(residual_list)   
-##############################################################################
+    plot_histogram(residual_list) 
 
-dataset1 = np.random.normal(loc=mean, scale=sd, size=100000)
+    residual_array = np.array(residual_list)
+    mean = statistics.mean(residual_list)
+    sd = statistics.stdev(residual_list)   
+    ##############################################################################
 
-np.random.seed(1)
-dataset2 = stats.norm.rvs(mean, sd, size=100000)
+    dataset1 = np.random.normal(loc=mean, scale=sd, size=100000)
 
-#create histograms to visualize values in dataset
-plt.hist(dataset1, edgecolor='black')
-plt.title('Random Normal Distrubtion #1')
-plt.show()   
+    np.random.seed(1)
+    dataset2 = stats.norm.rvs(mean, sd, size=100000)
 
-plt.hist(dataset2, edgecolor='black')
-plt.title('Random Normal Distrubtion #2')
-plt.show()   
+    #create histograms to visualize values in dataset
+    plt.hist(dataset1, edgecolor='black')
+    plt.title('Random Normal Distrubtion #1')
+    plt.show()   
+
+    plt.hist(dataset2, edgecolor='black')
+    plt.title('Random Normal Distrubtion #2')
+    plt.show()   
 
-###############################################################################
+    ###############################################################################
 
-#create Q-Q plot with standard line added to 
-fig1, ax1 = plt.subplots()
-sm.qqplot(residual_array, line='s', ax = ax1)
-ax1.set_title('QQ Plot of Residuals')
-plt.show()
+    #create Q-Q plot with standard line added to 
+    fig1, ax1 = plt.subplots()
+    sm.qqplot(residual_array, line='s', ax = ax1)
+    ax1.set_title('QQ Plot of Residuals')
+    plt.show()
 
-f = open("test_for_normality_results.txt", 'w+')
+    f = open("test_for_normality_results.txt", 'w+')
 
-print("\n", file = f)
-#perform Shapiro-Wilk test for normality
-shapiro_result = shapiro(residual_array)
-print("Shapiro-Wilk Test Result: ", file = f)
-print(shapiro_result, file = f)
-print("\n", file = f)
+    print("\n", file = f)
+    #perform Shapiro-Wilk test for normality
+    shapiro_result = shapiro(residual_array)
+    print("Shapiro-Wilk Test Result: ", file = f)
+    print(shapiro_result, file = f)
+    print("\n", file = f)
 
 
-#perform Kolmogorov-Smirnov test against given datasets
-kstest_result = kstest(residual_array, dataset1)
-print("Kolmogorov-Smirnov Test For Given Random Normal Distribution #1 with the same mean and standard deviation as my set of residuals: ", file = f)
-print(kstest_result, file = f) 
-print("\n", file = f)
+    #perform Kolmogorov-Smirnov test against given datasets
+    kstest_result = kstest(residual_array, dataset1)
+    print("Kolmogorov-Smirnov Test For Given Random Normal Distribution #1 with the same mean and standard deviation as my set of residuals: ", file = f)
+    print(kstest_result, file = f) 
+    print("\n", file = f)
  
 
-kstest_result = kstest(residual_array, dataset2)
-print("Kolmogorov-Smirnov Test For Given Random Normal Distribution #2 with the same mean and standard deviation as my set of residuals: ", file = f)
-print(kstest_result, file = f) 
-print("\n", file = f)
+    kstest_result = kstest(residual_array, dataset2)
+    print("Kolmogorov-Smirnov Test For Given Random Normal Distribution #2 with the same mean and standard deviation as my set of residuals: ", file = f)
+    print(kstest_result, file = f) 
+    print("\n", file = f)
+
+    ###############################################################################
+    print("end time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
 
-###############################################################################
-print("end time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+if __name__ == '__main__':
+    main()
@@ -38,62 +38,16 @@ switch : percent of gene duplicates retained through ALt_func that switch to Non
 
 """
 
-import math
+import argparse
 import csv
 from datetime import datetime
-
-print("start time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-
-###########################################################################
-# #initialize Data Set
-data_set = 11
-
-class Fish:
-    def __init__(self, name, t1_mya, t2_mya, observed_pratio):
-        self.name = name
-        self.t1_mya = t1_mya
-        self.t2_mya = t2_mya
-        self.observed_pratio = observed_pratio
-        self.t1 = self.calculate_t(self.t1_mya)
-        self.t2 = self.calculate_t(self.t2_mya) 
-    def calculate_t(self, t_mya):
-        fish_substitution_per_year = 0.00000000413 #BMC Genomics, Fu et al 2010
-        t = (t_mya * 1000000 * fish_substitution_per_year)
-        return(t)        
-
-    
-class Plants:
-    def __init__(self, name, t1_mya, t2_mya, observed_pratio):
-        self.name = name
-        self.t1_mya = t1_mya
-        self.t2_mya = t2_mya
-        self.observed_pratio = observed_pratio
-        self.t1 = self.calculate_t(t1_mya)
-        self.t2 = self.calculate_t(t2_mya)  
-    def calculate_t(self, t_mya):
-        plant_substitution_per_year = 0.000000006 #PNAS Wolfe et al 1987, PNAS Schultz et al 1999
-        t = (t_mya * 1000000 * plant_substitution_per_year)
-        return(t)        
-
-
-atlantic_salmon = Fish("Atlantic Salmon", 240, 80, 0.97)
-nick_p_equestrius = Plants("Nick's Phalaenopsis equestrius", 54, 76, 0.94)
-nick_p1_p_halli = Plants("Nick's Pair 1 Panicum halli", 8, 99, 0.92) # 110 mya, 107.5mya(t1 = 2.5, t2 = 107.5)OR t1 = 0-35, t2 = 100-120
-nick_p1_o_brachyantha = Plants("Nick's Pair 1 Oryza brachyantha", 8, 99, 0.93) #110 mya, 107.5mya (t1 = 2.5, t2 = 107.5)OR t1 = 0-35, t2 = 100-120
-nick_p2_p_halli = Plants("Nick's Pair 2 Panicum halli", 25, 99, 0.88)#122.5mya, 107.5mya(t1 = 15, t2 = 107.5) OR t1 = 0-40, t2 = 95-120
-nick_p2_o_brachyantha = Plants("Nick's Pair 2 Oryza brachyantha", 25, 99, 0.87)#122.5mya,107.5mya (t1 = 15, t2 = 107.5) OR  t1 = 0-40, t2 = 95-120
-nick_p3_p_halli = Plants("Nick's Pair 3 Panicum halli", 17, 107, 0.87)#122.5mya, 110mya (t1 =12.5, t2 =110)OR  t1 = 5-25, t2 = 95-120
-nick_p3_o_brachyantha = Plants("Nick's Pair 3 Oryza brachyantha", 17, 107, 0.86)#122.5mya, 110mya(t1 =12.5, t2 =110)OR t1 = 5-25, t2 = 95-120
-nick_p3_a_comosus = Plants("Nick's Pair 3 Ananas comosus", 17, 107, 0.87)
-nick_p4_e_guineensis = Plants("Nick's Pair 4 Elaeis guineensis", 49, 75, 0.91)
-nick_p4_p_dactylifera = Plants("Nick's Pair 4 Phoenix dactylifera", 49, 75, 0.90)
-
-t1_set = [atlantic_salmon.t1, nick_p_equestrius.t1, nick_p1_p_halli.t1, nick_p1_o_brachyantha.t1, nick_p2_p_halli.t1, nick_p2_o_brachyantha.t1, nick_p3_p_halli.t1, nick_p3_o_brachyantha.t1, nick_p3_a_comosus.t1, nick_p4_e_guineensis.t1, nick_p4_p_dactylifera.t1]
-t2_set = [atlantic_salmon.t2, nick_p_equestrius.t2, nick_p1_p_halli.t2, nick_p1_o_brachyantha.t2, nick_p2_p_halli.t2, nick_p2_o_brachyantha.t2, nick_p3_p_halli.t2, nick_p3_o_brachyantha.t2, nick_p3_a_comosus.t2, nick_p4_e_guineensis.t2, nick_p4_p_dactylifera.t2]
-observed_pratio_set = [atlantic_salmon.observed_pratio, nick_p_equestrius.observed_pratio, nick_p1_p_halli.observed_pratio, nick_p1_o_brachyantha.observed_pratio, nick_p2_p_halli.observed_pratio, nick_p2_o_brachyantha.observed_pratio, nick_p3_p_halli.observed_pratio, nick_p3_o_brachyantha.observed_pratio, nick_p3_a_comosus.observed_pratio, nick_p4_e_guineensis.observed_pratio, nick_p4_p_dactylifera.observed_pratio]
-
-
-###########################################################################
+from duplication_models.survival import calculate_probability_of_survival_of_duplicate_gene_copy_by_time
+from duplication_models.pratio import calculate_pratio_2d, calculate_residual
+from duplication_models.constraints import constraint_mask
+from duplication_models.presets import observed_data_set
+from duplication_models.residuals import RESIDUAL_HEADER, Data_Point
+from duplication_models.grid_search import RESULT_HEADER
+from duplication_models.leaderboard import Leaderboard
 
 ##########################################################################
 # Residual calc and sum of squares for Top models 3 16 2024
@@ -120,147 +74,138 @@ d_nons = [10.01, 10.01, 10.01, 10.01, 10.01, 10.01, 10.01]
 f_nons = [0.01, 0.01, 0.01, 0.01, 0.01, 0.01, 5]
 ###########################################################################
 
-###########################################################################
-
-class Data_Point:
-    def __init__(self, alt_value, dos_value, non_value, switch_value, b_alt_func_value, c_alt_func_value, d_alt_func_value, f_alt_func_value, b_dos_value, c_dos_value, d_dos_value, f_dos_value, b_non_value, c_non_value, d_non_value, f_non_value, expected_pratio_value, residual_value, absolute_residual_value):
-        self.alt_value = alt_value
-        self.dos_value = dos_value
-        self.non_value = non_value
-        self.switch_value = switch_value
-        self.b_alt_func_value = b_alt_func_value
-        self.c_alt_func_value = c_alt_func_value
-        self.d_alt_func_value = d_alt_func_value
-        self.f_alt_func_value = f_alt_func_value
-        self.b_dos_value = b_dos_value
-        self.c_dos_value = c_dos_value
-        self.d_dos_value = d_dos_value
-        self.f_dos_value = f_dos_value
-        self.b_non_value = b_non_value
-        self.c_non_value = c_non_value
-        self.d_non_value = d_non_value
-        self.f_non_value = f_non_value 
-        self.expected_pratio_value = expected_pratio_value
-        self.residual_value = residual_value
-        self.absolute_residual_value = absolute_residual_value
-###########################################################################
-        
 #Functions
 
-def calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b, c, d, f, time):  
-    summation = 0
-    n_max = 100
-    for n in range(0,n_max):
-        nfac = math.factorial(n)
-        beta = (((-b)**n)*(time**((c*n)+1)))/((c*n*nfac) + nfac)
-        summation = summation + beta
-        # print("summation: " + str(summation))
-    survival_probability = math.exp(-d*time - f*summation)
-    return survival_probability
-    
-def calculate_pratio_2d(st1_alt_func, st1_dos, st1_non, st2_alt_func, st2_dos, st2_non, alt_func_percent, dos_percent, non_percent, alt_switch_percent):    
-    alt_ret =  (2*alt_func_percent*st1_alt_func)
-    alt_ret_ret_switch = alt_ret*st2_non *alt_switch_percent
-    alt_ret_ret_noswitch = alt_ret*st2_alt_func * (1-alt_switch_percent)
-    dos_ret = (2*dos_percent*st1_dos)
-    dos_ret_ret = dos_ret * st2_dos   
-    non_ret = (2*non_percent*st1_non)
-    non_ret_ret = non_ret * st2_non
-    alt_noret = ((1-st1_alt_func)*alt_func_percent)
-    alt_noret_ret = alt_noret * st2_alt_func
-    dos_noret = ((1-st1_dos)*dos_percent)
-    dos_noret_ret = dos_noret * st2_dos    
-    non_noret = ((1-st1_non)*non_percent)
-    non_noret_ret = non_noret * st2_non
-    pratio = ((alt_ret_ret_noswitch + alt_ret_ret_switch + dos_ret_ret + non_ret_ret)/(alt_noret_ret + dos_noret_ret + non_noret_ret)) * ((alt_noret + dos_noret + non_noret)/(alt_ret + dos_ret + non_ret))                                 
-    return pratio  
-    
-def calculate_expected_pratio(t1, t2, alt_func_percent, dos_percent, non_percent, alt_switch_percent, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non):
-    alt_func_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_alt_func, c_alt_func, d_alt_func, f_alt_func, t1)
-    dos_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_dos, c_dos, d_dos, f_dos, t1)
-    non_survival_t1 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_non, c_non, d_non, f_non, t1)   
-    alt_func_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_alt_func, c_alt_func, d_alt_func, f_alt_func, t2)
-    dos_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_dos, c_dos, d_dos, f_dos, t2)
-    non_survival_t2 = calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b_non, c_non, d_non, f_non, t2)       
-    probability_ratio_2d = calculate_pratio_2d(alt_func_survival_t1, dos_survival_t1, non_survival_t1, alt_func_survival_t2, dos_survival_t2, non_survival_t2, alt_func_percent, dos_percent, non_percent, alt_switch_percent)
-    return probability_ratio_2d
-
-def calculate_residual(observed_pratio, expected_pratio):
-    residual = observed_pratio - expected_pratio
-    return residual    
-
-def main(t1, t2, observed_pratio, alt, dos, non, switch, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non):
-    expected_probability_ratio = calculate_expected_pratio(t1, t2, alt, dos, non, switch, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non)
+def _number(text):
+    #values as the model selection scripts write them: ints stay ints
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def read_top_models(top_models_file_name):
+    """Top model lists from a top model table (python -m duplication_models.batch writes one), in the order of the lists above."""
+    columns = {'model_category': [], 'alt_percent': [], 'dos_percent': [], 'non_percent': [], 'b_alt_func': [], 'c_alt_func': [], 'd_alt_func': [], 'f_alt_func': [], 'b_dos': [], 'c_dos': [], 'd_dos': [], 'percent_switch': [], 'd_non': [], 'f_non': []}
+    with open(top_models_file_name, 'r') as top_models_file:
+        for row in csv.DictReader(top_models_file):
+            for column in columns:
+                columns[column].append(row[column] if column == 'model_category' else _number(row[column]))
+    return [columns[column] for column in columns]
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Expected pratio and residual of every data point under the top model of each category")
+    parser.add_argument('--top-models', default=None, help="top model table to read the models from instead of the lists in this script, e.g. model_selection_03_16_2024_coarse_batch_top_models.csv")
+    return parser
+
+def survival_at_data_points(data_points, b, c, d, f):
+    #survival at each unique time once, scattered back to t1 then t2 of every data point
+    unique_survival = [calculate_probability_of_survival_of_duplicate_gene_copy_by_time(b, c, d, f, each_time) for each_time in data_points.unique_times]
+    return data_points.scatter(unique_survival).tolist()
+
+def main_at_data_point(each_data_point, data_set, alt_survival, dos_survival, non_survival, observed_pratio, alt, dos, non, switch):
+    each_t2 = data_set + each_data_point
+    expected_probability_ratio = calculate_pratio_2d(alt_survival[each_data_point], dos_survival[each_data_point], non_survival[each_data_point], alt_survival[each_t2], dos_survival[each_t2], non_survival[each_t2], alt, dos, non, switch)
     residual = calculate_residual(observed_pratio, expected_probability_ratio)
     return expected_probability_ratio, residual
 
 ########################################
 
-        
-#create_csv_file(file_name)
-file = open(file_name +'.csv', 'w+', newline='')
-writer = csv.writer(file, delimiter=',')
-write_header_row = ["t1", "t2", "expected_pratio", "b_alt", "c_alt", "d_alt", "f_alt", "b_dos", "c_dos", "d_dos", "f_dos", "b_non", "c_non", "d_non", "f_non", "percent_alt", "percent_dos", "percent_non", "percent_switch", "observed_pratio", "residual", "absolute residual", "model_identifier", "data_point_identifier", "model_category"]
-writer.writerow(write_header_row)     
-
-file2 = open(file2_name +'.csv', 'w+', newline='')
-writer2 = csv.writer(file2, delimiter=',')
-write_header_row2 = ["model_number", "sum_of_squared_residuals", "b_alt_func", "c_alt_func", "d_alt_func", "f_alt_func", "b_dos", "c_dos", "d_dos", "f_dos", "b_non", "c_non", "d_non", "f_non", "alt_percent", "dos_percent", "non_percent", "percent_switch", "model_category"]
-writer2.writerow(write_header_row2)          
-
-model_identifier = 0
-minimum_sum_of_squares = 1
-for each_model in range(number_of_combos):  
-    sum_of_squares_counter = 0
-    for each_data_point in range(data_set):
-        t1 = t1_set[each_data_point]
-        t2 = t2_set[each_data_point]
-        observed_pratio = observed_pratio_set[each_data_point]       
-        alt = alts[each_model]
-        dos = doses[each_model]
-        non = nons[each_model]
-        switch = switches[each_model]
-        b_alt_func = b_alt_funcs[each_model]
-        c_alt_func = c_alt_funcs[each_model]
-        d_alt_func = d_alt_funcs[each_model]
-        f_alt_func = f_alt_funcs[each_model]
-        b_dos = b_doses[each_model]
-        c_dos = c_doses[each_model]
-        d_dos = d_doses[each_model]
-        f_dos = -1*d_doses[each_model]
-        b_non = 0
-        c_non = 1
-        d_non = d_nons[each_model]
-        f_non = f_nons[each_model]
-        model_category = model_categories[each_model]
-        main_output = main(t1, t2, observed_pratio, alt, dos, non, switch, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non)
-        expected_pratio = main_output[0]
-        residual = main_output[1]
-        absolute_value_residual = abs(residual)
-        sum_of_squares_counter = (absolute_value_residual*absolute_value_residual) + sum_of_squares_counter
-        data1 = Data_Point(alt, dos, non, switch, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non, expected_pratio, residual, absolute_value_residual)
-        row_to_write = [t1, t2, data1.expected_pratio_value, data1.b_alt_func_value, data1.c_alt_func_value, data1.d_alt_func_value, data1.f_alt_func_value, data1.b_dos_value, data1.c_dos_value, data1.d_dos_value, data1.f_dos_value, data1.b_non_value, data1.c_non_value, data1.d_non_value, data1.f_non_value, data1.alt_value, data1.dos_value, data1.non_value, data1.switch_value, observed_pratio, data1.residual_value, data1.absolute_residual_value, model_identifier, each_data_point, model_category]
-        writer.writerow(row_to_write)    
-        if each_data_point == (data_set-1):
-            row_to_write2 = [model_identifier, sum_of_squares_counter, data1.b_alt_func_value, data1.c_alt_func_value, data1.d_alt_func_value, data1.f_alt_func_value, data1.b_dos_value, data1.c_dos_value, data1.d_dos_value, data1.f_dos_value, data1.b_non_value, data1.c_non_value, data1.d_non_value, data1.f_non_value, data1.alt_value, data1.dos_value, data1.non_value, data1.switch_value, model_category]
-            writer2.writerow(row_to_write2) 
-            if sum_of_squares_counter < minimum_sum_of_squares:
-                minimum_sum_of_squares = sum_of_squares_counter
-                row_to_write3 = [model_identifier, sum_of_squares_counter, data1.b_alt_func_value, data1.c_alt_func_value, data1.d_alt_func_value, data1.f_alt_func_value, data1.b_dos_value, data1.c_dos_value, data1.d_dos_value, data1.f_dos_value, data1.b_non_value, data1.c_non_value, data1.d_non_value, data1.f_non_value, data1.alt_value, data1.dos_value, data1.non_value, data1.switch_value, model_category]
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.top_models is None:
+        top_models = [model_categories, alts, doses, nons, b_alt_funcs, c_alt_funcs, d_alt_funcs, f_alt_funcs, b_doses, c_doses, d_doses, switches, d_nons, f_nons]
+    else:
+        top_models = read_top_models(args.top_models)
+    category_names, alt_percents, dos_percents, non_percents, b_alt_values, c_alt_values, d_alt_values, f_alt_values, b_dos_values, c_dos_values, d_dos_values, switch_values, d_non_values, f_non_values = top_models
+    print("start time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    ###########################################################################
+    # #initialize Data Set
+    data_points = observed_data_set()
+    t1_set = data_points.t1_set
+    t2_set = data_points.t2_set
+    observed_pratio_set = data_points.observed_pratio_set
+    data_set = len(data_points)
+
+    #every top model has to meet the category constraints of the model selection grid
+    alt_valid, alt_constraint_report = constraint_mask('Alt_func', zip(b_alt_values, c_alt_values, d_alt_values, f_alt_values))
+    dos_valid, dos_constraint_report = constraint_mask('Dos', [(b_dos, c_dos, d_dos, -1*d_dos) for b_dos, c_dos, d_dos in zip(b_dos_values, c_dos_values, d_dos_values)])
+    non_valid, non_constraint_report = constraint_mask('Non', [(0, 1, d_non, f_non) for d_non, f_non in zip(d_non_values, f_non_values)])
+    for constraint_report in [alt_constraint_report, dos_constraint_report, non_constraint_report]:
+        print(constraint_report.summary())
+    valid_models = alt_valid & dos_valid & non_valid
+
+    #create_csv_file(file_name)
+    file = open(file_name +'.csv', 'w+', newline='')
+    writer = csv.writer(file, delimiter=',')
+    writer.writerow(RESIDUAL_HEADER)
+
+    file2 = open(file2_name +'.csv', 'w+', newline='')
+    writer2 = csv.writer(file2, delimiter=',')
+    writer2.writerow(RESULT_HEADER + ["model_category"])
+
+    model_identifier = 0
+    #the minimum is the best model of the leaderboard, rather than a search from a seed of 1
+    leaderboard = Leaderboard(top_k=1)
+    for each_model in range(len(category_names)):  
+        if not valid_models[each_model]:
+            print(category_names[each_model] + " top model breaks the category constraints, skipped")
+            model_identifier = model_identifier+1
+            continue
+        sum_of_squares_counter = 0
+        alt_survival = survival_at_data_points(data_points, b_alt_values[each_model], c_alt_values[each_model], d_alt_values[each_model], f_alt_values[each_model])
+        dos_survival = survival_at_data_points(data_points, b_dos_values[each_model], c_dos_values[each_model], d_dos_values[each_model], -1*d_dos_values[each_model])
+        non_survival = survival_at_data_points(data_points, 0, 1, d_non_values[each_model], f_non_values[each_model])
+        for each_data_point in range(data_set):
+            t1 = t1_set[each_data_point]
+            t2 = t2_set[each_data_point]
+            observed_pratio = observed_pratio_set[each_data_point]       
+            alt = alt_percents[each_model]
+            dos = dos_percents[each_model]
+            non = non_percents[each_model]
+            switch = switch_values[each_model]
+            b_alt_func = b_alt_values[each_model]
+            c_alt_func = c_alt_values[each_model]
+            d_alt_func = d_alt_values[each_model]
+            f_alt_func = f_alt_values[each_model]
+            b_dos = b_dos_values[each_model]
+            c_dos = c_dos_values[each_model]
+            d_dos = d_dos_values[each_model]
+            f_dos = -1*d_dos_values[each_model]
+            b_non = 0
+            c_non = 1
+            d_non = d_non_values[each_model]
+            f_non = f_non_values[each_model]
+            model_category = category_names[each_model]
+            main_output = main_at_data_point(each_data_point, data_set, alt_survival, dos_survival, non_survival, observed_pratio, alt, dos, non, switch)
+            expected_pratio = main_output[0]
+            residual = main_output[1]
+            absolute_value_residual = abs(residual)
+            sum_of_squares_counter = (absolute_value_residual*absolute_value_residual) + sum_of_squares_counter
+            data1 = Data_Point(alt, dos, non, switch, b_alt_func, c_alt_func, d_alt_func, f_alt_func, b_dos, c_dos, d_dos, f_dos, b_non, c_non, d_non, f_non, expected_pratio, residual, absolute_value_residual)
+            row_to_write = [t1, t2, data1.expected_pratio_value, data1.b_alt_func_value, data1.c_alt_func_value, data1.d_alt_func_value, data1.f_alt_func_value, data1.b_dos_value, data1.c_dos_value, data1.d_dos_value, data1.f_dos_value, data1.b_non_value, data1.c_non_value, data1.d_non_value, data1.f_non_value, data1.alt_value, data1.dos_value, data1.non_value, data1.switch_value, observed_pratio, data1.residual_value, data1.absolute_residual_value, model_identifier, each_data_point, model_category]
+            writer.writerow(row_to_write)    
+            if each_data_point == (data_set-1):
+                row_to_write2 = [model_identifier, sum_of_squares_counter, data1.b_alt_func_value, data1.c_alt_func_value, data1.d_alt_func_value, data1.f_alt_func_value, data1.b_dos_value, data1.c_dos_value, data1.d_dos_value, data1.f_dos_value, data1.b_non_value, data1.c_non_value, data1.d_non_value, data1.f_non_value, data1.alt_value, data1.dos_value, data1.non_value, data1.switch_value, model_category]
+                writer2.writerow(row_to_write2) 
+                leaderboard.add(row_to_write2)
             else:
                 pass
-        else:
-            pass
-    model_identifier = model_identifier+1
-    print(str(each_model))
-file.close()
-file2.close()
+        model_identifier = model_identifier+1
+        print(str(each_model))
+    file.close()
+    file2.close()
+
+    file3 = open(file3_name +'.csv', 'w+', newline='')
+    writer3 = csv.writer(file3, delimiter=',')
+    writer3.writerow(RESULT_HEADER + ["model_category"])    
+    #no valid model leaves only the header
+    if leaderboard.best() is not None:
+        writer3.writerow(leaderboard.best())
+    file3.close()
+
+    print("end time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
 
-file3 = open(file3_name +'.csv', 'w+', newline='')
-writer3 = csv.writer(file3, delimiter=',')
-write_header_row3 = ["model_number", "sum_of_squared_residuals", "b_alt_func", "c_alt_func", "d_alt_func", "f_alt_func", "b_dos", "c_dos", "d_dos", "f_dos", "b_non", "c_non", "d_non", "f_non", "alt_percent", "dos_percent", "non_percent", "percent_switch", "model_category"]
-writer3.writerow(write_header_row3)    
-writer3.writerow(row_to_write3)
-file3.close()
 
-print("end time: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+#the tests import duplication_models from the repository, whichever directory pytest runs from
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from duplication_models.equivalence import sampled_grid
+from duplication_models.presets import observed_data_set
+
+SEED = 20240316
+VALUES_PER_AXIS = 2
+
+
+@pytest.fixture(scope='session')
+def data_set():
+    return observed_data_set()
+
+
+@pytest.fixture(scope='session', params=['3mix_mut', 'alt_non_mut', 'alt_dos_dup'])
+def grid(request):
+    """A small sub grid of a preset: up to VALUES_PER_AXIS values of each of its value lists."""
+    return sampled_grid(request.param, VALUES_PER_AXIS, np.random.default_rng(SEED))
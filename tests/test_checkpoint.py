@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from duplication_models.checkpoint import Checkpoint, checkpoint_fingerprint
+from duplication_models.grid_search import TensorGridSearch, CollapsedGridSearch
+
+TOP_K = 20
+DELTA_SSR = 0.01
+#small chunks so a sub grid still spans several of them
+MAX_CHUNK_ELEMENTS = 500
+#chunks evaluated before the simulated interruption
+CHUNKS_BEFORE_INTERRUPTION = 2
+
+
+class Interruption(Exception):
+    pass
+
+
+def interrupt_after(search, chunks):
+    """Make a TensorGridSearch raise Interruption once it has evaluated `chunks` chunks."""
+    evaluate = search.evaluate
+    evaluated = []
+    def evaluate_until_interrupted(*arguments, **keywords):
+        if len(evaluated) == chunks:
+            raise Interruption
+        evaluated.append(arguments[:2])
+        return evaluate(*arguments, **keywords)
+    search.evaluate = evaluate_until_interrupted
+
+
+@pytest.mark.parametrize('search_class', [TensorGridSearch, CollapsedGridSearch])
+@pytest.mark.parametrize('prune', [False, True])
+def test_resumed_equals_uninterrupted(grid, data_set, tmp_path, search_class, prune):
+    def new_search():
+        return search_class(grid, data_set.t1_set, data_set.t2_set, data_set.observed_pratio_set, max_chunk_elements=MAX_CHUNK_ELEMENTS)
+    path = str(tmp_path / 'checkpoint.json')
+    fingerprint = checkpoint_fingerprint({'grid': vars(grid), 'search': search_class.__name__, 'prune': prune})
+    with np.errstate(all='ignore'):
+        uninterrupted = new_search().run(TOP_K, DELTA_SSR, prune)
+        interrupted = new_search()
+        #the collapsed search is interrupted in its last group, after the others are done
+        interrupt_after(interrupted.searches[-1][0] if search_class is CollapsedGridSearch else interrupted, CHUNKS_BEFORE_INTERRUPTION)
+        #interval 0 saves the checkpoint after every chunk
+        with pytest.raises(Interruption):
+            interrupted.run(TOP_K, DELTA_SSR, prune, checkpoint=Checkpoint(path, fingerprint, interval=0))
+        checkpoint = Checkpoint(path, fingerprint, interval=0)
+        assert checkpoint.load()
+        resumed = new_search().run(TOP_K, DELTA_SSR, prune, checkpoint=checkpoint)
+    assert len(uninterrupted) > 0
+    assert resumed.rows() == uninterrupted.rows()
+
+
+def test_checkpoint_of_other_settings_is_refused(tmp_path):
+    path = str(tmp_path / 'checkpoint.json')
+    Checkpoint(path, checkpoint_fingerprint({'model_category': 'non_dos_dup'}), interval=0).save()
+    with pytest.raises(ValueError):
+        Checkpoint(path, checkpoint_fingerprint({'model_category': 'alt_non_mut'})).load()
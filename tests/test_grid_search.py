@@ -0,0 +1,59 @@
+import numpy as np
+
+from duplication_models.grid_search import TensorGridSearch, CollapsedGridSearch
+from duplication_models.leaderboard import Leaderboard
+from duplication_models.scalar_search import ScalarGridSearch
+
+TOP_K = 20
+DELTA_SSR = 0.01
+#small chunks so a sub grid still spans several of them
+MAX_CHUNK_ELEMENTS = 500
+
+
+def tensor_search(grid, data_set, **options):
+    return TensorGridSearch(grid, data_set.t1_set, data_set.t2_set, data_set.observed_pratio_set, max_chunk_elements=MAX_CHUNK_ELEMENTS, **options)
+
+
+def collapsed_search(grid, data_set, **options):
+    return CollapsedGridSearch(grid, data_set.t1_set, data_set.t2_set, data_set.observed_pratio_set, max_chunk_elements=MAX_CHUNK_ELEMENTS, **options)
+
+
+def test_tensor_equals_scalar(grid, data_set):
+    with np.errstate(all='ignore'):
+        tensor = tensor_search(grid, data_set).run(TOP_K, DELTA_SSR)
+    scalar = ScalarGridSearch(grid, data_set.t1_set, data_set.t2_set, data_set.observed_pratio_set).run(TOP_K, DELTA_SSR)
+    assert len(tensor) > 0
+    assert tensor.rows() == scalar.rows()
+
+
+def test_scalar_collapsed_equals_uncollapsed(grid, data_set):
+    search = ScalarGridSearch(grid, data_set.t1_set, data_set.t2_set, data_set.observed_pratio_set)
+    assert search.run(TOP_K, DELTA_SSR, collapse=True).rows() == search.run(TOP_K, DELTA_SSR, collapse=False).rows()
+
+
+def test_pruned_equals_exhaustive(grid, data_set):
+    with np.errstate(all='ignore'):
+        exhaustive = tensor_search(grid, data_set).run(TOP_K, DELTA_SSR)
+        pruned = tensor_search(grid, data_set).run(TOP_K, DELTA_SSR, prune=True)
+        collapsed_pruned = collapsed_search(grid, data_set).run(TOP_K, DELTA_SSR, prune=True)
+    assert pruned.rows() == exhaustive.rows()
+    assert collapsed_pruned.rows() == exhaustive.rows()
+
+
+def test_collapsed_equals_uncollapsed(grid, data_set):
+    with np.errstate(all='ignore'):
+        uncollapsed = tensor_search(grid, data_set).run(TOP_K, DELTA_SSR)
+        collapsed = collapsed_search(grid, data_set).run(TOP_K, DELTA_SSR)
+    assert collapsed.rows() == uncollapsed.rows()
+
+
+def test_merged_shards_equal_single_run(grid, data_set):
+    shards = 3
+    with np.errstate(all='ignore'):
+        single = collapsed_search(grid, data_set).run(TOP_K, DELTA_SSR)
+        merged = Leaderboard(TOP_K, DELTA_SSR)
+        for shard in range(shards):
+            search = collapsed_search(grid, data_set)
+            search.shard(shard, shards)
+            merged.merge(search.run(TOP_K, DELTA_SSR))
+    assert merged.rows() == single.rows()
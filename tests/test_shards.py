@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from duplication_models.presets import preset_grid
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_SELECTION = os.path.join(REPOSITORY, 'model_selection_03_16_2024.py')
+#the smallest preset with more than one model
+MODEL_CATEGORY = 'non_dos_dup'
+
+
+def run(arguments, directory):
+    environment = dict(os.environ, PYTHONPATH=REPOSITORY + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    subprocess.run([sys.executable] + arguments, cwd=str(directory), env=environment, check=True, stdout=subprocess.DEVNULL)
+
+
+def result_files(directory, minimum_file_name):
+    results = {}
+    for file_name in (minimum_file_name + '.csv', minimum_file_name.replace('_minimum', '') + '_leaderboard.csv'):
+        with open(os.path.join(str(directory), file_name)) as result_file:
+            results[file_name] = result_file.read()
+    return results
+
+
+@pytest.mark.parametrize('shards', [1, 3])
+def test_merged_shard_processes_equal_single_run(tmp_path, shards):
+    minimum_file_name = preset_grid(MODEL_CATEGORY)[1]
+    single_directory = tmp_path / 'single'
+    shard_directory = tmp_path / 'shards'
+    single_directory.mkdir()
+    shard_directory.mkdir()
+    run([MODEL_SELECTION, '--model', MODEL_CATEGORY, '--no-checkpoint'], single_directory)
+    #each shard in a process of its own, as on separate machines
+    for shard in range(shards):
+        run([MODEL_SELECTION, '--model', MODEL_CATEGORY, '--no-checkpoint', '--shard', str(shard) + '/' + str(shards)], shard_directory)
+    shard_files = sorted(file_name for file_name in os.listdir(str(shard_directory)) if file_name.endswith('.json'))
+    assert len(shard_files) == shards
+    run(['-m', 'duplication_models.shards'] + shard_files, shard_directory)
+    assert result_files(shard_directory, minimum_file_name) == result_files(single_directory, minimum_file_name)
+
+
+def test_missing_shard_is_refused(tmp_path):
+    run([MODEL_SELECTION, '--model', MODEL_CATEGORY, '--no-checkpoint', '--shard', '0/2'], tmp_path)
+    shard_files = [file_name for file_name in os.listdir(str(tmp_path)) if file_name.endswith('.json')]
+    with pytest.raises(subprocess.CalledProcessError):
+        run(['-m', 'duplication_models.shards'] + shard_files, tmp_path)